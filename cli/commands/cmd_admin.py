@@ -1,5 +1,4 @@
 import click
-import pyotp  # Uncomment if using pyotp for MFA
 from flask.cli import AppGroup
 
 from marrow_blog.blueprints.admin.models import AdminUser
@@ -35,6 +34,8 @@ def create_admin(username, password, enable_mfa):
     user.set_password(password)
 
     if enable_mfa:
+        import pyotp
+
         user.mfa_secret = pyotp.random_base32()  # Uncomment for pyotp
         provisioning_uri = pyotp.TOTP(user.mfa_secret).provisioning_uri(
             name=user.username, issuer_name="MarrowBlog"
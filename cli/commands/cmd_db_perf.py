@@ -0,0 +1,35 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from lib.slow_queries import read_entries, summarize
+from marrow_blog.extensions import db
+
+db_perf_cli = AppGroup("db-perf", help="Inspect slow SQL statements.")
+
+
+@db_perf_cli.command("report")
+@click.option(
+    "--limit", default=10, show_default=True, help="Statements to show."
+)
+@click.option("--path", help="Slow query log, defaults to SLOW_QUERY_LOG.")
+def report(limit, path):
+    """Summarize the slowest statements and flag full table scans."""
+    path = path or current_app.config["SLOW_QUERY_LOG"]
+    summary = summarize(read_entries(path), tables=db.metadata.tables)
+    if not summary:
+        click.echo(f"No slow queries recorded in {path}.")
+        return
+
+    for rank, group in enumerate(summary[:limit], start=1):
+        click.echo(
+            f"{rank}. {group['total_ms']:.1f}ms total, "
+            f"{group['max_ms']:.1f}ms max over {group['count']} run(s) "
+            f"from {', '.join(group['views'])}"
+        )
+        click.echo(f"   {group['sql']}")
+        for table in group["full_scans"]:
+            click.echo(f"   FULL SCAN of {table}")
+        for line in group["plan"]:
+            click.echo(f"     {line}")
+        click.echo()
@@ -0,0 +1,19 @@
+import click
+from flask.cli import AppGroup
+
+from marrow_blog.blueprints.posts.models import Post
+
+posts_cli = AppGroup("posts", help="Manage stored posts.")
+
+
+@posts_cli.command("render")
+@click.option(
+    "--all",
+    "everything",
+    is_flag=True,
+    help="Re-render every post, not just those without stored HTML.",
+)
+def render(everything):
+    """Store rendered HTML for posts, e.g. after upgrading the database."""
+    count = Post.backfill_rendered(everything=everything)
+    click.echo(f"Rendered {count} post(s).")
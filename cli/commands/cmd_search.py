@@ -0,0 +1,13 @@
+import click
+from flask.cli import AppGroup
+
+from marrow_blog.blueprints.posts.search import rebuild_search_index
+
+search_cli = AppGroup("search", help="Manage the post search index.")
+
+
+@search_cli.command("rebuild")
+def rebuild():
+    """Rebuild the full-text search index from the posts table."""
+    rebuild_search_index()
+    click.echo("Search index rebuilt.")
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
-import multiprocessing
+import gc
 import os
 
-from distutils.util import strtobool
+from config import settings
+from lib import worker_sizing
 
 bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
 accesslog = "-"
@@ -11,9 +12,68 @@ access_log_format = (
     "%(h)s %(l)s %(u)s %(t)s '%(r)s' %(s)s %(b)s '%(f)s' '%(a)s' in %(D)sµs"  # noqa: E501
 )
 
-workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2))
-threads = int(os.getenv("PYTHON_MAX_THREADS", 1))
-
-reload = bool(strtobool(os.getenv("WEB_RELOAD", "false")))
+reload = bool(settings.strtobool(os.getenv("WEB_RELOAD", "false")))
 
 timeout = int(os.getenv("WEB_TIMEOUT", 120))
+
+# Build the app once in the master and fork workers from it, so its modules
+# and caches are shared copy-on-write instead of built per worker. Code
+# reloading needs each worker to import the app itself.
+preload_app = (
+    bool(settings.strtobool(os.getenv("WEB_PRELOAD", "false"))) and not reload
+)
+
+# Size workers and threads for the container's CPU quota and memory limit
+# rather than the host's. A worker is its measured baseline plus the caches
+# it fills, and every thread has its own SQLite connection and page cache.
+_thread_mb = worker_sizing.sqlite_cache_mb(
+    settings.SQLITE_PRAGMAS["cache_size"]
+)
+_worker_mb = (
+    float(
+        os.getenv("WEB_WORKER_MEMORY_MB", worker_sizing.WORKER_MB[preload_app])
+    )
+    + (settings.RENDER_CACHE_MAX_BYTES + settings.HIGHLIGHT_CACHE_MAX_BYTES)
+    / 1024
+    / 1024
+    + _thread_mb
+)
+_cpus, _cpu_source = worker_sizing.cpu_limit()
+_memory_mb, _memory_source = worker_sizing.memory_limit()
+layout = worker_sizing.plan(
+    _cpus,
+    _memory_mb,
+    _worker_mb,
+    _thread_mb,
+    worker_sizing.BASE_MB[preload_app],
+    cpu_source=_cpu_source,
+    memory_source=_memory_source,
+)
+
+workers = int(os.getenv("WEB_CONCURRENCY", layout.workers))
+threads = int(os.getenv("PYTHON_MAX_THREADS", layout.threads))
+
+if preload_app:
+    # Collecting in the master frees objects between long-lived ones, and a
+    # worker writing into those holes copies the page. See gc.freeze().
+    gc.disable()
+
+
+def on_starting(server):
+    server.log.info(layout.describe(workers, threads))
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Move everything built so far out of the collector's reach, so a
+        # worker's collections don't write to pages shared with the master.
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from lib.util_sqlalchemy import dispose_engines
+
+        gc.enable()
+        # Connections opened while building the app belong to the master.
+        dispose_engines(server.app.wsgi())
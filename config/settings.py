@@ -1,6 +1,20 @@
 import os
 
-from distutils.util import strtobool
+
+def strtobool(value):
+    """
+    Return 1 for "y", "yes", "t", "true", "on" and "1", 0 for their opposites.
+
+    distutils.util.strtobool did this, but importing distutils pulls in
+    setuptools, which added ~60ms to every boot and is gone in Python 3.12.
+    """
+    value = value.lower()
+    if value in ("y", "yes", "t", "true", "on", "1"):
+        return 1
+    if value in ("n", "no", "f", "false", "off", "0"):
+        return 0
+    raise ValueError(f"invalid truth value {value!r}")
+
 
 ROOT_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), ".."))
 
@@ -18,9 +32,56 @@ SQLALCHEMY_DATABASE_URI = os.getenv(
 )
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# Applied to every new SQLite connection. WAL lets the gunicorn workers read
+# while the Celery worker or an autosave writes, and busy_timeout makes
+# writers wait for the lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "wal"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "normal"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)),
+    # Negative values are KiB, so this is a 16 MB page cache per connection.
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -16000)),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 128 * 1024 * 1024)),
+}
+
+# Per-request metrics. Server-Timing breaks each response down into db,
+# render (markdown) and template time. It's on in development only by
+# default since it exposes query counts and timings to every client.
+# Requests running more statements or taking longer than the budgets are
+# logged as warnings with their endpoint.
+SERVER_TIMING_HEADER = bool(
+    strtobool(os.getenv("SERVER_TIMING_HEADER", "true" if DEBUG else "false"))
+)
+REQUEST_STATEMENT_BUDGET = int(os.getenv("REQUEST_STATEMENT_BUDGET", 20))
+REQUEST_DURATION_BUDGET_MS = int(os.getenv("REQUEST_DURATION_BUDGET_MS", 500))
+# Return each request's SQL statement count in an X-SQL-Statements header.
+SQL_STATEMENTS_HEADER = bool(
+    strtobool(os.getenv("SQL_STATEMENTS_HEADER", "false"))
+)
+
+# Opt-in slow query log, off while SLOW_QUERY_MS is 0. Statements taking at
+# least this long are written with their EXPLAIN QUERY PLAN to rotating JSON
+# lines files, one per process such as slow-queries-<pid>.log, summarized
+# together by `flask db-perf report`.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 0))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "/app/data/slow-queries.log")
+
+# How often each worker reads the cache_generations table to notice writes
+# made by other workers and the Celery worker. Its own writes are seen
+# immediately.
+CACHE_GENERATION_CHECK_MS = int(os.getenv("CACHE_GENERATION_CHECK_MS", 1000))
+
 # DOC_UPLOAD_ALLOWED_EXTENSIONS = ["docx", "txt", "md"]
 DOC_UPLOAD_ALLOWED_EXTENSIONS = {"md"}
 
+# Bulk imports are saved here for the Celery worker, so it must be on the
+# volume the web and worker containers share.
+IMPORT_UPLOAD_DIR = os.getenv("IMPORT_UPLOAD_DIR", "/app/data/imports")
+IMPORT_ALLOWED_EXTENSIONS = {"md", "zip"}
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 50))
+IMPORT_MAX_FILES = int(os.getenv("IMPORT_MAX_FILES", 1000))
+IMPORT_MAX_FILE_BYTES = int(os.getenv("IMPORT_MAX_FILE_BYTES", 1024 * 1024))
+
 # Celery.
 CELERY_CONFIG = {
     "broker_url": os.getenv(
@@ -29,9 +90,28 @@ CELERY_CONFIG = {
     "result_backend": os.getenv(
         "CELERY_RESULT_BACKEND", "db+sqlite:///data/celery-results.db"
     ),
-    "include": [],
+    "include": ["marrow_blog.blueprints.admin.tasks"],
 }
 
+# Rendered markdown kept in memory per gunicorn worker. config/gunicorn.py
+# counts it against the memory limit when sizing workers, so keep it modest.
+RENDER_CACHE_MAX_BYTES = int(
+    os.getenv("RENDER_CACHE_MAX_BYTES", 8 * 1024 * 1024)
+)
+
+# Highlighted code blocks keyed by content hash, shared by every render,
+# preview and autosave. Point HIGHLIGHT_CACHE_DIR at the volume, such as
+# /app/data/highlight-cache, to keep entries across worker restarts. Past
+# HIGHLIGHT_CACHE_DIR_MAX_BYTES the least recently used files are deleted,
+# 0 lets it grow without limit.
+HIGHLIGHT_CACHE_MAX_BYTES = int(
+    os.getenv("HIGHLIGHT_CACHE_MAX_BYTES", 4 * 1024 * 1024)
+)
+HIGHLIGHT_CACHE_DIR = os.getenv("HIGHLIGHT_CACHE_DIR", "")
+HIGHLIGHT_CACHE_DIR_MAX_BYTES = int(
+    os.getenv("HIGHLIGHT_CACHE_DIR_MAX_BYTES", 64 * 1024 * 1024)
+)
+
 FLATPAGES_AUTO_RELOAD = True
 FLATPAGES_EXTENSION = ".md"
 FLATPAGES_ROOT = ROOT_DIR
@@ -0,0 +1,27 @@
+"""add rendered_html to posts
+
+Revision ID: 3f9a6c2e1b7d
+Revises: ccf5d3c8c30a
+Create Date: 2026-10-17 09:12:41.208311
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "3f9a6c2e1b7d"
+down_revision = "ccf5d3c8c30a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing posts are left NULL and rendered on the fly until
+    # `flask posts render` stores their HTML with the current renderer.
+    op.add_column(
+        "posts", sa.Column("rendered_html", sa.Text(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("posts", "rendered_html")
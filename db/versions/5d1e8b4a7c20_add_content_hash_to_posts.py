@@ -0,0 +1,26 @@
+"""add content_hash to posts
+
+Revision ID: 5d1e8b4a7c20
+Revises: 3f9a6c2e1b7d
+Create Date: 2026-10-17 11:03:17.554902
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "5d1e8b4a7c20"
+down_revision = "3f9a6c2e1b7d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled in alongside rendered_html by `flask posts render`.
+    op.add_column(
+        "posts", sa.Column("content_hash", sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("posts", "content_hash")
@@ -0,0 +1,71 @@
+"""add posts_fts full-text search index
+
+Revision ID: 9a4f2d7b6e31
+Revises: 5d1e8b4a7c20
+Create Date: 2026-10-17 13:26:05.318742
+
+"""
+
+from alembic import op
+
+revision = "9a4f2d7b6e31"
+down_revision = "5d1e8b4a7c20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE posts_fts USING fts5(
+            title, excerpt, tags, markdown_content,
+            content='posts', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts
+                (rowid, title, excerpt, tags, markdown_content)
+            VALUES (new.id, new.title, new.excerpt, new.tags,
+                    new.markdown_content);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts
+                (posts_fts, rowid, title, excerpt, tags, markdown_content)
+            VALUES ('delete', old.id, old.title, old.excerpt, old.tags,
+                    old.markdown_content);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER posts_fts_au
+        AFTER UPDATE OF title, excerpt, tags, markdown_content ON posts BEGIN
+            INSERT INTO posts_fts
+                (posts_fts, rowid, title, excerpt, tags, markdown_content)
+            VALUES ('delete', old.id, old.title, old.excerpt, old.tags,
+                    old.markdown_content);
+            INSERT INTO posts_fts
+                (rowid, title, excerpt, tags, markdown_content)
+            VALUES (new.id, new.title, new.excerpt, new.tags,
+                    new.markdown_content);
+        END
+        """
+    )
+
+    # Index the posts that already exist.
+    op.execute("INSERT INTO posts_fts(posts_fts) VALUES('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_ai")
+    op.execute("DROP TABLE IF EXISTS posts_fts")
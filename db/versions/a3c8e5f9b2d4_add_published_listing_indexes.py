@@ -0,0 +1,38 @@
+"""add published listing indexes to posts
+
+Revision ID: a3c8e5f9b2d4
+Revises: e41b6d2f8a93
+Create Date: 2026-10-17 16:40:12.518204
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "a3c8e5f9b2d4"
+down_revision = "e41b6d2f8a93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_posts_published_created_on_id",
+        "posts",
+        ["published", sa.text("created_on DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_posts_published_updated_on",
+        "posts",
+        ["published", sa.text("updated_on DESC"), "slug"],
+        unique=False,
+    )
+    # Both new indexes lead with published, so this one is redundant.
+    op.drop_index("ix_posts_published", table_name="posts")
+
+
+def downgrade():
+    op.create_index("ix_posts_published", "posts", ["published"], unique=False)
+    op.drop_index("ix_posts_published_updated_on", table_name="posts")
+    op.drop_index("ix_posts_published_created_on_id", table_name="posts")
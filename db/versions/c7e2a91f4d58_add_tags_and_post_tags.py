@@ -0,0 +1,111 @@
+"""add tags and post_tags
+
+Revision ID: c7e2a91f4d58
+Revises: 9a4f2d7b6e31
+Create Date: 2026-10-17 14:12:40.220931
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from slugify import slugify
+
+from lib.util_sqlalchemy import AwareDateTime, tzware_datetime
+
+revision = "c7e2a91f4d58"
+down_revision = "9a4f2d7b6e31"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "tags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("slug", sa.String(length=255), nullable=False),
+        sa.Column(
+            "published_count",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("created_on", AwareDateTime(), nullable=True),
+        sa.Column("updated_on", AwareDateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_tags_slug"), "tags", ["slug"], unique=True)
+    op.create_table(
+        "post_tags",
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tag_id"], ["tags.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("post_id", "tag_id"),
+    )
+    op.create_index(
+        "ix_post_tags_tag_id_post_id", "post_tags", ["tag_id", "post_id"]
+    )
+
+    # Split the existing comma separated tags the same way Post.tag_list
+    # does, first spelling of each slug wins. The dates go through
+    # AwareDateTime so they're stored in the same format as the ORM's.
+    tags = sa.table(
+        "tags",
+        sa.column("id", sa.Integer()),
+        sa.column("name", sa.String()),
+        sa.column("slug", sa.String()),
+        sa.column("created_on", AwareDateTime()),
+        sa.column("updated_on", AwareDateTime()),
+    )
+    connection = op.get_bind()
+    posts = connection.execute(
+        sa.text("SELECT id, tags FROM posts WHERE tags IS NOT NULL")
+    ).fetchall()
+    tag_ids = {}
+    now = tzware_datetime()
+    for post in posts:
+        slugs = set()
+        for name in post.tags.split(","):
+            name = name.strip()
+            slug = slugify(name)
+            if not slug or slug in slugs:
+                continue
+            slugs.add(slug)
+
+            if slug not in tag_ids:
+                tag_ids[slug] = connection.execute(
+                    sa.insert(tags)
+                    .values(
+                        name=name, slug=slug, created_on=now, updated_on=now
+                    )
+                    .returning(tags.c.id)
+                ).scalar_one()
+            connection.execute(
+                sa.text(
+                    "INSERT INTO post_tags (post_id, tag_id)"
+                    " VALUES (:post_id, :tag_id)"
+                ),
+                {"post_id": post.id, "tag_id": tag_ids[slug]},
+            )
+
+    connection.execute(
+        sa.text(
+            """
+            UPDATE tags SET published_count = (
+                SELECT count(*) FROM post_tags
+                JOIN posts ON posts.id = post_tags.post_id
+                WHERE post_tags.tag_id = tags.id AND posts.published
+            )
+            """
+        )
+    )
+
+
+def downgrade():
+    # posts.tags is still the source of truth for the editor, so dropping
+    # the normalized copy loses nothing.
+    op.drop_index("ix_post_tags_tag_id_post_id", table_name="post_tags")
+    op.drop_table("post_tags")
+    op.drop_index(op.f("ix_tags_slug"), table_name="tags")
+    op.drop_table("tags")
@@ -0,0 +1,24 @@
+"""add posts (created_on, id) index
+
+Revision ID: e41b6d2f8a93
+Revises: c7e2a91f4d58
+Create Date: 2026-10-17 15:02:51.907314
+
+"""
+
+from alembic import op
+
+revision = "e41b6d2f8a93"
+down_revision = "c7e2a91f4d58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_posts_created_on_id", "posts", ["created_on", "id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index("ix_posts_created_on_id", table_name="posts")
@@ -0,0 +1,39 @@
+"""add cache_generations, drop ix_posts_published_updated_on
+
+Revision ID: f6b1d3e8a7c5
+Revises: a3c8e5f9b2d4
+Create Date: 2026-10-17 17:55:31.804119
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "f6b1d3e8a7c5"
+down_revision = "a3c8e5f9b2d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cache_generations",
+        sa.Column("namespace", sa.String(length=50), nullable=False),
+        sa.Column(
+            "generation", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.PrimaryKeyConstraint("namespace"),
+    )
+    # The published index's max(updated_on) check was its only reader, and
+    # generations replace that check.
+    op.drop_index("ix_posts_published_updated_on", table_name="posts")
+
+
+def downgrade():
+    op.create_index(
+        "ix_posts_published_updated_on",
+        "posts",
+        ["published", sa.text("updated_on DESC"), "slug"],
+        unique=False,
+    )
+    op.drop_table("cache_generations")
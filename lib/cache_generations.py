@@ -0,0 +1,121 @@
+import threading
+import time
+
+from flask import g, has_app_context, has_request_context
+from sqlalchemy import Column, Integer, String, Table, event, select
+from sqlalchemy.dialects.sqlite import insert
+
+
+class CacheGenerations:
+    """
+    Namespaced counters that tell every worker when its caches are stale.
+
+    Writers bump a namespace such as "posts" in the same transaction as the
+    change, so the counter can't move without the data. Readers compare the
+    stored generation with the one their cache was built from. Generations
+    are read at most once per request and once per check interval, and a
+    worker's own commits are seen straight away.
+    """
+
+    NAMESPACES = ("posts", "feeds")
+
+    def __init__(self, db):
+        self.db = db
+        self.table = Table(
+            "cache_generations",
+            db.metadata,
+            Column("namespace", String(50), primary_key=True),
+            Column("generation", Integer, nullable=False, server_default="0"),
+        )
+        self.check_interval = 1.0
+        self._values = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.checks = 0
+
+        event.listen(db.session, "after_commit", self._after_commit)
+        event.listen(db.session, "after_rollback", self._after_rollback)
+
+    def init_app(self, app):
+        self.check_interval = (
+            app.config.get("CACHE_GENERATION_CHECK_MS", 1000) / 1000
+        )
+        app.before_request(self._forget_request)
+        app.extensions["cache_generations"] = self
+        self.expire()
+
+    def current(self, namespace):
+        """Return the stored generation of a namespace, 0 if never bumped."""
+        return self._generations().get(namespace, 0)
+
+    def bump(self, session, namespaces):
+        """
+        Increment each namespace in the session's transaction.
+
+        :param session: SQLAlchemy session about to commit the change
+        :param namespaces: Names from NAMESPACES
+        :return: None
+        """
+        if not namespaces:
+            return None
+
+        statement = insert(self.table).values(
+            [
+                {"namespace": namespace, "generation": 1}
+                for namespace in sorted(namespaces)
+            ]
+        )
+        session.connection().execute(
+            statement.on_conflict_do_update(
+                index_elements=["namespace"],
+                set_={"generation": self.table.c.generation + 1},
+            )
+        )
+        session.info["cache_generations_bumped"] = True
+        return None
+
+    def expire(self):
+        """Read the generations again on next use."""
+        with self._lock:
+            self._values = None
+        self._forget_request()
+
+    def stats(self):
+        return {
+            "generations": dict(self._values or {}),
+            "check_interval_ms": int(self.check_interval * 1000),
+            "checks": self.checks,
+        }
+
+    def _generations(self):
+        if has_request_context() and "cache_generations" in g:
+            return g.cache_generations
+
+        values = self._values
+        now = time.monotonic()
+        if values is None or now - self._checked_at >= self.check_interval:
+            rows = self.db.session.execute(
+                select(self.table.c.namespace, self.table.c.generation)
+            )
+            values = dict(rows.all())
+            with self._lock:
+                self._values = values
+                self._checked_at = now
+                self.checks += 1
+
+        if has_request_context():
+            g.cache_generations = values
+        return values
+
+    @staticmethod
+    def _forget_request():
+        if has_app_context():
+            g.pop("cache_generations", None)
+
+    def _after_commit(self, session):
+        if session.info.pop("cache_generations_bumped", False):
+            self.expire()
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop("cache_generations_bumped", None)
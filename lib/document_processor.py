@@ -1,8 +1,26 @@
+import os
 import re
-from typing import Dict, List, Optional, Tuple
+import zipfile
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-import frontmatter
-from slugify import slugify
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+DECODE_ERROR = "Unable to decode file. Please ensure it's a UTF-8 text file."
+
+# Quoted booleans in frontmatter, YAML itself already reads true/yes/on.
+_TRUE = ("true", "yes", "on", "1")
+_FALSE = ("false", "no", "off", "0", "")
+
+# Base slugs or titles per IN/OR query, well under SQLite's variable limit.
+SLUG_QUERY_CHUNK = 100
+
+
+def slugify(text: str) -> str:
+    """python-slugify's slugify, imported on first upload rather than boot."""
+    from slugify import slugify
+
+    return slugify(text)
 
 
 class DocumentProcessor:
@@ -12,23 +30,94 @@ class DocumentProcessor:
     def generate_unique_slug(
         title: str, exclude_id: Optional[int] = None
     ) -> str:
-        """Generate unique slug, checking database for conflicts."""
-        from marrow_blog.blueprints.posts.models import Post
+        """
+        Generate a unique slug with one query for every taken candidate.
 
+        The base slug and any "base-N" slugs are fetched together through the
+        slug index, then the first free one is picked in memory.
+        """
         base_slug = slugify(title)
-        slug = base_slug
-        counter = 1
+        taken = DocumentProcessor.taken_slugs([base_slug], exclude_id)
+        return DocumentProcessor.next_free_slug(base_slug, taken)
+
+    @staticmethod
+    def taken_slugs(
+        base_slugs: List[str], exclude_id: Optional[int] = None
+    ) -> Set[str]:
+        """Return every existing slug equal to or prefixed by a base slug."""
+        from marrow_blog.blueprints.posts.models import Post
 
-        while True:
-            query = Post.query.filter_by(slug=slug)
+        taken = set()
+        base_slugs = sorted(set(base_slugs))
+        for i in range(0, len(base_slugs), SLUG_QUERY_CHUNK):
+            conditions = [
+                # "-" sorts just before ".", so the range is every slug
+                # starting with "base-" and can be answered from the index.
+                (Post.slug == base)
+                | ((Post.slug >= f"{base}-") & (Post.slug < f"{base}."))
+                for base in base_slugs[i : i + SLUG_QUERY_CHUNK]
+            ]
+            query = Post.query.with_entities(Post.slug).filter(
+                or_(*conditions)
+            )
             if exclude_id:
                 query = query.filter(Post.id != exclude_id)
+            taken.update(slug for (slug,) in query)
+        return taken
 
-            if not query.first():
-                return slug
-
-            slug = f"{base_slug}-{counter}"
+    @staticmethod
+    def next_free_slug(base_slug: str, taken: Set[str]) -> str:
+        """Return base_slug or its first "base-N" not in taken."""
+        if base_slug not in taken:
+            return base_slug
+
+        prefix = f"{base_slug}-"
+        suffixes = {
+            int(slug[len(prefix) :])
+            for slug in taken
+            if slug.startswith(prefix) and slug[len(prefix) :].isdigit()
+        }
+        counter = 1
+        while counter in suffixes:
             counter += 1
+        return f"{prefix}{counter}"
+
+    @staticmethod
+    def create_with_unique_slug(
+        title: str,
+        build: Callable[[str], object],
+        slug: Optional[str] = None,
+        attempts: int = 3,
+    ):
+        """
+        Insert the post build(slug) returns under a free slug for title.
+
+        Rather than trusting the pre-check, a unique constraint failure on
+        the slug (a concurrent insert took it) allocates another and retries
+        with a freshly built post.
+
+        :param title: Title the slug is generated from
+        :param build: Callable returning an unsaved Post for a slug
+        :param slug: Already allocated slug to try first
+        :param attempts: Inserts to try before giving up
+        :return: The saved post
+        """
+        from marrow_blog.extensions import db
+
+        for attempt in range(attempts):
+            if slug is None:
+                slug = DocumentProcessor.generate_unique_slug(title)
+
+            post = build(slug)
+            db.session.add(post)
+            try:
+                db.session.commit()
+                return post
+            except IntegrityError as e:
+                db.session.rollback()
+                if "slug" not in str(e.orig) or attempt + 1 == attempts:
+                    raise
+                slug = None
 
     @staticmethod
     def extract_excerpt(content: str, max_length: int = 200) -> str:
@@ -65,6 +154,8 @@ class DocumentProcessor:
     @staticmethod
     def process_frontmatter(markdown_content: str) -> Tuple[Dict, str]:
         """Parse YAML frontmatter and return metadata dict + clean content."""
+        import frontmatter
+
         try:
             post_data = frontmatter.loads(markdown_content)
             return post_data.metadata, post_data.content
@@ -77,10 +168,20 @@ class DocumentProcessor:
         """Validate post data and return list of errors."""
         errors = []
 
-        if not data.get("title", "").strip():
+        for field in ("title", "slug", "excerpt", "tags"):
+            value = data.get(field)
+            if value is not None and not isinstance(value, str):
+                errors.append(f"{field.capitalize()} must be text")
+        if errors:
+            return errors
+
+        if not isinstance(data.get("published", False), bool):
+            errors.append("Published must be true or false")
+
+        if not (data.get("title") or "").strip():
             errors.append("Title is required")
 
-        if len(data.get("title", "")) > 255:
+        if len(data.get("title") or "") > 255:
             errors.append("Title must be 255 characters or less")
 
         if data.get("slug") and len(data["slug"]) > 255:
@@ -95,6 +196,39 @@ class DocumentProcessor:
 class PostManager:
     """Business logic for post operations."""
 
+    @staticmethod
+    def parse_upload(content_bytes: bytes, filename: str) -> Dict:
+        """
+        Turn an uploaded markdown file into Post field values.
+
+        "slug" is only set when the frontmatter asks for one.
+
+        :raises UnicodeDecodeError: If the file isn't UTF-8
+        """
+        markdown_content = content_bytes.decode("utf-8")
+        metadata, clean_content = DocumentProcessor.process_frontmatter(
+            markdown_content
+        )
+
+        # Extract data with fallbacks. YAML turns bare numbers and dates into
+        # those types, which are coerced back to text here, while anything
+        # that can't be is left for validate_post_data to reject.
+        return {
+            "title": PostManager._text(
+                metadata.get(
+                    "title", PostManager._title_from_filename(filename)
+                )
+            ),
+            "slug": PostManager._text(metadata.get("slug")),
+            "excerpt": PostManager._text(metadata.get("excerpt"))
+            or DocumentProcessor.extract_excerpt(clean_content),
+            "markdown_content": clean_content,
+            "published": PostManager._published(
+                metadata.get("published", False)
+            ),
+            "tags": PostManager._normalize_tags(metadata.get("tags", [])),
+        }
+
     @staticmethod
     def create_from_upload(
         content_bytes: bytes, filename: str, author_id: int
@@ -104,41 +238,25 @@ class PostManager:
         from marrow_blog.extensions import db
 
         try:
-            markdown_content = content_bytes.decode("utf-8")
-            metadata, clean_content = DocumentProcessor.process_frontmatter(
-                markdown_content
-            )
-
-            # Extract data with fallbacks
-            title = metadata.get(
-                "title", PostManager._title_from_filename(filename)
+            data = PostManager.parse_upload(content_bytes, filename)
+            title = data["title"]
+            requested_slug = data["slug"]
+            slug = requested_slug or DocumentProcessor.generate_unique_slug(
+                title
             )
-            slug = metadata.get(
-                "slug"
-            ) or DocumentProcessor.generate_unique_slug(title)
-            excerpt = metadata.get(
-                "excerpt"
-            ) or DocumentProcessor.extract_excerpt(clean_content)
-            published = metadata.get("published", False)
-            tags = PostManager._normalize_tags(metadata.get("tags", []))
 
             # Validate data
-            post_data = {
-                "title": title,
-                "slug": slug,
-                "excerpt": excerpt,
-                "published": published,
-                "tags": tags,
-            }
-
-            errors = DocumentProcessor.validate_post_data(post_data)
+            errors = DocumentProcessor.validate_post_data(
+                {**data, "slug": slug}
+            )
             if errors:
                 return False, "; ".join(errors), None
 
-            # Check for existing post
-            existing = Post.query.filter(
-                (Post.title == title) | (Post.slug == slug)
-            ).first()
+            # Check for existing post, generated slugs are handled below
+            conflict = Post.title == title
+            if requested_slug:
+                conflict = conflict | (Post.slug == slug)
+            existing = Post.query.filter(conflict).first()
 
             if existing:
                 return (
@@ -147,21 +265,19 @@ class PostManager:
                     None,
                 )
 
-            # Create post
-            new_post = Post(
-                title=title,
-                slug=slug,
-                excerpt=excerpt,
-                markdown_content=clean_content,
-                published=published,
-                tags=tags,
-                author_id=author_id,
-            )
+            def build(slug):
+                return Post(**{**data, "slug": slug}, author_id=author_id)
 
-            db.session.add(new_post)
-            db.session.commit()
-
-            status = "published" if published else "draft"
+            # Create post
+            if requested_slug:
+                new_post = build(slug)
+                db.session.add(new_post)
+                db.session.commit()
+            else:
+                new_post = DocumentProcessor.create_with_unique_slug(
+                    title, build, slug=slug
+                )
+            status = "published" if data["published"] else "draft"
             return (
                 True,
                 f"Successfully imported '{title}' as {status} post",
@@ -169,14 +285,219 @@ class PostManager:
             )
 
         except UnicodeDecodeError:
-            return (
-                False,
-                "Unable to decode file. Please ensure it's a UTF-8 text file.",
-                None,
-            )
+            return False, DECODE_ERROR, None
         except Exception as e:
             return False, f"Error processing file: {str(e)}", None
 
+    @staticmethod
+    def read_import_files(
+        paths: List[str], max_files: int, max_file_bytes: int
+    ) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+        """
+        Read markdown files, and the markdown inside zip archives, to import.
+
+        :param paths: Uploaded .md and .zip files
+        :param max_files: Most markdown files to accept in total
+        :param max_file_bytes: Largest markdown file to accept
+        :return: List of (filename, content or None, error or None)
+        """
+        files = []
+
+        def add(name, size, read):
+            if len(files) >= max_files:
+                files.append((name, None, f"More than {max_files} files"))
+            elif size > max_file_bytes:
+                files.append((name, None, "File is too large"))
+            else:
+                files.append((name, read(), None))
+
+        for path in paths:
+            name = os.path.basename(path)
+            if zipfile.is_zipfile(path):
+                with zipfile.ZipFile(path) as archive:
+                    for info in archive.infolist():
+                        member = info.filename
+                        if info.is_dir() or not member.lower().endswith(".md"):
+                            continue
+                        # Ignore metadata folders editors and macOS add.
+                        if any(
+                            part.startswith((".", "__MACOSX"))
+                            for part in member.split("/")
+                        ):
+                            continue
+                        add(
+                            member,
+                            info.file_size,
+                            lambda: archive.read(info),
+                        )
+            elif name.lower().endswith(".md"):
+                add(
+                    name,
+                    os.path.getsize(path),
+                    lambda: PostManager._read_file(path),
+                )
+            else:
+                files.append((name, None, "Not a markdown or zip file"))
+
+        return files
+
+    @staticmethod
+    def import_files(
+        files: List[Tuple[str, Optional[bytes], Optional[str]]],
+        author_id: int,
+        chunk_size: int = 50,
+        on_progress: Optional[Callable[[int, int, List[Dict]], None]] = None,
+    ) -> List[Dict]:
+        """
+        Create posts for a batch of markdown files.
+
+        Titles and slugs are checked against the database and each other
+        for the whole batch up front, then posts are inserted chunk_size at
+        a time, one transaction per chunk. A chunk that hits a constraint is
+        retried one post at a time so only the offending files fail.
+
+        :param files: (filename, content, error) from read_import_files
+        :param author_id: Author of every imported post
+        :param chunk_size: Posts per transaction
+        :param on_progress: Called with (done, total, results) per chunk
+        :return: One result dict per file, in order
+        """
+        from marrow_blog.blueprints.posts.models import Post
+        from marrow_blog.extensions import db
+
+        results = [
+            {
+                "filename": name,
+                "status": None,
+                "message": None,
+                "post_id": None,
+            }
+            for name, _, _ in files
+        ]
+        pending = []
+        for result, (name, content, error) in zip(results, files):
+            if error is None:
+                try:
+                    data = PostManager.parse_upload(content, name)
+                    errors = DocumentProcessor.validate_post_data(data)
+                    error = "; ".join(errors) or None
+                except UnicodeDecodeError:
+                    error = DECODE_ERROR
+                except Exception as e:
+                    error = f"Error processing file: {str(e)}"
+            if error:
+                result.update(status="failed", message=error)
+            else:
+                pending.append((result, data))
+
+        titles = [data["title"] for _, data in pending]
+        requested = [data["slug"] for _, data in pending if data["slug"]]
+        existing_titles = PostManager._existing(Post.title, titles)
+        existing_slugs = PostManager._existing(Post.slug, requested)
+        taken = DocumentProcessor.taken_slugs(
+            [slugify(data["title"]) for _, data in pending if not data["slug"]]
+        )
+        taken |= existing_slugs | set(requested)
+
+        ready = []
+        for result, data in pending:
+            title, slug = data["title"], data["slug"]
+            if title in existing_titles or (slug and slug in existing_slugs):
+                result.update(
+                    status="skipped",
+                    message=f"Post with title '{title}' or slug '{slug}' "
+                    "already exists",
+                )
+                continue
+            existing_titles.add(title)
+            generated = not slug
+            if generated:
+                slug = DocumentProcessor.next_free_slug(slugify(title), taken)
+                taken.add(slug)
+            else:
+                existing_slugs.add(slug)
+            ready.append((result, {**data, "slug": slug}, generated))
+
+        done = len(files) - len(ready)
+        for i in range(0, len(ready), chunk_size):
+            chunk = ready[i : i + chunk_size]
+            posts = [Post(**data, author_id=author_id) for _, data, _ in chunk]
+            db.session.add_all(posts)
+            try:
+                db.session.commit()
+            except SQLAlchemyError:
+                # Something raced us or a value didn't fit its column, find
+                # out which files by going slow.
+                db.session.rollback()
+                posts = [
+                    PostManager._import_one(result, data, author_id, generated)
+                    for result, data, generated in chunk
+                ]
+            for (result, _, _), post in zip(chunk, posts):
+                if post is None:
+                    continue
+                status = "published" if post.published else "draft"
+                result.update(
+                    status="created",
+                    message=f"Imported '{post.title}' as {status} post",
+                    post_id=post.id,
+                )
+
+            done += len(chunk)
+            if on_progress:
+                on_progress(done, len(files), results)
+
+        return results
+
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def _existing(column, values) -> Set[str]:
+        """Return which of values are already used in column."""
+        found = set()
+        values = sorted(set(values))
+        for i in range(0, len(values), SLUG_QUERY_CHUNK):
+            chunk = values[i : i + SLUG_QUERY_CHUNK]
+            query = column.class_.query.with_entities(column)
+            found.update(v for (v,) in query.filter(column.in_(chunk)))
+        return found
+
+    @staticmethod
+    def _import_one(
+        result: Dict, data: Dict, author_id: int, generated_slug: bool
+    ):
+        """Insert one post of a failed chunk, recording why it failed."""
+        from marrow_blog.blueprints.posts.models import Post
+        from marrow_blog.extensions import db
+
+        def build(slug):
+            return Post(**{**data, "slug": slug}, author_id=author_id)
+
+        try:
+            if generated_slug:
+                return DocumentProcessor.create_with_unique_slug(
+                    data["title"], build, slug=data["slug"]
+                )
+
+            post = build(data["slug"])
+            db.session.add(post)
+            db.session.commit()
+            return post
+        except IntegrityError as e:
+            db.session.rollback()
+            result.update(status="failed", message=str(e.orig))
+            return None
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            result.update(
+                status="failed",
+                message=f"Error processing file: {getattr(e, 'orig', e)}",
+            )
+            return None
+
     @staticmethod
     def _normalize_tags(tags) -> str:
         """Normalize tags from various formats to comma-separated string."""
@@ -186,9 +507,29 @@ class PostManager:
             )
         elif isinstance(tags, str):
             return tags
+        elif isinstance(tags, (int, float)):
+            return str(tags)
         else:
             return ""
 
+    @staticmethod
+    def _text(value):
+        """Return scalars such as numbers and dates as text."""
+        if value is None or isinstance(value, (str, list, dict)):
+            return value
+        return str(value)
+
+    @staticmethod
+    def _published(value):
+        """Read quoted booleans, other values are left for validation."""
+        if isinstance(value, str) and value.strip().lower() in _TRUE:
+            return True
+        if isinstance(value, str) and value.strip().lower() in _FALSE:
+            return False
+        if value is None or value in (0, 1):
+            return bool(value)
+        return value
+
     @staticmethod
     def _title_from_filename(filename: str) -> str:
         """Generate title from filename."""
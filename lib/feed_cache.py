@@ -0,0 +1,82 @@
+import threading
+from collections import namedtuple
+
+from lib.http_cache import make_etag
+
+CachedFeed = namedtuple("CachedFeed", ["body", "etag"])
+
+
+class FeedCache:
+    """
+    Generated feed documents kept per worker until the published set changes.
+
+    Entries are dropped when the cache generation of its namespace moves,
+    which any worker's write does, or when invalidate() is called.
+    """
+
+    def __init__(self, namespace="feeds"):
+        self.namespace = namespace
+        self._generations = None
+        self._source_generation = None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.builds = 0
+
+    def init_app(self, app, generations=None):
+        """
+        :param app: Flask application instance
+        :param generations: CacheGenerations the feeds are checked against
+        """
+        self._generations = generations
+        app.extensions["feed_cache"] = self
+        self.invalidate()
+
+    def get_or_build(self, name, build):
+        """
+        Return the cached feed, calling build() for its bytes on a miss.
+
+        :param name: Feed name such as "rss"
+        :param build: Callable returning the document as bytes
+        :return: CachedFeed
+        """
+        self._check_generation()
+        feed = self._entries.get(name)
+        if feed is not None:
+            self.hits += 1
+            return feed
+
+        generation = self.generation
+        body = build()
+        feed = CachedFeed(body, make_etag(body))
+        self.builds += 1
+
+        with self._lock:
+            # Don't keep a document built while an invalidation happened.
+            if generation == self.generation:
+                self._entries[name] = feed
+        return feed
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def _check_generation(self):
+        if self._generations is None:
+            return
+
+        current = self._generations.current(self.namespace)
+        if current != self._source_generation:
+            self.invalidate()
+            self._source_generation = current
+
+    def stats(self):
+        return {
+            "entries": sorted(self._entries),
+            "generation": self.generation,
+            "source_generation": self._source_generation,
+            "hits": self.hits,
+            "builds": self.builds,
+        }
@@ -0,0 +1,269 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import suppress
+
+import markdown
+import pygments
+from markdown.extensions import Extension
+from markdown.extensions.codehilite import (
+    CodeHilite,
+    CodeHiliteExtension,
+    parse_hl_lines,
+)
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+from markdown.preprocessors import Preprocessor
+
+from lib.render_cache import RenderCache
+
+log = logging.getLogger(__name__)
+
+# Disk entries live in a directory named for the libraries that produced
+# them, so an upgrade starts empty instead of serving the old markup.
+DISK_VERSION = (
+    f"pygments-{pygments.__version__}-markdown-{markdown.__version__}"
+)
+
+
+class HighlightCache:
+    """
+    Cache of Pygments-highlighted code blocks keyed by content hash.
+
+    A size-bounded in-memory LRU sits in front of an optional directory of
+    one file per block, which survives worker restarts. Once the directory
+    grows past max_disk_bytes (0 for no limit) the least recently used
+    files are deleted.
+    """
+
+    def __init__(
+        self,
+        max_bytes=4 * 1024 * 1024,
+        cache_dir=None,
+        max_disk_bytes=64 * 1024 * 1024,
+    ):
+        self.memory = RenderCache(max_bytes)
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_evictions = 0
+        self._open_dir(cache_dir)
+
+    def init_app(self, app):
+        self.memory.max_bytes = app.config.get(
+            "HIGHLIGHT_CACHE_MAX_BYTES", self.memory.max_bytes
+        )
+        self.memory.clear()
+        self.max_disk_bytes = app.config.get(
+            "HIGHLIGHT_CACHE_DIR_MAX_BYTES", self.max_disk_bytes
+        )
+        self._open_dir(app.config.get("HIGHLIGHT_CACHE_DIR") or None)
+        app.extensions["highlight_cache"] = self
+
+    @staticmethod
+    def make_key(lang, code, options):
+        """Hash (language, code hash, codehilite options) into a file-safe key."""
+        code_hash = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        options = repr(sorted(options.items()))
+        raw = f"{lang}\0{code_hash}\0{options}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def get_or_highlight(self, key, highlight):
+        """Return cached HTML for key, calling highlight() on a miss."""
+        html = self.memory.get(key)
+        if html is not None:
+            return html
+
+        html = self._read(key)
+        if html is None:
+            html = highlight()
+            self._write(key, html)
+        else:
+            self.disk_hits += 1
+            self._touch(key)
+
+        return self.memory.set(key, html)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk_hits = 0
+        self.disk_writes = 0
+
+    def stats(self):
+        return {
+            **self.memory.stats(),
+            "disk_enabled": self.cache_dir is not None,
+            "disk_bytes": self.disk_bytes,
+            "max_disk_bytes": self.max_disk_bytes,
+            "disk_hits": self.disk_hits,
+            "disk_writes": self.disk_writes,
+            "disk_evictions": self.disk_evictions,
+        }
+
+    def _open_dir(self, cache_dir):
+        """Use cache_dir's directory for this version, removing older ones."""
+        self.cache_dir = cache_dir
+        self.disk_dir = None
+        self.disk_bytes = 0
+        if not cache_dir:
+            return
+
+        self.disk_dir = os.path.join(cache_dir, DISK_VERSION)
+        os.makedirs(self.disk_dir, exist_ok=True)
+        for entry in os.scandir(cache_dir):
+            stale = entry.name.startswith("pygments-")
+            if stale and entry.name != DISK_VERSION:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        self._prune()
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.html")
+
+    def _read(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            log.warning(f"Couldn't read highlight cache entry {key}: {e}")
+            return None
+
+    def _touch(self, key):
+        """Mark a disk entry as recently used, which pruning goes by."""
+        with suppress(OSError):
+            os.utime(self._path(key))
+
+    def _write(self, key, html):
+        if not self.disk_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, self._path(key))
+            self.disk_writes += 1
+        except OSError as e:
+            log.warning(f"Couldn't write highlight cache entry {key}: {e}")
+            return
+
+        self.disk_bytes += len(html.encode("utf-8"))
+        if self.max_disk_bytes and self.disk_bytes > self.max_disk_bytes:
+            self._prune()
+
+    def _prune(self):
+        """
+        Measure the directory and, when it's over max_disk_bytes, delete the
+        least recently used files until it's down to three quarters of it.
+
+        Every worker writes to the same directory, so this counts the files
+        rather than trusting disk_bytes, which only adds up its own writes.
+        """
+        entries = []
+        try:
+            with os.scandir(self.disk_dir) as scan:
+                for entry in scan:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            log.warning(f"Couldn't measure {self.disk_dir}: {e}")
+            return
+
+        total = sum(size for _, size, _ in entries)
+        if self.max_disk_bytes and total > self.max_disk_bytes:
+            target = self.max_disk_bytes * 3 // 4
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                # Another worker may have pruned it first.
+                with suppress(FileNotFoundError):
+                    os.remove(path)
+                total -= size
+                self.disk_evictions += 1
+        self.disk_bytes = total
+
+
+class CachedFencedBlockPreprocessor(Preprocessor):
+    """
+    Highlight fenced code blocks through a HighlightCache.
+
+    Runs just before fenced_code and produces the same markup for the plain
+    ```lang and hl_lines="..." forms. Blocks using the {attrs} form are left
+    for fenced_code, which handles their ids and classes.
+    """
+
+    def __init__(self, md, cache):
+        super().__init__(md)
+        self.cache = cache
+        self.codehilite_conf = None
+
+    def run(self, lines):
+        conf = self._codehilite_conf()
+        if not conf or not conf["use_pygments"]:
+            return lines
+
+        text = "\n".join(lines)
+        index = 0
+        while True:
+            m = FencedBlockPreprocessor.FENCED_BLOCK_RE.search(text, index)
+            if not m:
+                break
+            if m.group("attrs"):
+                index = m.end()
+                continue
+
+            lang = m.group("lang") or None
+            code = m.group("code")
+            local_config = conf.copy()
+            if m.group("hl_lines"):
+                local_config["hl_lines"] = parse_hl_lines(m.group("hl_lines"))
+
+            key = self.cache.make_key(lang, code, local_config)
+            html = self.cache.get_or_highlight(
+                key, lambda: self._highlight(code, lang, local_config.copy())
+            )
+
+            placeholder = self.md.htmlStash.store(html)
+            text = f"{text[: m.start()]}\n{placeholder}\n{text[m.end() :]}"
+            index = m.start() + 1 + len(placeholder)
+
+        return text.split("\n")
+
+    def _codehilite_conf(self):
+        if self.codehilite_conf is None:
+            self.codehilite_conf = {}
+            for ext in self.md.registeredExtensions:
+                if isinstance(ext, CodeHiliteExtension):
+                    self.codehilite_conf = ext.getConfigs()
+        return self.codehilite_conf
+
+    @staticmethod
+    def _highlight(code, lang, config):
+        highlighter = CodeHilite(
+            code,
+            lang=lang,
+            style=config.pop("pygments_style", "default"),
+            **config,
+        )
+        return highlighter.hilite(shebang=False)
+
+
+class HighlightCacheExtension(Extension):
+    """Route fenced code highlighting through a HighlightCache."""
+
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def extendMarkdown(self, md):
+        md.preprocessors.register(
+            CachedFencedBlockPreprocessor(md, self.cache),
+            "cached_fenced_code_block",
+            26,
+        )
@@ -0,0 +1,67 @@
+import hashlib
+import json
+
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+
+def make_etag(*parts):
+    """Build a strong ETag value from the parts a response is derived from."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode("utf-8")
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def layout_version(app, manifests):
+    """
+    Digest the templates and static asset manifest pages are built from.
+
+    A deploy that changes either produces new ETags for every page.
+
+    :param app: Flask application instance
+    :param manifests: Flask-Static-Digest manifests
+    :return: str
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(manifests, sort_keys=True).encode("utf-8"))
+    env = app.jinja_env
+    for name in sorted(env.list_templates()):
+        source, _, _ = env.loader.get_source(env, name)
+        digest.update(name.encode("utf-8"))
+        digest.update(source.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def is_conditional():
+    """Return True if the client sent a validator we can answer with a 304."""
+    return bool(request.if_none_match) or request.if_modified_since is not None
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Return a 304 response if the request's validators still match.
+
+    :param etag: Current strong ETag
+    :param last_modified: Current Last-Modified datetime
+    :return: Flask response or None
+    """
+    if is_resource_modified(
+        request.environ, etag=etag, last_modified=last_modified
+    ):
+        return None
+
+    response = current_app.response_class(status=304)
+    return set_validators(response, etag, last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach ETag/Last-Modified and ask clients to revalidate on reuse."""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
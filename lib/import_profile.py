@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+# "import time:       412 |        935 |   flask.app"
+_PREFIX = "import time:"
+
+
+def parse_importtime(output):
+    """
+    Parse the stderr of `python -X importtime` into per-module timings.
+
+    :param output: Captured stderr
+    :return: Dict of module name to (self_us, cumulative_us, depth), where
+        depth 0 is a module the profiled code imported itself
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith(_PREFIX):
+            continue
+        fields = line[len(_PREFIX) :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The "self [us] | cumulative | imported package" header.
+
+        # One space after the bar, then two per level of nesting.
+        name = fields[2][1:].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(fields[0]), int(fields[1]), depth)
+    return modules
+
+
+def profile_imports(code):
+    """
+    Run code in a fresh interpreter with -X importtime.
+
+    :param code: Python source passed to `python -c`
+    :return: Dict as returned by parse_importtime
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def total_ms(modules):
+    """Return the import time of the modules the profiled code asked for."""
+    cumulative = sum(us for _, us, depth in modules.values() if depth == 0)
+    return cumulative / 1000
+
+
+def heaviest(modules, limit=15):
+    """Return (name, cumulative_ms) of the costliest top-level packages."""
+    packages = {}
+    for name, (_, cumulative, _) in modules.items():
+        top = name.split(".", 1)[0]
+        if name == top:
+            packages[top] = max(packages.get(top, 0), cumulative)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return [(name, us / 1000) for name, us in ranked[:limit]]
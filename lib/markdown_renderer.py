@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+import markdown
+from flask import current_app, has_app_context
+
+from lib.highlight_cache import HighlightCacheExtension
+from lib.request_metrics import record_phase
+
+# Building a Markdown instance loads and registers every extension, so each
+# thread keeps one per extension setup and resets it between documents.
+_local = threading.local()
+
+
+def extension_configs_for(extensions: List, configs: Dict) -> Dict:
+    """
+    Match extension configs to the extension names they were listed under.
+
+    FLATPAGES_EXTENSION_CONFIGS is keyed by short names ("codehilite") while
+    FLATPAGES_MARKDOWN_EXTENSIONS uses dotted paths, and Markdown only applies
+    configs whose key is exactly the listed name.
+    """
+    matched = {}
+    for extension in extensions:
+        if not isinstance(extension, str):
+            continue
+        short_name = extension.rsplit(".", 1)[-1]
+        if extension in configs:
+            matched[extension] = configs[extension]
+        elif short_name in configs:
+            matched[extension] = configs[short_name]
+    return matched
+
+
+def render_markdown(
+    text: Optional[str],
+    extensions: Optional[List] = None,
+    extension_configs: Optional[Dict] = None,
+    highlight_cache=None,
+) -> str:
+    """
+    Render markdown to HTML using the app's FLATPAGES_* markdown settings.
+
+    :param text: Markdown source
+    :param extensions: Override FLATPAGES_MARKDOWN_EXTENSIONS
+    :param extension_configs: Override FLATPAGES_EXTENSION_CONFIGS
+    :param highlight_cache: Override the app's HighlightCache
+    :return: HTML
+    """
+    if extensions is None:
+        extensions = current_app.config["FLATPAGES_MARKDOWN_EXTENSIONS"]
+    if extension_configs is None:
+        extension_configs = current_app.config["FLATPAGES_EXTENSION_CONFIGS"]
+    if highlight_cache is None and has_app_context():
+        highlight_cache = current_app.extensions.get("highlight_cache")
+
+    started = time.perf_counter()
+    md = get_markdown(extensions, extension_configs, highlight_cache)
+    try:
+        return md.convert(text or "")
+    finally:
+        md.reset()
+        record_phase("render", time.perf_counter() - started)
+
+
+def get_markdown(
+    extensions: List, extension_configs: Dict, highlight_cache=None
+):
+    """Return this thread's Markdown instance for the given extensions."""
+    instances = getattr(_local, "instances", None)
+    if instances is None:
+        instances = _local.instances = {}
+
+    key = (tuple(extensions), repr(extension_configs), id(highlight_cache))
+    md = instances.get(key)
+    if md is None:
+        if highlight_cache is not None:
+            extensions = [
+                *extensions,
+                HighlightCacheExtension(highlight_cache),
+            ]
+        md = instances[key] = markdown.Markdown(
+            extensions=extensions,
+            extension_configs=extension_configs_for(
+                extensions, extension_configs
+            ),
+        )
+    return md
@@ -0,0 +1,49 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row on a page as an opaque token."""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """
+    Decode a token from encode_cursor back into its sort key values.
+
+    :param cursor: Token from a previous page's next_cursor
+    :param size: Number of values the cursor must hold
+    :return: List of values
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Malformed cursor")
+    return values
+
+
+def parse_cursor_datetime(value):
+    """
+    Parse an ISO 8601 timestamp taken from a cursor.
+
+    SQLite hands back naive datetimes for timezone aware columns, so naive
+    values are taken to be UTC like everything the app stores.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
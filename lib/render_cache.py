@@ -0,0 +1,89 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+class RenderCache:
+    """
+    Size-bounded LRU cache for rendered markdown, local to each worker.
+
+    Keys should change whenever the source changes, e.g. (post id,
+    updated_on), so edits never need an explicit invalidation.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get(
+            "RENDER_CACHE_MAX_BYTES", self.max_bytes
+        )
+        self.clear()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+
+            self._entries[key] = (value, size)
+            self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+        return value
+
+    def get_or_render(self, key, render):
+        """Return the cached value for key, calling render() on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = self.set(key, render())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._reset_counters()
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _reset_counters(self):
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _sizeof(value):
+        if isinstance(value, (tuple, list)):
+            return sum(sys.getsizeof(item) for item in value)
+        return sys.getsizeof(value)
@@ -0,0 +1,151 @@
+import logging
+import time
+
+from flask import (
+    before_render_template,
+    g,
+    has_app_context,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+# Phases reported in Server-Timing besides the request total.
+PHASES = ("db", "render", "template")
+
+
+def record_phase(name, seconds):
+    """Add time spent in a phase to the current request's metrics."""
+    if has_app_context():
+        metrics = g.get("request_metrics")
+        if metrics is not None:
+            metrics[name] += seconds
+
+
+class RequestMetrics:
+    """
+    Per-request SQL statement counts and time spent per phase.
+
+    SQL is timed with cursor execute events on the app's engine, templates
+    with Flask's render signals and markdown through record_phase(). Each
+    response gets a Server-Timing header, and requests over the statement
+    or duration budget are logged with their endpoint.
+    """
+
+    def __init__(self):
+        self.send_header = False
+        self.server_timing = False
+        self.statement_budget = None
+        self.duration_budget_ms = None
+
+    def init_app(self, app, engine):
+        self.send_header = app.config.get("SQL_STATEMENTS_HEADER", False)
+        self.server_timing = app.config.get("SERVER_TIMING_HEADER", False)
+        self.statement_budget = app.config.get("REQUEST_STATEMENT_BUDGET")
+        self.duration_budget_ms = app.config.get("REQUEST_DURATION_BUDGET_MS")
+
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._execute_failed)
+        before_render_template.connect(self._before_template, app)
+        template_rendered.connect(self._after_template, app)
+        app.before_request(self._start)
+        app.after_request(self._report)
+        app.extensions["request_metrics"] = self
+
+    @staticmethod
+    def current():
+        """Return this request's metrics, or None outside a request."""
+        return g.get("request_metrics") if has_app_context() else None
+
+    @staticmethod
+    def statements():
+        """Return the number of statements run so far in this request."""
+        metrics = RequestMetrics.current()
+        return metrics["statements"] if metrics else 0
+
+    @staticmethod
+    def _start():
+        g.request_metrics = {
+            "statements": 0,
+            "started": time.perf_counter(),
+            **{phase: 0.0 for phase in PHASES},
+        }
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_execute(conn, cursor, statement, parameters, context, many):
+        started = conn.info.get("query_started")
+        if not started:
+            return
+
+        elapsed = time.perf_counter() - started.pop()
+        metrics = RequestMetrics.current()
+        if metrics is not None:
+            metrics["statements"] += 1
+            metrics["db"] += elapsed
+
+    @staticmethod
+    def _execute_failed(context):
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+    @staticmethod
+    def _before_template(app, template, context, **extra):
+        metrics = RequestMetrics.current()
+        if metrics is not None:
+            metrics.setdefault("template_started", []).append(
+                time.perf_counter()
+            )
+
+    @staticmethod
+    def _after_template(app, template, context, **extra):
+        metrics = RequestMetrics.current()
+        if metrics and metrics.get("template_started"):
+            started = metrics["template_started"].pop()
+            metrics["template"] += time.perf_counter() - started
+
+    def _report(self, response):
+        metrics = self.current()
+        if metrics is None:
+            return response
+
+        total_ms = (time.perf_counter() - metrics["started"]) * 1000
+        statements = metrics["statements"]
+        endpoint = request.endpoint or "-"
+        log.debug(
+            f"{request.method} {request.path} ({endpoint}): "
+            f"{statements} SQL in {metrics['db'] * 1000:.1f}ms, "
+            f"{total_ms:.1f}ms total"
+        )
+
+        over_statements = (
+            self.statement_budget and statements > self.statement_budget
+        )
+        over_duration = (
+            self.duration_budget_ms and total_ms > self.duration_budget_ms
+        )
+        if over_statements or over_duration:
+            log.warning(
+                f"Request over budget: {request.method} {request.path} "
+                f"({endpoint}) ran {statements} SQL statements "
+                f"in {metrics['db'] * 1000:.1f}ms, "
+                f"{total_ms:.1f}ms total"
+            )
+
+        if self.server_timing:
+            timings = [
+                f"{phase};dur={metrics[phase] * 1000:.1f}" for phase in PHASES
+            ]
+            timings[0] += f';desc="{statements} queries"'
+            timings.append(f"total;dur={total_ms:.1f}")
+            response.headers.add("Server-Timing", ", ".join(timings))
+        if self.send_header:
+            response.headers["X-SQL-Statements"] = str(statements)
+        return response
@@ -0,0 +1,252 @@
+import glob
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+# Only statements SQLite can EXPLAIN without side effects get a plan.
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# "SCAN posts" (or "SCAN TABLE posts" before SQLite 3.36), or a walk of a
+# whole index such as "SCAN posts USING COVERING INDEX ix_posts_slug" that
+# SQLite picks for an unfiltered ORDER BY. SEARCH lines use the index.
+_FULL_SCAN = re.compile(
+    r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?"
+    r"(?: USING (?:COVERING )?INDEX \w+)?$"
+)
+
+
+def redact(parameters):
+    """
+    Replace bound string and binary values with their type and length.
+
+    Numbers, booleans and NULLs are kept since ids and limits help explain
+    a plan and don't leak content.
+    """
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple, dict)):
+        return redact(value)
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def full_scans(plan, tables=None):
+    """
+    Return the tables an EXPLAIN QUERY PLAN reads without an index.
+
+    :param plan: Plan lines as recorded by SlowQueryLog
+    :param tables: Only report these names, which skips scans of CTEs
+    :return: Sorted list of table names
+    """
+    scanned = set()
+    for line in plan:
+        match = _FULL_SCAN.match(line.strip())
+        if match and (tables is None or match.group(1) in tables):
+            scanned.add(match.group(1))
+    return sorted(scanned)
+
+
+def process_path(path, pid):
+    """Return the file a process writes to, "slow-queries-<pid>.log"."""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{pid}{ext}"
+
+
+def log_files(path):
+    """
+    Return every file recorded under path, oldest rotation first.
+
+    That's path itself plus each process's file from process_path(),
+    along with their rotated backups.
+    """
+    root, ext = os.path.splitext(path)
+    processes = sorted(
+        name
+        for name in glob.glob(glob.escape(root) + "-*" + glob.escape(ext))
+        if name[len(root) + 1 : len(name) - len(ext)].isdigit()
+    )
+
+    files = []
+    for current in [path] + processes:
+        backups = sorted(
+            glob.glob(glob.escape(current) + ".[0-9]*"),
+            key=lambda name: int(name.rsplit(".", 1)[1]),
+            reverse=True,
+        )
+        files += backups + [current]
+    return [file for file in files if os.path.exists(file)]
+
+
+def read_entries(path):
+    """Yield recorded slow queries from every process's log files."""
+    for file in log_files(path):
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarize(entries, tables=None):
+    """
+    Group slow queries by statement, worst total time first.
+
+    :param entries: Recorded slow queries
+    :param tables: Table names used to flag full scans
+    :return: List of dicts
+    """
+    groups = {}
+    for entry in entries:
+        sql = " ".join(entry["sql"].split())
+        group = groups.setdefault(
+            sql,
+            {
+                "sql": sql,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "views": set(),
+                "plan": [],
+            },
+        )
+        group["count"] += 1
+        group["total_ms"] += entry["ms"]
+        group["max_ms"] = max(group["max_ms"], entry["ms"])
+        group["views"].add(entry.get("view") or "-")
+        group["plan"] = entry.get("plan") or group["plan"]
+
+    summary = sorted(
+        groups.values(), key=lambda group: group["total_ms"], reverse=True
+    )
+    for group in summary:
+        group["views"] = sorted(group["views"])
+        group["full_scans"] = full_scans(group["plan"], tables)
+    return summary
+
+
+class SlowQueryLog:
+    """
+    Record statements slower than a threshold with their query plan.
+
+    Each entry is a JSON line with the SQL, redacted parameters, the view
+    that ran it and SQLite's EXPLAIN QUERY PLAN output. Every process, be
+    it a gunicorn worker or the Celery worker, writes its own file next to
+    SLOW_QUERY_LOG since rotating a file shared between processes loses
+    entries. Each rotates at MAX_BYTES and `flask db-perf report`
+    summarizes them all.
+    """
+
+    MAX_BYTES = 1024 * 1024
+    BACKUP_COUNT = 3
+
+    def __init__(self):
+        self.threshold_ms = 0
+        self.path = None
+        self._handler = None
+        self._pid = None
+
+    def init_app(self, app, engine):
+        self.threshold_ms = app.config.get("SLOW_QUERY_MS", 0)
+        self.path = app.config.get("SLOW_QUERY_LOG")
+        app.extensions["slow_query_log"] = self
+
+        if self.threshold_ms and self.path:
+            self.listen(engine)
+
+    def listen(self, engine):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._execute_failed)
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("slow_query_started", []).append(
+            time.perf_counter()
+        )
+
+    def _after_execute(
+        self, conn, cursor, statement, parameters, context, many
+    ):
+        started = conn.info.get("slow_query_started")
+        if not started:
+            return
+
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        if many and parameters:
+            parameters = parameters[0]
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "ms": round(elapsed_ms, 2),
+            "view": request.endpoint if has_request_context() else None,
+            "sql": statement,
+            "params": redact(parameters),
+            "plan": self._explain(cursor, statement, parameters),
+        }
+        record = logging.makeLogRecord({"msg": json.dumps(entry)})
+        self._process_handler().handle(record)
+
+    def _process_handler(self):
+        # Opened on first use in each process, so a worker forked from a
+        # preloaded master doesn't write through the master's handler.
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid = pid
+            self._handler = RotatingFileHandler(
+                process_path(self.path, pid),
+                maxBytes=self.MAX_BYTES,
+                backupCount=self.BACKUP_COUNT,
+                encoding="utf-8",
+                delay=True,
+            )
+        return self._handler
+
+    @staticmethod
+    def _execute_failed(context):
+        started = context.connection.info.get("slow_query_started")
+        if started:
+            started.pop()
+
+    @staticmethod
+    def _explain(cursor, statement, parameters):
+        words = statement.lstrip().split(None, 1)
+        if not words or words[0].upper() not in EXPLAINABLE:
+            return []
+
+        # A separate DBAPI cursor so the plan isn't counted or timed itself.
+        try:
+            rows = cursor.connection.execute(
+                f"EXPLAIN QUERY PLAN {statement}", parameters or ()
+            ).fetchall()
+        except Exception as e:
+            log.debug(f"Could not explain slow query: {e}")
+            return []
+
+        depth = {0: -1}
+        plan = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            plan.append("  " * depth[node_id] + detail)
+        return plan
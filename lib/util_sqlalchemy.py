@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, event
 from sqlalchemy.types import TypeDecorator
 
 from marrow_blog.extensions import db
@@ -13,6 +13,69 @@ def tzware_datetime():
     return datetime.datetime.now(datetime.timezone.utc)
 
 
+SQLITE_SYNCHRONOUS_LEVELS = {"off": 0, "normal": 1, "full": 2, "extra": 3}
+
+
+def set_sqlite_pragmas(engine, pragmas):
+    """
+    Apply PRAGMA statements to every new DBAPI connection of a SQLite engine.
+
+    :param engine: SQLAlchemy engine
+    :param pragmas: Mapping of pragma name to value
+    :return: None
+    """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return None
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    return None
+
+
+def sqlite_pragma_mismatches(connection, pragmas):
+    """
+    Compare a connection's effective pragmas against the configured ones.
+
+    :param connection: SQLAlchemy connection
+    :param pragmas: Mapping of pragma name to expected value
+    :return: Dict of name to (expected, actual) for every mismatch
+    """
+    if connection.dialect.name != "sqlite":
+        return {}
+
+    mismatches = {}
+    for name, expected in pragmas.items():
+        actual = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+        if name == "synchronous" and isinstance(expected, str):
+            expected = SQLITE_SYNCHRONOUS_LEVELS.get(expected.lower())
+        if str(actual).lower() != str(expected).lower():
+            mismatches[name] = (expected, actual)
+    return mismatches
+
+
+def dispose_engines(app):
+    """
+    Give a forked process its own connection pools.
+
+    Pooled connections inherited from the parent are dropped without being
+    closed, close=False, so the parent can keep using them. New ones are
+    opened on first use.
+
+    :param app: Flask app built before the fork
+    :return: None
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    return None
+
+
 class AwareDateTime(TypeDecorator):
     impl = DateTime(timezone=True)
     cache_ok = True
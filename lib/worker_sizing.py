@@ -0,0 +1,192 @@
+import math
+import os
+from collections import namedtuple
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# cgroup v1 reports "no limit" as a huge page-aligned number.
+_V1_UNLIMITED = 1 << 60
+
+# Measured with bin/bench-memory on warmed workers: each worker's unique
+# memory, and what the master plus the pages shared with it add once.
+WORKER_MB = {False: 48, True: 20}
+BASE_MB = {False: 25, True: 60}
+
+# Kept free for SQLite's mmap and the kernel's page cache.
+MEMORY_HEADROOM = 0.25
+
+MAX_THREADS = 4
+
+
+class Layout(
+    namedtuple(
+        "Layout",
+        [
+            "workers",
+            "threads",
+            "cpus",
+            "cpu_source",
+            "memory_mb",
+            "memory_source",
+            "worker_mb",
+            "limited_by",
+        ],
+    )
+):
+    """
+    Workers and threads per worker for the CPUs and memory available.
+
+    worker_mb is one worker's expected footprint at this many threads and
+    limited_by is "cpu" or "memory".
+    """
+
+    __slots__ = ()
+
+    def describe(self, workers=None, threads=None):
+        """Return a log line, noting any values overridden by env vars."""
+        memory = (
+            f"{self.memory_mb:.0f} MB ({self.memory_source})"
+            if self.memory_mb
+            else "no memory limit"
+        )
+        line = (
+            f"Sized for {self.cpus:g} CPUs ({self.cpu_source}) and {memory}: "
+            f"{self.workers} workers x {self.threads} threads at "
+            f"~{self.worker_mb:.0f} MB each, limited by {self.limited_by}"
+        )
+        if workers is not None and workers != self.workers:
+            line += f", WEB_CONCURRENCY sets {workers} workers"
+        if threads is not None and threads != self.threads:
+            line += f", PYTHON_MAX_THREADS sets {threads} threads"
+        return line
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit(root=CGROUP_ROOT):
+    """
+    Return (cpus, source) for the CPUs this process can use.
+
+    A cgroup CPU quota below the CPUs it may be scheduled on wins, so a
+    container capped at 1.5 CPUs on an 8 core host reports 1.5.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus, source = len(os.sched_getaffinity(0)), "cpu affinity"
+    else:
+        cpus, source = os.cpu_count() or 1, "cpu count"
+
+    quota = None
+    v2 = _read(os.path.join(root, "cpu.max"))
+    if v2:
+        limit, _, period = v2.partition(" ")
+        if limit != "max" and period:
+            quota, quota_source = int(limit) / int(period), "cgroup v2"
+    else:
+        for directory in ("cpu", "cpu,cpuacct"):
+            limit = _read(os.path.join(root, directory, "cpu.cfs_quota_us"))
+            period = _read(os.path.join(root, directory, "cpu.cfs_period_us"))
+            if limit and period and int(limit) > 0:
+                quota, quota_source = int(limit) / int(period), "cgroup v1"
+                break
+
+    if quota is not None and quota < cpus:
+        return quota, quota_source
+    return cpus, source
+
+
+def memory_limit(root=CGROUP_ROOT):
+    """
+    Return (megabytes, source) of memory this process can use.
+
+    The cgroup limit wins when it's below physical memory, which is the
+    only limit inside a VM such as a Fly machine.
+    """
+    try:
+        physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        physical = None
+
+    limit, source = None, None
+    v2 = _read(os.path.join(root, "memory.max"))
+    if v2:
+        if v2 != "max":
+            limit, source = int(v2), "cgroup v2"
+    else:
+        v1 = _read(os.path.join(root, "memory", "memory.limit_in_bytes"))
+        if v1 and int(v1) < _V1_UNLIMITED:
+            limit, source = int(v1), "cgroup v1"
+
+    if limit is not None and (physical is None or limit < physical):
+        return limit / 1024 / 1024, source
+    if physical is not None:
+        return physical / 1024 / 1024, "physical memory"
+    return None, None
+
+
+def sqlite_cache_mb(cache_size, page_size=4096):
+    """Return the MB a connection's page cache grows to, from its pragma."""
+    if cache_size < 0:
+        return -cache_size / 1024
+    return cache_size * page_size / 1024 / 1024
+
+
+def plan(
+    cpus,
+    memory_mb,
+    worker_mb,
+    thread_mb,
+    base_mb,
+    cpu_source="",
+    memory_source="",
+):
+    """
+    Return the Layout that keeps the CPUs busy within the memory limit.
+
+    Two workers per CPU like before, as long as they fit in memory after
+    headroom. When they don't, workers are traded for threads, which cost
+    only their SQLite page cache, to keep the most requests in flight.
+
+    :param cpus: CPUs available, possibly fractional
+    :param memory_mb: Memory limit or None
+    :param worker_mb: One single threaded worker's footprint
+    :param thread_mb: What each further thread adds
+    :param base_mb: The master and memory shared by every worker
+    :return: Layout
+    """
+    target = max(1, round(cpus * 2))
+
+    def layout(workers, threads, limited_by):
+        return Layout(
+            workers,
+            threads,
+            cpus,
+            cpu_source,
+            memory_mb,
+            memory_source,
+            worker_mb + (threads - 1) * thread_mb,
+            limited_by,
+        )
+
+    if memory_mb is None:
+        return layout(target, 1, "cpu")
+
+    budget = memory_mb * (1 - MEMORY_HEADROOM) - base_mb
+    best, in_flight = (1, 1), 0
+    for threads in range(1, MAX_THREADS + 1):
+        footprint = worker_mb + (threads - 1) * thread_mb
+        workers = min(math.ceil(target / threads), int(budget // footprint))
+        if workers > 0 and min(workers * threads, target) > in_flight:
+            best, in_flight = (
+                (workers, threads),
+                min(workers * threads, target),
+            )
+
+    if best == (target, 1):
+        return layout(target, 1, "cpu")
+    return layout(*best, "memory")
@@ -1,22 +1,33 @@
-from celery import Celery, Task
 from flask import Flask
 from werkzeug.debug import DebuggedApplication
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 from cli.commands.cmd_admin import admin_cli
+from cli.commands.cmd_db_perf import db_perf_cli
+from cli.commands.cmd_posts import posts_cli
+from cli.commands.cmd_search import search_cli
+from lib.http_cache import layout_version
+from lib.util_sqlalchemy import set_sqlite_pragmas
 from marrow_blog.blueprints.admin import admin
 from marrow_blog.blueprints.admin.models import AdminUser
 from marrow_blog.blueprints.api.v1.post_views import PostView
 from marrow_blog.blueprints.api.v1.upload_views import UploadView
 from marrow_blog.blueprints.feeds import feeds
 from marrow_blog.blueprints.page import page
+from marrow_blog.blueprints.posts.summaries import published_index
 from marrow_blog.blueprints.up import up
 from marrow_blog.extensions import (
+    cache_generations,
     db,
+    feed_cache,
     flask_static_digest,
     flat_pages,
+    highlight_cache,
     login_manager,
     marshmallow,
+    render_cache,
+    request_metrics,
+    slow_query_log,
 )
 
 
@@ -28,7 +39,12 @@ def create_celery_app(app=None):
     :param app: Flask app
     :return: Celery app
     """
-    app = app or create_app()
+    # Celery and kombu take a while to import and only workers and the
+    # admin import views need them, see celery_for().
+    from celery import Celery, Task
+
+    if app is None:
+        return celery_for(create_app())
 
     class FlaskTask(Task):
         def __call__(self, *args, **kwargs):
@@ -43,6 +59,22 @@ def create_celery_app(app=None):
     return celery
 
 
+def celery_for(app):
+    """
+    Return the app's Celery app, creating it the first time it's needed.
+
+    Web processes only need Celery to queue an import or look up its
+    progress, so create_app() leaves it out.
+
+    :param app: Flask app
+    :return: Celery app
+    """
+    celery = app.extensions.get("celery")
+    if celery is None:
+        celery = create_celery_app(app)
+    return celery
+
+
 def create_app(settings_override=None):
     """
     Create a Flask application using the app factory pattern.
@@ -80,7 +112,13 @@ def create_app(settings_override=None):
     UploadView.register(app)
 
     extensions(app)
+    app.config.setdefault(
+        "LAYOUT_VERSION", layout_version(app, flask_static_digest.manifests)
+    )
     app.cli.add_command(admin_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(db_perf_cli)
+    app.cli.add_command(posts_cli)
     authentication(app, AdminUser)
 
     return app
@@ -93,12 +131,20 @@ def extensions(app):
     :param app: Flask application instance
     :return: None
     """
-    # debug_toolbar.init_app(app)
     db.init_app(app)
+    with app.app_context():
+        set_sqlite_pragmas(db.engine, app.config.get("SQLITE_PRAGMAS"))
+        request_metrics.init_app(app, db.engine)
+        slow_query_log.init_app(app, db.engine)
     flask_static_digest.init_app(app)
     login_manager.init_app(app)
     marshmallow.init_app(app)
     flat_pages.init_app(app)
+    render_cache.init_app(app)
+    highlight_cache.init_app(app)
+    cache_generations.init_app(app)
+    feed_cache.init_app(app, cache_generations)
+    published_index.init_app(app)
     return None
 
 
@@ -132,4 +178,16 @@ def middleware(app):
     return None
 
 
-celery_app = create_celery_app()
+def __getattr__(name):
+    """
+    Build celery_app on first use, for `celery -A marrow_blog.app.celery_app`.
+
+    Creating it at import time built a whole Flask app in every process
+    that imported this module, including gunicorn and the flask CLI, which
+    then build their own.
+    """
+    if name == "celery_app":
+        celery_app = create_celery_app()
+        globals()["celery_app"] = celery_app
+        return celery_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
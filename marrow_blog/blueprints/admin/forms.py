@@ -1,9 +1,19 @@
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileRequired
-from wtforms import PasswordField, StringField, SubmitField
+from wtforms import (
+    MultipleFileField,
+    PasswordField,
+    SelectField,
+    StringField,
+    SubmitField,
+)
 from wtforms.validators import DataRequired, Length, Optional
 
-from marrow_blog.blueprints.admin.validations import allowed_file
+from marrow_blog.blueprints.admin.validations import (
+    allowed_file,
+    allowed_import_files,
+)
+from marrow_blog.blueprints.posts.batch import BATCH_ACTIONS
 
 
 class UploadForm(FlaskForm):
@@ -13,6 +23,22 @@ class UploadForm(FlaskForm):
     submit = SubmitField("Upload a Document")
 
 
+class ImportForm(FlaskForm):
+    doc_files = MultipleFileField(
+        "Markdown Files or Zip Archives", [allowed_import_files]
+    )
+    submit = SubmitField("Import")
+
+
+class BatchForm(FlaskForm):
+    # The selected post ids come from the dashboard's post_ids checkboxes.
+    action = SelectField(
+        "With selected",
+        choices=[(action, action.capitalize()) for action in BATCH_ACTIONS],
+    )
+    submit = SubmitField("Apply")
+
+
 class LoginForm(FlaskForm):
     username = StringField("Username", validators=[DataRequired()])
     password = PasswordField("Password", validators=[DataRequired()])
@@ -0,0 +1,42 @@
+import shutil
+
+from celery import shared_task
+from flask import current_app
+
+from lib.document_processor import PostManager
+
+
+@shared_task(bind=True)
+def import_posts(self, directory, paths, author_id):
+    """
+    Import uploaded markdown and zip files as posts, reporting progress.
+
+    :param directory: Upload directory, removed once the import finishes
+    :param paths: Uploaded files inside directory
+    :param author_id: Author of every imported post
+    :return: Dict of done, total and per-file results
+    """
+    config = current_app.config
+
+    def progress(done, total, results):
+        self.update_state(
+            state="PROGRESS",
+            meta={"done": done, "total": total, "results": results},
+        )
+
+    try:
+        files = PostManager.read_import_files(
+            paths,
+            config["IMPORT_MAX_FILES"],
+            config["IMPORT_MAX_FILE_BYTES"],
+        )
+        results = PostManager.import_files(
+            files,
+            author_id,
+            chunk_size=config["IMPORT_CHUNK_SIZE"],
+            on_progress=progress if self.request.id else None,
+        )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {"done": len(results), "total": len(results), "results": results}
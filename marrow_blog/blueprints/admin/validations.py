@@ -13,3 +13,18 @@ def allowed_file(form, field):
         raise ValidationError(
             f"File must be one of the following file extensions: {str(extensions)}"
         )
+
+
+def allowed_import_files(form, field):
+    extensions = current_app.config["IMPORT_ALLOWED_EXTENSIONS"]
+    files = [f for f in field.data or [] if f and f.filename]
+    if not files:
+        raise ValidationError("Select at least one file.")
+    for f in files:
+        if not (
+            "." in f.filename
+            and f.filename.rsplit(".", 1)[1].lower() in extensions
+        ):
+            raise ValidationError(
+                f"Files must be one of the following file extensions: {str(extensions)}"
+            )
@@ -1,13 +1,28 @@
-import pyotp  # Uncomment if you implement pyotp for MFA
-from flask import Blueprint, flash, redirect, render_template, url_for
+import os
+import uuid
+
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask_login import current_user, login_required, login_user, logout_user
+from werkzeug.utils import secure_filename
 
 from lib.document_processor import PostManager
+from marrow_blog.blueprints.posts.batch import apply_batch
 from marrow_blog.blueprints.posts.models import Post
 
-from .forms import LoginForm, UploadForm
 from .models import AdminUser
 
+# Forms, pyotp and Celery are imported in the views that use them, so
+# workers that only serve public pages never load wtforms or Celery.
+
 admin = Blueprint("admin", __name__, template_folder="templates")
 
 
@@ -15,6 +30,9 @@ admin = Blueprint("admin", __name__, template_folder="templates")
 def login():
     if current_user.is_authenticated:
         return redirect(url_for("admin.dashboard"))
+
+    from .forms import LoginForm
+
     form = LoginForm()
     if form.validate_on_submit():
         user = AdminUser.query.filter_by(username=form.username.data).first()
@@ -25,6 +43,8 @@ def login():
                     return render_template(
                         "login.html", form=form, title="Admin Login"
                     )
+                import pyotp
+
                 totp = pyotp.TOTP(user.mfa_secret)  # Uncomment for pyotp
                 if not totp.verify(form.token.data):
                     flash("Invalid MFA token.", "error")
@@ -52,13 +72,43 @@ def logout():
 @admin.route("/dashboard")
 @login_required
 def dashboard():
+    from .forms import BatchForm
+
     drafts = Post.query.filter_by(published=False).all()
     pubs = Post.query.filter_by(published=True).all()
     return render_template(
-        "dashboard.html", title="Admin Dashboard", drafts=drafts, pubs=pubs
+        "dashboard.html",
+        title="Admin Dashboard",
+        drafts=drafts,
+        pubs=pubs,
+        batch_form=BatchForm(),
     )
 
 
+@admin.route("/batch", methods=["POST"])
+@login_required
+def batch():
+    """Apply a dashboard action to every selected post at once."""
+    from .forms import BatchForm
+
+    form = BatchForm()
+    ids = [int(id) for id in request.form.getlist("post_ids") if id.isdigit()]
+
+    if not form.validate_on_submit() or not ids:
+        flash("Select an action and at least one post.", "error")
+        return redirect(url_for("admin.dashboard"))
+
+    results = apply_batch(form.action.data, ids, current_user.id)
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    summary = ", ".join(
+        f"{n} {status}" for status, n in sorted(counts.items())
+    )
+    flash(f"Batch {form.action.data}: {summary}.", "success")
+    return redirect(url_for("admin.dashboard"))
+
+
 @admin.route("/post")
 @admin.route("/post/<int:post_id>")
 @login_required
@@ -73,13 +123,11 @@ def preview(post_id):
     """Preview post before publishing with metadata and publish option."""
     post = Post.query.filter_by(id=post_id).first_or_404()
 
-    # Reuse existing rendering logic from page blueprint
-    from flask_flatpages.utils import pygmented_markdown
-
-    html_content = pygmented_markdown(post.markdown_content)
-
     return render_template(
-        "preview.html", post=post, content=html_content, title="Preview Post"
+        "preview.html",
+        post=post,
+        content=post.content_html,
+        title="Preview Post",
     )
 
 
@@ -122,6 +170,8 @@ def retract(post_id):
 @admin.route("/upload-doc", methods=["GET", "POST"])
 @login_required
 def upload_doc():
+    from .forms import UploadForm
+
     form = UploadForm()
 
     if form.validate_on_submit() and form.doc_file.data:
@@ -148,3 +198,76 @@ def upload_doc():
     return render_template(
         "upload_doc.html", title="Upload Document", form=form
     )
+
+
+@admin.route("/import", methods=["GET", "POST"])
+@login_required
+def import_docs():
+    """Queue a bulk import of markdown files and zip archives."""
+    from .forms import ImportForm
+
+    form = ImportForm()
+
+    if form.validate_on_submit():
+        directory = os.path.join(
+            current_app.config["IMPORT_UPLOAD_DIR"], uuid.uuid4().hex
+        )
+        os.makedirs(directory)
+
+        paths = []
+        for i, file_storage in enumerate(form.doc_files.data):
+            filename = secure_filename(file_storage.filename) or "upload"
+            path = os.path.join(directory, f"{i}-{filename}")
+            file_storage.save(path)
+            paths.append(path)
+
+        task = _queue_import(directory, paths, current_user.id)
+        return redirect(url_for("admin.import_status", task_id=task.id))
+
+    return render_template("import_docs.html", title="Import Posts", form=form)
+
+
+@admin.route("/import/<task_id>")
+@login_required
+def import_status(task_id):
+    return render_template(
+        "import_status.html",
+        title="Import Progress",
+        task_id=task_id,
+        progress=_import_progress(task_id),
+    )
+
+
+@admin.route("/import/<task_id>/progress")
+@login_required
+def import_progress(task_id):
+    """Progress of a bulk import with per-file results as JSON."""
+    return jsonify(_import_progress(task_id))
+
+
+def _queue_import(directory, paths, author_id):
+    from marrow_blog.app import celery_for
+
+    from .tasks import import_posts
+
+    celery_for(current_app)
+    return import_posts.delay(directory, paths, author_id)
+
+
+def _task_result(task_id):
+    from celery.result import AsyncResult
+
+    from marrow_blog.app import celery_for
+
+    return AsyncResult(task_id, app=celery_for(current_app))
+
+
+def _import_progress(task_id):
+    result = _task_result(task_id)
+    progress = {"state": result.state, "done": 0, "total": None, "results": []}
+
+    if result.state == "FAILURE":
+        progress["error"] = str(result.result)
+    elif isinstance(result.info, dict):
+        progress.update(result.info)
+    return progress
@@ -3,28 +3,74 @@ from flask_classful import route
 from flask_login import current_user
 from marshmallow.exceptions import ValidationError
 
+from lib.pagination import InvalidCursor
 from marrow_blog.blueprints.api.v1 import V1FlaskView
+from marrow_blog.blueprints.posts.batch import apply_batch
 from marrow_blog.blueprints.posts.models import Post
 from marrow_blog.blueprints.posts.schemas import (
+    POST_SUMMARY_FIELDS,
+    batch_post_schema,
     create_post_schema,
+    parse_post_fields,
+    post_load_options,
     post_schema,
-    posts_schema,
+    post_schema_for,
     update_post_schema,
 )
+from marrow_blog.blueprints.posts.search import search_posts
 
 
 class PostView(V1FlaskView):
     # route_base defaults to '/post/' based on class name, under V1FlaskView's '/api/v1/' prefix
 
     def index(self):
-        """Get a list of posts."""
-        all_posts = Post.query.order_by(Post.created_on.desc()).all()
-        return jsonify(posts_schema.dump(all_posts)), 200
+        """Get a page of posts, newest first, without bodies by default."""
+        limit = _limit_arg()
+        if limit is None:
+            return jsonify({"error": "limit must be an integer"}), 400
+
+        try:
+            only = parse_post_fields(
+                request.args.get("fields"), POST_SUMMARY_FIELDS
+            )
+        except ValidationError as err:
+            return jsonify({"error": err.messages}), 400
+
+        published = request.args.get("published")
+        if published is not None:
+            published = published.lower() in ("1", "true", "yes")
+
+        try:
+            posts, next_cursor = Post.page_newest_first(
+                limit,
+                cursor=request.args.get("cursor"),
+                published=published,
+                tag_slug=request.args.get("tag"),
+                options=post_load_options(only),
+            )
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        return jsonify(
+            {
+                "results": post_schema_for(only, many=True).dump(posts),
+                "next_cursor": next_cursor,
+            }
+        ), 200
 
     def get(self, id):
-        """Get a single post by id."""
-        post = Post.query.get_or_404(id)
-        return jsonify(post_schema.dump(post)), 200
+        """Get a single post by id, optionally limited by ?fields=."""
+        try:
+            only = parse_post_fields(request.args.get("fields"))
+        except ValidationError as err:
+            return jsonify({"error": err.messages}), 400
+
+        post = (
+            Post.query.options(*post_load_options(only))
+            .filter_by(id=id)
+            .first_or_404()
+        )
+        return jsonify(post_schema_for(only).dump(post)), 200
 
     def post(self):
         """Create a new post."""
@@ -37,23 +83,26 @@ class PostView(V1FlaskView):
         except ValidationError as err:
             return jsonify({"error": err.messages}), 422
 
+        def build(slug):
+            return Post(
+                title=data["title"],
+                slug=slug,
+                excerpt=data.get("excerpt"),
+                markdown_content=data.get("markdown_content"),
+                published=data.get("published", False),
+                tags=data.get("tags"),
+                author_id=current_user.id,
+            )
+
         # Generate slug if not provided
-        slug = data.get("slug")
-        if not slug:
+        if data.get("slug"):
+            new_post = build(data["slug"]).save()
+        else:
             from lib.document_processor import DocumentProcessor
 
-            slug = DocumentProcessor.generate_unique_slug(data["title"])
-
-        new_post = Post(
-            title=data["title"],
-            slug=slug,
-            excerpt=data.get("excerpt"),
-            markdown_content=data.get("markdown_content"),
-            published=data.get("published", False),
-            tags=data.get("tags"),
-            author_id=current_user.id,
-        )
-        new_post.save()
+            new_post = DocumentProcessor.create_with_unique_slug(
+                data["title"], build
+            )
         return jsonify(post_schema.dump(new_post)), 201
 
     def patch(self, id):
@@ -106,6 +155,7 @@ class PostView(V1FlaskView):
             post.tags = data["tags"]
 
         post.save()
+
         return jsonify(post_schema.dump(post)), 200
 
     def delete(self, id):
@@ -120,8 +170,50 @@ class PostView(V1FlaskView):
         post.delete()
         return jsonify({}), 204
 
+    @route("/batch", methods=["POST"])
+    def batch(self):
+        """Publish, retract or delete many posts in one transaction."""
+        json_data = request.get_json(silent=True)
+        if not json_data:
+            return jsonify({"error": "Invalid input"}), 400
+
+        try:
+            data = batch_post_schema.load(json_data)
+        except ValidationError as err:
+            return jsonify({"error": err.messages}), 422
+
+        results = apply_batch(data["action"], data["ids"], current_user.id)
+        return jsonify({"results": results}), 200
+
     @route("/by-slug/<slug>")
     def get_by_slug(self, slug):
         """Get post by slug for SEO-friendly URLs."""
         post = Post.query.filter_by(slug=slug, published=True).first_or_404()
         return jsonify(post_schema.dump(post)), 200
+
+    @route("/search")
+    def search(self):
+        """Full-text search over all posts, drafts included."""
+        limit = _limit_arg()
+        if limit is None:
+            return jsonify({"error": "limit must be an integer"}), 400
+
+        try:
+            results, next_cursor = search_posts(
+                request.args.get("q", ""),
+                limit=limit,
+                cursor=request.args.get("cursor"),
+                published_only=False,
+            )
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        return jsonify({"results": results, "next_cursor": next_cursor}), 200
+
+
+def _limit_arg(default=20, maximum=100):
+    """Read ?limit= clamped to 1..maximum, None if it isn't a number."""
+    try:
+        return min(max(int(request.args.get("limit", default)), 1), maximum)
+    except ValueError:
+        return None
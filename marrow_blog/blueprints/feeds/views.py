@@ -2,7 +2,10 @@ from datetime import datetime, timezone
 
 from flask import Blueprint, current_app, render_template
 
-from marrow_blog.blueprints.posts.models import Post
+from lib.http_cache import not_modified, set_validators
+from marrow_blog.blueprints.posts.changes import post_changed
+from marrow_blog.blueprints.posts.summaries import published_index
+from marrow_blog.extensions import feed_cache
 
 feeds = Blueprint("feeds", __name__, template_folder="templates")
 
@@ -10,60 +13,71 @@ feeds = Blueprint("feeds", __name__, template_folder="templates")
 @feeds.get("/rss.xml")
 def rss():
     """RSS 2.0 feed for published blog posts."""
-    posts = (
-        Post.query.filter_by(published=True)
-        .order_by(Post.created_on.desc())
-        .limit(20)
-        .all()
-    )
+    feed = feed_cache.get_or_build("rss", _build_rss)
 
-    # Get server name for absolute URLs
-    server_name = current_app.config.get("SERVER_NAME", "localhost:8000")
-    if not server_name.startswith(("http://", "https://")):
-        # Assume HTTPS in production, HTTP for localhost
-        protocol = "https://" if "localhost" not in server_name else "http://"
-        base_url = f"{protocol}{server_name}"
+    # Set proper content type for RSS
+    return _feed_response(feed, "application/rss+xml")
+
+
+@feeds.get("/sitemap.xml")
+def sitemap():
+    """XML sitemap for published blog posts."""
+    feed = feed_cache.get_or_build("sitemap", _build_sitemap)
+
+    # Set proper content type for XML sitemap
+    return _feed_response(feed, "application/xml")
+
+
+def _build_rss():
+    posts = published_index.snapshot().posts[:20]
+
+    # Derive the build date from the posts so every worker produces the
+    # same bytes, and therefore the same ETag, for the same content.
+    if posts:
+        build_date = max(post.updated_on for post in posts)
     else:
-        base_url = server_name.rstrip("/")
+        build_date = datetime.now(timezone.utc)
 
-    response = render_template(
+    return render_template(
         "feeds/rss.xml",
         posts=posts,
-        base_url=base_url,
-        build_date=datetime.now(timezone.utc),
-    )
+        base_url=_base_url(),
+        build_date=build_date,
+    ).encode("utf-8")
 
-    # Set proper content type for RSS
-    response = current_app.response_class(
-        response, mimetype="application/rss+xml"
-    )
 
-    return response
+def _build_sitemap():
+    posts = published_index.snapshot().by_updated
 
+    return render_template(
+        "feeds/sitemap.xml", posts=posts, base_url=_base_url()
+    ).encode("utf-8")
 
-@feeds.get("/sitemap.xml")
-def sitemap():
-    """XML sitemap for published blog posts."""
-    posts = (
-        Post.query.filter_by(published=True)
-        .order_by(Post.updated_on.desc())
-        .all()
-    )
 
+@post_changed.connect
+def _invalidate_feeds(sender, changes):
+    """Drop this worker's feeds now, others follow the "feeds" generation."""
+    if any(change.public for change in changes):
+        feed_cache.invalidate()
+
+
+def _base_url():
     # Get server name for absolute URLs
     server_name = current_app.config.get("SERVER_NAME", "localhost:8000")
     if not server_name.startswith(("http://", "https://")):
         # Assume HTTPS in production, HTTP for localhost
         protocol = "https://" if "localhost" not in server_name else "http://"
-        base_url = f"{protocol}{server_name}"
-    else:
-        base_url = server_name.rstrip("/")
+        return f"{protocol}{server_name}"
+    return server_name.rstrip("/")
 
-    response = render_template(
-        "feeds/sitemap.xml", posts=posts, base_url=base_url
-    )
 
-    # Set proper content type for XML sitemap
-    response = current_app.response_class(response, mimetype="application/xml")
+def _feed_response(feed, mimetype):
+    # ETag only. No timestamp of the published set moves forward when a post
+    # is retracted or deleted, so If-Modified-Since could keep a removed
+    # post in a reader's copy.
+    response = not_modified(feed.etag)
+    if response is not None:
+        return response
 
-    return response
+    response = current_app.response_class(feed.body, mimetype=mimetype)
+    return set_validators(response, feed.etag)
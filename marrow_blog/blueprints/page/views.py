@@ -1,7 +1,23 @@
-from flask import Blueprint, render_template
-from flask_flatpages.utils import pygmented_markdown
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    make_response,
+    render_template,
+    request,
+)
 
+from lib.http_cache import (
+    is_conditional,
+    make_etag,
+    not_modified,
+    set_validators,
+)
+from lib.pagination import InvalidCursor
 from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.blueprints.posts.search import search_posts
+from marrow_blog.blueprints.posts.summaries import published_index
+from marrow_blog.extensions import db
 
 # from config.settings import DEBUG
 
@@ -10,12 +26,61 @@ page = Blueprint("page", __name__, template_folder="templates")
 
 @page.get("/")
 def home():
-    _posts = Post.get_recent_posts()
+    _posts = published_index.snapshot().posts[:5]
     return render_template("page/home.html", _posts=_posts)
 
 
+@page.get("/search")
+def search():
+    query = request.args.get("q", "").strip()
+    try:
+        results, next_cursor = search_posts(
+            query, limit=10, cursor=request.args.get("cursor")
+        )
+    except InvalidCursor:
+        abort(400)
+    return render_template(
+        "page/search.html",
+        query=query,
+        results=results,
+        next_cursor=next_cursor,
+    )
+
+
+@page.get("/tag/<slug>")
+def tag(slug):
+    tag = published_index.snapshot().tags.get(slug)
+    if tag is None:
+        abort(404)
+
+    return render_template("page/tag.html", tag=tag, _posts=tag.posts)
+
+
 @page.get("/blog/<slug>")
 def blog_post(slug):
+    if is_conditional():
+        # Answer revalidation from a narrow projection before loading the
+        # post body or rendering anything.
+        post = (
+            db.session.query(Post.id, Post.updated_on, Post.content_hash)
+            .filter_by(slug=slug, published=True)
+            .first_or_404()
+        )
+        response = not_modified(_post_etag(post), post.updated_on)
+        if response is not None:
+            return response
+
     post = Post.query.filter_by(slug=slug, published=True).first_or_404()
-    html_content = pygmented_markdown(post.markdown_content)
-    return render_template("page/post.html", post=post, content=html_content)
+    response = make_response(
+        render_template("page/post.html", post=post, content=post.content_html)
+    )
+    return set_validators(response, _post_etag(post), post.updated_on)
+
+
+def _post_etag(post):
+    return make_etag(
+        post.id,
+        post.updated_on.isoformat(),
+        post.content_hash,
+        current_app.config["LAYOUT_VERSION"],
+    )
@@ -0,0 +1,108 @@
+from sqlalchemy import delete, select, update
+
+from lib.util_sqlalchemy import tzware_datetime
+from marrow_blog.blueprints.posts.changes import (
+    FIELDS,
+    PostChange,
+    record_changes,
+)
+from marrow_blog.blueprints.posts.models import Post, Tag, post_tags
+from marrow_blog.extensions import db
+
+BATCH_ACTIONS = ("publish", "retract", "delete")
+
+# Status reported for each post the action changed.
+_DONE = {"publish": "published", "retract": "retracted", "delete": "deleted"}
+
+
+def apply_batch(action, ids, author_id):
+    """
+    Publish, retract or delete many posts with one set-based statement.
+
+    Everything happens in one transaction. Posts by other authors are left
+    alone, like PostView.patch, and posts already in the requested state
+    are reported as unchanged rather than rewritten.
+
+    :param action: One of BATCH_ACTIONS
+    :param ids: Post ids
+    :param author_id: Only this author's posts are changed
+    :return: List of {"id", "status"} in the order ids were given
+    """
+    ids = list(dict.fromkeys(ids))
+    rows = db.session.execute(
+        select(Post.id, Post.author_id, Post.published).where(Post.id.in_(ids))
+    ).all()
+    found = {row.id: row for row in rows}
+
+    statuses = {}
+    changed = []
+    for id in ids:
+        row = found.get(id)
+        if row is None:
+            statuses[id] = "not_found"
+        elif row.author_id != author_id:
+            statuses[id] = "forbidden"
+        elif (action == "publish" and row.published) or (
+            action == "retract" and not row.published
+        ):
+            statuses[id] = "unchanged"
+        else:
+            statuses[id] = _DONE[action]
+            changed.append(id)
+
+    if changed:
+        connection = db.session.connection()
+        posts = Post.__table__
+        # Ownership was checked above, and is checked again by every write
+        # so a post handed to another author since can't be touched.
+        own = posts.c.id.in_(changed) & (posts.c.author_id == author_id)
+        own_ids = select(posts.c.id).where(own)
+
+        tag_ids = connection.scalars(
+            select(post_tags.c.tag_id)
+            .where(post_tags.c.post_id.in_(own_ids))
+            .distinct()
+        ).all()
+
+        if action == "delete":
+            connection.execute(
+                delete(post_tags).where(post_tags.c.post_id.in_(own_ids))
+            )
+            connection.execute(delete(posts).where(own))
+        else:
+            connection.execute(
+                update(posts)
+                .where(own)
+                .values(
+                    published=action == "publish",
+                    updated_on=tzware_datetime(),
+                )
+            )
+
+        if tag_ids:
+            Tag.update_published_counts(connection, tag_ids)
+
+        # Core statements skip the flush hooks, so record the changes here.
+        record_changes(
+            db.session,
+            [_change(action, id, found[id].published) for id in changed],
+        )
+
+    # Loaded copies of the posts and their tags are stale now.
+    db.session.commit()
+
+    return [{"id": id, "status": statuses[id]} for id in ids]
+
+
+def _change(action, id, was_published):
+    if action == "delete":
+        return PostChange(
+            id, "deleted", frozenset(FIELDS), was_published, False
+        )
+    return PostChange(
+        id,
+        "updated",
+        frozenset({"published"}),
+        was_published,
+        not was_published,
+    )
@@ -0,0 +1,163 @@
+from collections import namedtuple
+
+from blinker import Namespace
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+
+from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.extensions import cache_generations, db
+
+_signals = Namespace()
+
+# Sent once a transaction that changed posts commits, with changes= a list
+# of PostChange. Nothing is sent for rolled back work.
+post_changed = _signals.signal("post-changed")
+
+# What subscribers can ask about, mapped to the columns behind each.
+FIELDS = {
+    "published": ("published",),
+    "slug": ("slug",),
+    "body": ("markdown_content",),
+    "tags": ("tags",),
+    "summary": ("title", "excerpt"),
+}
+
+
+class PostChange(
+    namedtuple(
+        "PostChange",
+        ["post_id", "kind", "fields", "was_published", "is_published"],
+    )
+):
+    """
+    One post's net change in a transaction.
+
+    kind is "created", "updated" or "deleted" and fields is a frozenset of
+    FIELDS keys that moved. An update with no fields still moved updated_on.
+    """
+
+    __slots__ = ()
+
+    @property
+    def public(self):
+        """True if the post is or was visible in public listings."""
+        return self.was_published or self.is_published
+
+
+def namespaces_for(changes):
+    """
+    Return the cache generations a set of changes invalidates.
+
+    Tag listings come from the published snapshot, so "posts" covers them.
+    """
+    if any(change.public for change in changes):
+        return {"posts", "feeds"}
+    return set()
+
+
+def record_changes(session, changes):
+    """
+    Add changes to the session's transaction and bump the caches they touch.
+
+    The flush hooks call this for ORM writes. Code writing posts with core
+    statements must call it itself before committing.
+    """
+    pending = session.info.setdefault("post_changes", {})
+    for change in changes:
+        old = pending.get(change.post_id)
+        if old is None:
+            pending[change.post_id] = change
+        elif old.kind == "created" and change.kind == "deleted":
+            del pending[change.post_id]
+        else:
+            pending[change.post_id] = change._replace(
+                kind="created" if old.kind == "created" else change.kind,
+                fields=old.fields | change.fields,
+                was_published=old.was_published,
+            )
+    cache_generations.bump(session, namespaces_for(changes))
+
+
+def _set_fields(post):
+    return frozenset(
+        name
+        for name, columns in FIELDS.items()
+        if any(getattr(post, column) for column in columns)
+    )
+
+
+def _moved_fields(state):
+    return frozenset(
+        name
+        for name, columns in FIELDS.items()
+        if any(state.attrs[column].history.has_changes() for column in columns)
+    )
+
+
+@event.listens_for(db.session, "before_flush")
+def _track_post_changes(session, flush_context, instances):
+    """Note each changed post while its old values can still be loaded."""
+    tracked = session.info.setdefault("tracked_posts", [])
+    with session.no_autoflush:
+        for post in session.new:
+            if isinstance(post, Post):
+                tracked.append(
+                    (post, "created", _set_fields(post), False, post.published)
+                )
+
+        for post in session.dirty:
+            if isinstance(post, Post) and session.is_modified(post):
+                state = inspect(post)
+                history = state.attrs.published.history
+                was_published = (
+                    history.deleted[0] if history.deleted else post.published
+                )
+                tracked.append(
+                    (
+                        post,
+                        "updated",
+                        _moved_fields(state),
+                        was_published,
+                        post.published,
+                    )
+                )
+
+        for post in session.deleted:
+            if isinstance(post, Post):
+                tracked.append(
+                    (post, "deleted", _set_fields(post), post.published, False)
+                )
+
+
+@event.listens_for(db.session, "after_flush")
+def _record_post_changes(session, flush_context):
+    tracked = session.info.pop("tracked_posts", ())
+    # New posts have their ids now, deleted ones were loaded before flush.
+    changes = [
+        PostChange(
+            post.id,
+            kind,
+            fields,
+            bool(was_published),
+            bool(is_published),
+        )
+        for post, kind, fields, was_published, is_published in tracked
+    ]
+    if changes:
+        record_changes(session, changes)
+
+
+@event.listens_for(db.session, "after_commit")
+def _dispatch_post_changes(session):
+    changes = session.info.pop("post_changes", None)
+    if changes:
+        sender = (
+            current_app._get_current_object() if has_app_context() else None
+        )
+        post_changed.send(sender, changes=list(changes.values()))
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_post_changes(session):
+    session.info.pop("tracked_posts", None)
+    session.info.pop("post_changes", None)
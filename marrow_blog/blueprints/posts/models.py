@@ -1,17 +1,104 @@
+import hashlib
+from functools import lru_cache
+
+from sqlalchemy import DDL, event, func, inspect, select, update
+
+from lib.markdown_renderer import render_markdown
+from lib.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_datetime,
+)
 from lib.util_sqlalchemy import ResourceMixin
-from marrow_blog.extensions import db
+from marrow_blog.blueprints.posts.search import FTS_CREATE, FTS_DROP
+from marrow_blog.extensions import db, render_cache
+
+post_tags = db.Table(
+    "post_tags",
+    db.Column(
+        "post_id",
+        db.Integer,
+        db.ForeignKey("posts.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Column(
+        "tag_id",
+        db.Integer,
+        db.ForeignKey("tags.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    # The primary key serves post -> tags, this serves tag -> posts.
+    db.Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id"),
+)
+
+
+class Tag(ResourceMixin, db.Model):
+    __tablename__ = "tags"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    slug = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    published_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+
+    @staticmethod
+    def slug_for(name):
+        from slugify import slugify
+
+        return slugify(name)
+
+    @classmethod
+    def update_published_counts(cls, connection, ids):
+        """Recount published posts for the given tag ids in one UPDATE."""
+        tags, posts = cls.__table__, db.metadata.tables["posts"]
+        published_posts = (
+            select(func.count())
+            .select_from(post_tags.join(posts))
+            .where(
+                post_tags.c.tag_id == tags.c.id,
+                posts.c.published.is_(True),
+            )
+            .scalar_subquery()
+        )
+        connection.execute(
+            update(tags)
+            .where(tags.c.id.in_(ids))
+            .values(published_count=published_posts)
+        )
+
+    def __repr__(self):
+        return f"<Tag '{self.slug}'>"
 
 
 class Post(ResourceMixin, db.Model):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Newest first listings walk this backwards for keyset pagination.
+        db.Index("ix_posts_created_on_id", "created_on", "id"),
+        # The published index is built from published posts newest first,
+        # so this leads with published to avoid a temp B-tree sort.
+        db.Index(
+            "ix_posts_published_created_on_id",
+            "published",
+            db.text("created_on DESC"),
+            db.text("id DESC"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False, unique=True)
     slug = db.Column(db.String(255), nullable=False, unique=True, index=True)
     excerpt = db.Column(db.Text, nullable=True)
     markdown_content = db.Column(db.Text, nullable=True)
-    published = db.Column(
-        db.Boolean, default=False, nullable=False, index=True
+    rendered_html = db.Column(db.Text, nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True)
+    # Active history keeps the old value on retract, even after a commit
+    # expired it, so change tracking can tell a public post was changed.
+    published = db.column_property(
+        db.Column(db.Boolean, default=False, nullable=False),
+        active_history=True,
     )
     tags = db.Column(db.String(500), nullable=True, index=True)
 
@@ -22,26 +109,234 @@ class Post(ResourceMixin, db.Model):
         "AdminUser", backref=db.backref("posts", lazy="dynamic")
     )
 
+    # Normalized copy of the tags column, kept in sync on flush.
+    tag_objects = db.relationship(
+        "Tag",
+        secondary=post_tags,
+        backref=db.backref("posts", lazy="dynamic"),
+    )
+
     @classmethod
-    def get_recent_posts(cls):
-        return (
-            cls.query.filter_by(published=True)
-            .order_by(cls.created_on.desc())
-            .limit(5)
+    def page_newest_first(
+        cls, limit, cursor=None, published=None, tag_slug=None, options=()
+    ):
+        """
+        Return one page of posts ordered by (created_on, id) descending.
+
+        :param limit: Maximum posts per page
+        :param cursor: next_cursor from the previous page
+        :param published: Only published (True) or draft (False) posts
+        :param tag_slug: Only posts with this tag
+        :param options: Loader options such as load_only()
+        :return: Tuple of (posts, next_cursor)
+        """
+        query = cls.query.options(*options)
+        if published is not None:
+            query = query.filter(cls.published.is_(published))
+        if tag_slug is not None:
+            tag_id = db.session.query(Tag.id).filter_by(slug=tag_slug).scalar()
+            if tag_id is None:
+                return [], None
+            query = query.filter(
+                select(post_tags.c.post_id)
+                .where(
+                    post_tags.c.post_id == cls.id,
+                    post_tags.c.tag_id == tag_id,
+                )
+                .exists()
+            )
+        if cursor:
+            created_on, post_id = decode_cursor(cursor, 2)
+            if not isinstance(post_id, int):
+                raise InvalidCursor("Malformed cursor")
+            created_on = parse_cursor_datetime(created_on)
+            query = query.filter(
+                (cls.created_on < created_on)
+                | ((cls.created_on == created_on) & (cls.id < post_id))
+            )
+
+        posts = (
+            query.order_by(cls.created_on.desc(), cls.id.desc())
+            .limit(limit + 1)
             .all()
         )
 
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            last = posts[-1]
+            next_cursor = encode_cursor(last.created_on.isoformat(), last.id)
+        return posts, next_cursor
+
     @property
     def tag_list(self):
         """Return tags as a list"""
-        return [
-            tag.strip() for tag in (self.tags or "").split(",") if tag.strip()
-        ]
+        return list(split_tags(self.tags))
 
     @tag_list.setter
     def tag_list(self, value):
         """Set tags from a list"""
         self.tags = ", ".join(value) if value else None
 
+    @property
+    def content_html(self):
+        """Return stored HTML, rendering on the fly for unbackfilled rows."""
+        if self.rendered_html is not None:
+            return self.rendered_html
+
+        def render():
+            return render_markdown(self.markdown_content)
+
+        if self.id is None:
+            return render()
+        return render_cache.get_or_render((self.id, self.updated_on), render)
+
+    def render_content(self):
+        """Render markdown_content into rendered_html."""
+        self.rendered_html = render_markdown(self.markdown_content)
+        self.content_hash = self.hash_content(self.rendered_html)
+        return self
+
+    @staticmethod
+    def hash_content(rendered_html):
+        """Hash the stored render, used in the post page's ETag."""
+        return hashlib.sha256(
+            (rendered_html or "").encode("utf-8")
+        ).hexdigest()
+
+    @classmethod
+    def backfill_rendered(cls, everything=False, chunk_size=100):
+        """
+        Store rendered HTML for posts that have none, such as rows written
+        before the column existed, committing every chunk_size posts.
+
+        updated_on is kept as it was, so feeds and validators don't see an
+        edit.
+
+        :param everything: Re-render every post, e.g. after the markdown
+            extensions changed
+        :param chunk_size: Posts rendered per transaction
+        :return: Number of posts rendered
+        """
+        query = db.session.query(cls.id, cls.markdown_content).order_by(cls.id)
+        if not everything:
+            query = query.filter(cls.rendered_html.is_(None))
+
+        rendered, last_id = 0, 0
+        while True:
+            rows = query.filter(cls.id > last_id).limit(chunk_size).all()
+            if not rows:
+                return rendered
+
+            for row in rows:
+                html = render_markdown(row.markdown_content)
+                db.session.execute(
+                    update(cls)
+                    .where(cls.id == row.id)
+                    .values(
+                        rendered_html=html,
+                        content_hash=cls.hash_content(html),
+                        updated_on=cls.updated_on,
+                    )
+                )
+            db.session.commit()
+            rendered += len(rows)
+            last_id = rows[-1].id
+
     def __repr__(self):
         return f"<Post '{self.title}'>"
+
+
+@event.listens_for(Post, "before_insert")
+@event.listens_for(Post, "before_update")
+def _render_changed_content(mapper, connection, target):
+    """Keep the stored HTML in step with markdown_content on every write."""
+    history = inspect(target).attrs.markdown_content.history
+    if history.has_changes() or target.rendered_html is None:
+        target.render_content()
+
+
+@lru_cache(maxsize=1024)
+def split_tags(tags):
+    return tuple(tag.strip() for tag in (tags or "").split(",") if tag.strip())
+
+
+def _sync_tag_objects(session, post, pending):
+    """Point post.tag_objects at the Tag rows for its tags column."""
+    names = {}
+    for name in post.tag_list:
+        slug = Tag.slug_for(name)
+        if slug:
+            names.setdefault(slug, name)
+
+    missing = [slug for slug in names if slug not in pending]
+    if missing:
+        for tag in session.scalars(select(Tag).where(Tag.slug.in_(missing))):
+            pending[tag.slug] = tag
+
+    tags = []
+    for slug, name in names.items():
+        tag = pending.get(slug)
+        if tag is None:
+            tag = pending[slug] = Tag(name=name, slug=slug)
+            session.add(tag)
+        tags.append(tag)
+    post.tag_objects = tags
+
+
+@event.listens_for(db.session, "before_flush")
+def _track_tag_changes(session, flush_context, instances):
+    """
+    Sync tag rows for changed posts and note whose counts need recomputing.
+
+    A tag's published_count can change when a post's tags change, when it's
+    published or retracted and when it's deleted.
+    """
+    affected = session.info.setdefault("tags_to_count", set())
+    pending = {}
+
+    with session.no_autoflush:
+        for post in [*session.new, *session.dirty]:
+            if not isinstance(post, Post):
+                continue
+            state = inspect(post)
+            tags_changed = state.attrs.tags.history.has_changes()
+            if tags_changed or post in session.new:
+                affected.update(post.tag_objects)
+                _sync_tag_objects(session, post, pending)
+                affected.update(post.tag_objects)
+            elif state.attrs.published.history.has_changes():
+                affected.update(post.tag_objects)
+
+        for post in session.deleted:
+            if isinstance(post, Post):
+                affected.update(post.tag_objects)
+
+
+@event.listens_for(db.session, "after_flush_postexec")
+def _update_tag_counts(session, flush_context):
+    tags = session.info.pop("tags_to_count", None)
+    ids = [tag.id for tag in tags or () if tag.id is not None]
+    if not ids:
+        return
+
+    Tag.update_published_counts(session.connection(), ids)
+    for tag in tags:
+        if tag in session:
+            session.expire(tag, ["published_count"])
+
+
+# Keep the FTS5 search index alongside the table for create_all/drop_all,
+# production databases get the same objects from the Alembic migration.
+for statement in FTS_CREATE:
+    event.listen(
+        Post.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for statement in FTS_DROP:
+    event.listen(
+        Post.__table__,
+        "before_drop",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
@@ -1,5 +1,10 @@
-from marshmallow import fields, validate
+from functools import lru_cache
 
+from marshmallow import ValidationError, fields, validate
+from sqlalchemy.orm import joinedload, load_only
+
+from marrow_blog.blueprints.posts.batch import BATCH_ACTIONS
+from marrow_blog.blueprints.posts.models import Post
 from marrow_blog.extensions import marshmallow
 
 
@@ -63,7 +68,84 @@ class UpdatePostSchema(marshmallow.Schema):
     updated_on = fields.Str(required=True, allow_none=False)
 
 
+class BatchPostSchema(marshmallow.Schema):
+    action = fields.Str(required=True, validate=validate.OneOf(BATCH_ACTIONS))
+    ids = fields.List(
+        fields.Int(strict=True),
+        required=True,
+        validate=validate.Length(min=1, max=500),
+    )
+
+
+# List endpoints leave the post body out unless it's asked for by name.
+POST_SUMMARY_FIELDS = tuple(
+    name for name in PostSchema.Meta.fields if name != "markdown_content"
+)
+
+# Serialized fields that aren't read straight from a column of that name.
+_FIELD_COLUMNS = {
+    "tag_list": ("tags",),
+    "author_username": ("author_id",),
+}
+
+
+def parse_post_fields(value, default=PostSchema.Meta.fields):
+    """
+    Parse a comma separated ?fields= value into PostSchema field names.
+
+    :param value: Raw query string value, may be empty
+    :param default: Fields to use when none were asked for
+    :return: Tuple of field names
+    """
+    if not value:
+        return default
+
+    names = tuple(
+        dict.fromkeys(
+            name.strip() for name in value.split(",") if name.strip()
+        )
+    )
+    unknown = [name for name in names if name not in PostSchema.Meta.fields]
+    if unknown or not names:
+        raise ValidationError(
+            {"fields": [f"Unknown fields: {', '.join(unknown) or value}"]}
+        )
+    return names
+
+
+@lru_cache(maxsize=64)
+def post_schema_for(only, many=False):
+    """Return a (cached) PostSchema limited to the given field names."""
+    return PostSchema(only=only, many=many)
+
+
+def post_load_only(only):
+    """
+    Build a load_only() option loading just the columns the fields need.
+
+    id and created_on are always loaded for identity and list cursors.
+    """
+    columns = {"id", "created_on"}
+    for name in only:
+        columns.update(_FIELD_COLUMNS.get(name, (name,)))
+    return load_only(*(getattr(Post, column) for column in sorted(columns)))
+
+
+def post_load_options(only):
+    """
+    Build the loader options for dumping the given fields.
+
+    Authors are joined in when their username is asked for, so a page of
+    posts doesn't lazy load one author at a time.
+    """
+    options = [post_load_only(only)]
+    if "author_username" in only:
+        options.append(joinedload(Post.author, innerjoin=True))
+    return options
+
+
 post_schema = PostSchema()
 posts_schema = PostSchema(many=True)
 create_post_schema = CreatePostSchema()
 update_post_schema = UpdatePostSchema()
+batch_post_schema = BatchPostSchema()
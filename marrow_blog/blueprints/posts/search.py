@@ -0,0 +1,155 @@
+from html import escape
+
+from sqlalchemy import text
+
+from lib.pagination import InvalidCursor, decode_cursor, encode_cursor
+from marrow_blog.extensions import db
+
+# External content FTS5 index over posts, kept in sync by triggers. The
+# update trigger only fires for indexed columns so publishing or retracting
+# a post doesn't rewrite its index entry.
+FTS_CREATE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        title, excerpt, tags, markdown_content,
+        content='posts', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, title, excerpt, tags, markdown_content)
+        VALUES (new.id, new.title, new.excerpt, new.tags, new.markdown_content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts
+            (posts_fts, rowid, title, excerpt, tags, markdown_content)
+        VALUES ('delete', old.id, old.title, old.excerpt, old.tags,
+                old.markdown_content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au
+    AFTER UPDATE OF title, excerpt, tags, markdown_content ON posts BEGIN
+        INSERT INTO posts_fts
+            (posts_fts, rowid, title, excerpt, tags, markdown_content)
+        VALUES ('delete', old.id, old.title, old.excerpt, old.tags,
+                old.markdown_content);
+        INSERT INTO posts_fts (rowid, title, excerpt, tags, markdown_content)
+        VALUES (new.id, new.title, new.excerpt, new.tags, new.markdown_content);
+    END
+    """,
+]
+FTS_DROP = ["DROP TABLE IF EXISTS posts_fts"]
+
+# bm25() column weights: title, excerpt, tags, markdown_content.
+BM25_WEIGHTS = "10.0, 5.0, 3.0, 1.0"
+
+# Shorter trailing words are matched whole rather than as a prefix.
+MIN_PREFIX_LENGTH = 3
+
+# snippet() markers, swapped for <mark> after the text is HTML escaped.
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+SEARCH_SQL = f"""
+    WITH ranked AS (
+        SELECT posts.id, posts.title, posts.slug, posts.excerpt,
+               posts.published,
+               bm25(posts_fts, {BM25_WEIGHTS}) AS score,
+               snippet(posts_fts, -1, :mark_start, :mark_end, '…', 16)
+                   AS snippet
+        FROM posts_fts
+        JOIN posts ON posts.id = posts_fts.rowid
+        WHERE posts_fts MATCH :match {{published}}
+    )
+    SELECT * FROM ranked
+    {{after}}
+    ORDER BY score, id
+    LIMIT :limit
+"""
+
+
+def build_match(query):
+    """
+    Turn free text into a safe FTS5 query.
+
+    Every word is quoted so FTS5 operators in user input are searched for
+    literally, and the last word matches as a prefix for search-as-you-type
+    once it is long enough not to match most of the index.
+    """
+    words = query.split()
+    if not words:
+        return None
+
+    quoted = ['"' + word.replace('"', '""') + '"' for word in words]
+    if len(words[-1]) >= MIN_PREFIX_LENGTH:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_posts(query, limit=10, cursor=None, published_only=True):
+    """
+    Search posts ranked by BM25, paginated by (score, id).
+
+    :param query: Free text search
+    :param limit: Maximum results per page
+    :param cursor: next_cursor from the previous page
+    :param published_only: Exclude drafts
+    :return: Tuple of (results, next_cursor)
+    """
+    match = build_match(query or "")
+    if match is None:
+        return [], None
+
+    params = {
+        "match": match,
+        "limit": limit + 1,
+        "mark_start": _MARK_START,
+        "mark_end": _MARK_END,
+    }
+    after = ""
+    if cursor:
+        score, post_id = decode_cursor(cursor, 2)
+        # Only numbers may reach SQLite, anything else would fail to bind.
+        if (
+            isinstance(score, bool)
+            or not isinstance(score, (int, float))
+            or isinstance(post_id, bool)
+            or not isinstance(post_id, int)
+        ):
+            raise InvalidCursor("Malformed cursor")
+        params["score"], params["id"] = score, post_id
+        after = "WHERE score > :score OR (score = :score AND id > :id)"
+
+    sql = SEARCH_SQL.format(
+        published="AND posts.published = 1" if published_only else "",
+        after=after,
+    )
+    rows = db.session.execute(text(sql), params).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["score"], rows[-1]["id"])
+
+    return [_result(row) for row in rows], next_cursor
+
+
+def rebuild_search_index():
+    """Rebuild the whole FTS index from the posts table."""
+    db.session.execute(
+        text("INSERT INTO posts_fts(posts_fts) VALUES('rebuild')")
+    )
+    db.session.commit()
+
+
+def _result(row):
+    result = dict(row)
+    result["snippet"] = (
+        escape(row["snippet"] or "")
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
+    return result
@@ -0,0 +1,174 @@
+import sys
+import threading
+
+from sqlalchemy import select
+
+from marrow_blog.blueprints.posts.models import (
+    Post,
+    Tag,
+    post_tags,
+    split_tags,
+)
+from marrow_blog.extensions import cache_generations, db
+
+
+class PostSummary:
+    """The listed fields of a published post, without the ORM overhead."""
+
+    __slots__ = (
+        "id",
+        "title",
+        "slug",
+        "excerpt",
+        "tags",
+        "created_on",
+        "updated_on",
+        "tag_list",
+    )
+
+    def __init__(self, id, title, slug, excerpt, tags, created_on, updated_on):
+        self.id = id
+        self.title = title
+        self.slug = slug
+        self.excerpt = excerpt
+        self.tags = tags
+        self.created_on = created_on
+        self.updated_on = updated_on
+        self.tag_list = split_tags(tags)
+
+
+class TagSummary:
+    """A tag with at least one published post, newest post first."""
+
+    __slots__ = ("slug", "name", "posts")
+
+    def __init__(self, slug, name, posts):
+        self.slug = slug
+        self.name = name
+        self.posts = posts
+
+
+class PublishedSnapshot:
+    """One immutable build of the index, swapped in whole on refresh."""
+
+    __slots__ = ("generation", "posts", "by_updated", "tags", "bytes")
+
+    def __init__(self, generation, posts, tags):
+        self.generation = generation
+        self.posts = posts
+        self.by_updated = tuple(
+            sorted(posts, key=lambda post: post.updated_on, reverse=True)
+        )
+        self.tags = tags
+        self.bytes = _footprint(self)
+
+
+class PublishedIndex:
+    """
+    Summaries of every published post, kept per worker.
+
+    Home, RSS, the sitemap and tag pages read from the current snapshot.
+    It's rebuilt when the "posts" cache generation moves, which happens
+    whenever any worker publishes, retracts, deletes or edits a published
+    post, so serving from it usually runs no queries at all.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def init_app(self, app):
+        app.extensions["published_index"] = self
+        self._snapshot = None
+
+    def snapshot(self):
+        """Return the current snapshot, rebuilding it if posts changed."""
+        generation = cache_generations.current("posts")
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.generation == generation:
+            return snapshot
+
+        with self._lock:
+            if (
+                self._snapshot is None
+                or self._snapshot.generation != generation
+            ):
+                self._snapshot = _build(generation)
+                self.builds += 1
+            return self._snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "posts": len(snapshot.posts) if snapshot else 0,
+            "tags": len(snapshot.tags) if snapshot else 0,
+            "bytes": snapshot.bytes if snapshot else 0,
+            "builds": self.builds,
+        }
+
+
+def _build(generation):
+    rows = db.session.execute(
+        select(
+            Post.id,
+            Post.title,
+            Post.slug,
+            Post.excerpt,
+            Post.tags,
+            Post.created_on,
+            Post.updated_on,
+        )
+        .where(Post.published.is_(True))
+        .order_by(Post.created_on.desc(), Post.id.desc())
+    ).all()
+    posts = tuple(PostSummary(*row) for row in rows)
+
+    tag_rows = db.session.execute(
+        select(post_tags.c.post_id, Tag.slug, Tag.name)
+        .join(Tag, Tag.id == post_tags.c.tag_id)
+        .join(Post, Post.id == post_tags.c.post_id)
+        .where(Post.published.is_(True))
+    )
+    slugs_by_post = {}
+    names = {}
+    for post_id, slug, name in tag_rows:
+        slugs_by_post.setdefault(post_id, []).append(slug)
+        names[slug] = name
+
+    # Walk posts newest first so each tag's posts come out in that order.
+    tagged = {}
+    for post in posts:
+        for slug in slugs_by_post.get(post.id, ()):
+            tagged.setdefault(slug, []).append(post)
+
+    tags = {
+        slug: TagSummary(slug, names[slug], tuple(tag_posts))
+        for slug, tag_posts in tagged.items()
+    }
+    return PublishedSnapshot(generation, posts, tags)
+
+
+def _footprint(snapshot):
+    """Approximate bytes held by a snapshot, shared strings counted once."""
+    seen = set()
+
+    def size(obj):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    total = size(snapshot.posts) + size(snapshot.by_updated)
+    total += size(snapshot.tags)
+    for post in snapshot.posts:
+        total += size(post)
+        for name in PostSummary.__slots__:
+            total += size(getattr(post, name))
+        total += sum(size(tag) for tag in post.tag_list)
+    for tag in snapshot.tags.values():
+        total += size(tag) + size(tag.slug) + size(tag.name) + size(tag.posts)
+    return total
+
+
+published_index = PublishedIndex()
@@ -1,7 +1,15 @@
-from flask import Blueprint
+from flask import Blueprint, current_app, jsonify
 from sqlalchemy import text
 
-from marrow_blog.extensions import db
+from lib.util_sqlalchemy import sqlite_pragma_mismatches
+from marrow_blog.blueprints.posts.summaries import published_index
+from marrow_blog.extensions import (
+    cache_generations,
+    db,
+    feed_cache,
+    highlight_cache,
+    render_cache,
+)
 
 up = Blueprint("up", __name__, template_folder="templates", url_prefix="/up")
 
@@ -15,4 +23,22 @@ def index():
 def databases():
     with db.engine.connect() as connection:
         connection.execute(text("SELECT 1"))
+        mismatches = sqlite_pragma_mismatches(
+            connection, current_app.config.get("SQLITE_PRAGMAS") or {}
+        )
+
+    if mismatches:
+        return jsonify(pragma_mismatches=mismatches), 503
     return ""
+
+
+@up.get("/caches")
+def caches():
+    """Report this worker's in-process cache counters."""
+    return jsonify(
+        render_cache=render_cache.stats(),
+        highlight_cache=highlight_cache.stats(),
+        feed_cache=feed_cache.stats(),
+        published_index=published_index.stats(),
+        cache_generations=cache_generations.stats(),
+    )
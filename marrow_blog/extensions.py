@@ -1,13 +1,24 @@
-from flask_debugtoolbar import DebugToolbarExtension
 from flask_flatpages import FlatPages
 from flask_login import LoginManager
 from flask_marshmallow import Marshmallow
 from flask_sqlalchemy import SQLAlchemy
 from flask_static_digest import FlaskStaticDigest
 
-debug_toolbar = DebugToolbarExtension()
+from lib.cache_generations import CacheGenerations
+from lib.feed_cache import FeedCache
+from lib.highlight_cache import HighlightCache
+from lib.render_cache import RenderCache
+from lib.request_metrics import RequestMetrics
+from lib.slow_queries import SlowQueryLog
+
 db = SQLAlchemy()
+cache_generations = CacheGenerations(db)
+feed_cache = FeedCache()
 flask_static_digest = FlaskStaticDigest()
 login_manager = LoginManager()
 marshmallow = Marshmallow()
 flat_pages = FlatPages()
+highlight_cache = HighlightCache()
+render_cache = RenderCache()
+request_metrics = RequestMetrics()
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,149 @@
+import uuid
+
+import pytest
+
+from lib.tests import ViewTestMixin
+from marrow_blog.blueprints.admin.models import AdminUser
+from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.extensions import cache_generations, db, feed_cache
+
+NAMESPACES = ("posts", "feeds")
+
+
+class TestCacheGenerations(ViewTestMixin):
+    """Test the generation counters shared by every worker."""
+
+    @pytest.fixture(autouse=True)
+    def check_every_time(self, monkeypatch):
+        monkeypatch.setattr(cache_generations, "check_interval", 0)
+        # Make sure every namespace has a row for _bump_elsewhere().
+        cache_generations.bump(db.session, NAMESPACES)
+        db.session.commit()
+
+    def _generations(self):
+        return {
+            namespace: cache_generations.current(namespace)
+            for namespace in NAMESPACES
+        }
+
+    def _bumped(self, before):
+        after = self._generations()
+        return {
+            namespace
+            for namespace in NAMESPACES
+            if after[namespace] != before[namespace]
+        }
+
+    def _bump_elsewhere(self, namespace):
+        """Bump a namespace the way another worker's commit would."""
+        table = cache_generations.table
+        with db.engine.begin() as connection:
+            connection.execute(
+                table.update()
+                .where(table.c.namespace == namespace)
+                .values(generation=table.c.generation + 1)
+            )
+        # End the session's read transaction, as the next request would.
+        db.session.commit()
+
+    def _create_post(self, published=True, tags=None):
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        key = uuid.uuid4().hex[:8]
+        return Post(
+            title=f"Generation {key}",
+            slug=f"generation-{key}",
+            published=published,
+            tags=tags,
+            author_id=admin.id,
+        ).save()
+
+    def test_bump_creates_and_increments(self):
+        before = self._generations()
+
+        cache_generations.bump(db.session, {"posts"})
+        db.session.commit()
+
+        assert self._bumped(before) == {"posts"}
+        assert cache_generations.current("posts") == before["posts"] + 1
+
+    def test_rollback_discards_bump(self):
+        before = self._generations()
+
+        cache_generations.bump(db.session, {"posts"})
+        db.session.rollback()
+
+        assert self._bumped(before) == set()
+
+    def test_draft_changes_bump_nothing(self):
+        before = self._generations()
+
+        draft = self._create_post(published=False, tags="gecko")
+        draft.title = f"Edited {draft.slug}"
+        draft.save()
+        draft.delete()
+
+        assert self._bumped(before) == set()
+
+    def test_published_edit_bumps_posts_and_feeds(self):
+        post = self._create_post(tags="gecko")
+        before = self._generations()
+
+        post.title = f"Edited {post.slug}"
+        post.save()
+
+        assert self._bumped(before) == {"posts", "feeds"}
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda post: setattr(post, "tags", "gecko, dunes"),
+            lambda post: setattr(post, "published", False),
+        ],
+        ids=["retag", "retract"],
+    )
+    def test_tag_membership_changes_bump_listings(self, change):
+        post = self._create_post(tags="gecko")
+        before = self._generations()
+
+        change(post)
+        post.save()
+
+        assert self._bumped(before) == {"posts", "feeds"}
+
+    def test_checks_throttled(self, monkeypatch):
+        """Test other workers' bumps are only read once the interval ends."""
+        monkeypatch.setattr(cache_generations, "check_interval", 60)
+        cache_generations.expire()
+        before = cache_generations.current("feeds")
+
+        self._bump_elsewhere("feeds")
+        assert cache_generations.current("feeds") == before
+
+        monkeypatch.setattr(cache_generations, "check_interval", 0)
+        assert cache_generations.current("feeds") == before + 1
+
+    def test_read_once_per_request(self, app):
+        with app.test_request_context("/"):
+            app.preprocess_request()
+            before = cache_generations.current("feeds")
+            self._bump_elsewhere("feeds")
+
+            assert cache_generations.current("feeds") == before
+
+        assert cache_generations.current("feeds") == before + 1
+
+    def test_feed_cache_follows_feeds_generation(self):
+        """Test a feed is rebuilt after any worker bumps "feeds"."""
+        builds = []
+
+        def build():
+            builds.append(1)
+            return b"<rss/>"
+
+        feed_cache.get_or_build("generation-test", build)
+        feed_cache.get_or_build("generation-test", build)
+        assert len(builds) == 1
+
+        self._bump_elsewhere("feeds")
+        feed_cache.get_or_build("generation-test", build)
+        assert len(builds) == 2
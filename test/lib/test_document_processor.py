@@ -0,0 +1,283 @@
+import zipfile
+
+from sqlalchemy import event
+
+from lib.document_processor import DocumentProcessor, PostManager
+from lib.tests import ViewTestMixin
+from marrow_blog.blueprints.admin.models import AdminUser
+from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.extensions import db
+
+
+class TestUniqueSlugs(ViewTestMixin):
+    """Test single-query slug allocation and retry on conflicts."""
+
+    def _admin_id(self):
+        return AdminUser.query.filter_by(username="test_admin").first().id
+
+    def _create(self, slug, title=None):
+        return Post(
+            title=title or slug, slug=slug, author_id=self._admin_id()
+        ).save()
+
+    def _count_statements(self, fn):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            return fn(), len(statements)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+    def test_free_base_slug(self):
+        assert (
+            DocumentProcessor.generate_unique_slug("Brand New Title")
+            == "brand-new-title"
+        )
+
+    def test_first_free_suffix_in_one_query(self):
+        """Test collisions are resolved in memory from one query."""
+        for slug in ["slug-run", "slug-run-1", "slug-run-2", "slug-run-4"]:
+            self._create(slug)
+        # Neither of these is a numbered copy of "slug-run".
+        self._create("slug-run-extra")
+        self._create("slug-runner")
+
+        slug, statements = self._count_statements(
+            lambda: DocumentProcessor.generate_unique_slug("Slug Run")
+        )
+
+        assert slug == "slug-run-3"
+        assert statements == 1
+
+    def test_exclude_id(self):
+        """Test a post's own slug doesn't count as taken."""
+        post = self._create("own-slug")
+
+        assert (
+            DocumentProcessor.generate_unique_slug("Own Slug", post.id)
+            == "own-slug"
+        )
+
+    def test_retries_when_slug_taken_concurrently(self):
+        """Test a unique violation on the slug allocates another one."""
+        self._create("raced-slug")
+        admin_id = self._admin_id()
+        built = []
+
+        def build(slug):
+            built.append(slug)
+            return Post(title=f"Raced {slug}", slug=slug, author_id=admin_id)
+
+        # Pretend another writer took the slug after it was allocated.
+        post = DocumentProcessor.create_with_unique_slug(
+            "Raced Slug", build, slug="raced-slug"
+        )
+
+        assert built == ["raced-slug", "raced-slug-1"]
+        assert post.id is not None
+        assert post.slug == "raced-slug-1"
+
+    def test_upload_uses_unique_slug(self):
+        """Test uploads with a colliding title prefix get a suffix."""
+        self._create("upload-slug", title="Upload Slug Original")
+
+        success, message, post = PostManager.create_from_upload(
+            b"# Body\n\nSome uploaded content here.",
+            "upload_slug.md",
+            self._admin_id(),
+        )
+
+        assert success, message
+        assert post.slug == "upload-slug-1"
+
+
+class TestBulkImport(ViewTestMixin):
+    """Test reading archives and importing batches of markdown files."""
+
+    def _admin_id(self):
+        return AdminUser.query.filter_by(username="test_admin").first().id
+
+    def _md(self, title, **frontmatter):
+        lines = [f"title: {title}"]
+        lines += [f"{key}: {value}" for key, value in frontmatter.items()]
+        body = "Imported body with plenty of words in it."
+        return f"---\n{chr(10).join(lines)}\n---\n{body}".encode("utf-8")
+
+    def test_read_import_files(self, tmp_path):
+        """Test zips are expanded and junk, limits and non-md are reported."""
+        archive = tmp_path / "posts.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("blog/one.md", self._md("One"))
+            zf.writestr("blog/big.md", b"x" * 200)
+            zf.writestr("__MACOSX/blog/._one.md", b"junk")
+            zf.writestr("blog/image.png", b"png")
+        loose = tmp_path / "two.md"
+        loose.write_bytes(self._md("Two"))
+        other = tmp_path / "notes.txt"
+        other.write_bytes(b"text")
+
+        files = PostManager.read_import_files(
+            [str(archive), str(loose), str(other)],
+            max_files=10,
+            max_file_bytes=100,
+        )
+
+        assert [(name, error) for name, _, error in files] == [
+            ("blog/one.md", None),
+            ("blog/big.md", "File is too large"),
+            ("two.md", None),
+            ("notes.txt", "Not a markdown or zip file"),
+        ]
+        assert files[0][1] == self._md("One")
+
+    def test_read_import_files_max_files(self, tmp_path):
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"{i}.md"
+            path.write_bytes(self._md(f"Limit {i}"))
+            paths.append(str(path))
+
+        files = PostManager.read_import_files(paths, 2, 1024)
+
+        assert [error for _, _, error in files] == [
+            None,
+            None,
+            "More than 2 files",
+        ]
+
+    def test_import_files_resolves_batch(self):
+        """Test duplicates and slugs are resolved across the whole batch."""
+        Post(
+            title="Batch Existing",
+            slug="batch-existing",
+            author_id=self._admin_id(),
+        ).save()
+        Post(
+            title="Batch Slug Taken",
+            slug="batch-dup",
+            author_id=self._admin_id(),
+        ).save()
+        files = [
+            ("a.md", self._md("Batch Dup"), None),
+            ("b.md", self._md("Batch Dup Two", slug="batch-dup-1"), None),
+            ("c.md", self._md("Batch Existing"), None),
+            ("d.md", self._md("Batch Dup"), None),
+            ("e.md", b"\xff\xfe", None),
+            ("f.md", None, "File is too large"),
+            ("g.md", self._md("Batch Published", published="true"), None),
+        ]
+        progress = []
+
+        results = PostManager.import_files(
+            files,
+            self._admin_id(),
+            chunk_size=1,
+            on_progress=lambda done, total, _: progress.append((done, total)),
+        )
+
+        assert [result["status"] for result in results] == [
+            "created",
+            "created",
+            "skipped",
+            "skipped",
+            "failed",
+            "failed",
+            "created",
+        ]
+        slugs = [
+            Post.query.get(result["post_id"]).slug
+            for result in results
+            if result["post_id"]
+        ]
+        # "batch-dup" and the requested "batch-dup-1" are both taken.
+        assert slugs == ["batch-dup-2", "batch-dup-1", "batch-published"]
+        assert Post.query.filter_by(slug="batch-published").one().published
+        assert progress == [(5, 7), (6, 7), (7, 7)]
+
+    def test_failed_chunk_retried_per_file(self, monkeypatch):
+        """Test a constraint error only fails the file that caused it."""
+        Post(
+            title="Chunk Raced",
+            slug="chunk-raced-original",
+            author_id=self._admin_id(),
+        ).save()
+        # Miss the existing title as if it were inserted after the check.
+        monkeypatch.setattr(PostManager, "_existing", lambda *args: set())
+        files = [
+            ("ok.md", self._md("Chunk Fine"), None),
+            ("raced.md", self._md("Chunk Raced"), None),
+        ]
+
+        results = PostManager.import_files(files, self._admin_id())
+
+        assert [result["status"] for result in results] == [
+            "created",
+            "failed",
+        ]
+        assert Post.query.filter_by(title="Chunk Fine").count() == 1
+
+    def test_bad_frontmatter_fails_only_its_file(self):
+        """Test values of the wrong type fail their file, not the batch."""
+        files = [
+            ("first.md", self._md("Typed First"), None),
+            ("maybe.md", self._md("Typed Maybe", published="maybe"), None),
+            ("list.md", self._md("[Typed, List]"), None),
+            ("quoted.md", self._md("Typed Quoted", published="'yes'"), None),
+            ("number.md", self._md(2024, tags=7), None),
+        ]
+
+        results = PostManager.import_files(files, self._admin_id())
+
+        assert [result["status"] for result in results] == [
+            "created",
+            "failed",
+            "failed",
+            "created",
+            "created",
+        ]
+        assert results[1]["message"] == "Published must be true or false"
+        assert results[2]["message"] == "Title must be text"
+        assert Post.query.filter_by(title="Typed Quoted").one().published
+        assert Post.query.filter_by(title="2024").one().tags == "7"
+
+    def test_failed_commit_retried_per_file(self, monkeypatch):
+        """Test any database error in a chunk only fails its own file."""
+        monkeypatch.setattr(
+            DocumentProcessor, "validate_post_data", lambda data: []
+        )
+        files = [
+            ("before.md", self._md("Commit Before"), None),
+            ("bad.md", self._md("Commit Bad", published="maybe"), None),
+            ("after.md", self._md("Commit After"), None),
+        ]
+
+        results = PostManager.import_files(files, self._admin_id())
+
+        assert [result["status"] for result in results] == [
+            "created",
+            "failed",
+            "created",
+        ]
+        assert "Not a boolean value" in results[1]["message"]
+        assert Post.query.filter_by(title="Commit Bad").count() == 0
+
+    def test_import_task_cleans_up(self, tmp_path):
+        """Test the task imports the staged files and removes them."""
+        from marrow_blog.blueprints.admin.tasks import import_posts
+
+        directory = tmp_path / "staged"
+        directory.mkdir()
+        path = directory / "task.md"
+        path.write_bytes(self._md("Imported By Task"))
+
+        outcome = import_posts.run(
+            str(directory), [str(path)], self._admin_id()
+        )
+
+        assert outcome["done"] == outcome["total"] == 1
+        assert outcome["results"][0]["status"] == "created"
+        assert not directory.exists()
@@ -0,0 +1,141 @@
+import os
+
+from config import settings
+from lib.highlight_cache import DISK_VERSION, HighlightCache
+from lib.markdown_renderer import get_markdown, render_markdown
+
+EXTENSIONS = settings.FLATPAGES_MARKDOWN_EXTENSIONS
+CONFIGS = settings.FLATPAGES_EXTENSION_CONFIGS
+
+DOCUMENT = """# Code
+
+```python
+def hello():
+    return "hi"
+```
+
+Some prose.
+
+```js hl_lines="1"
+const x = 1;
+```
+
+```{.python #named}
+print("attrs form")
+```
+"""
+
+
+def render(text, cache):
+    return render_markdown(text, EXTENSIONS, CONFIGS, highlight_cache=cache)
+
+
+def render_uncached(text):
+    """Render with plain fenced_code, not even the app's HighlightCache."""
+    md = get_markdown(EXTENSIONS, CONFIGS, highlight_cache=None)
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
+
+
+class TestHighlightCache:
+    """Test the content-hash cache for highlighted fenced code."""
+
+    def test_output_matches_uncached_render(self):
+        """Test cached highlighting produces the same HTML as fenced_code."""
+        cache = HighlightCache()
+        baseline = render_uncached(DOCUMENT)
+
+        assert render(DOCUMENT, cache) == baseline
+        assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 2)
+
+        assert render(DOCUMENT, cache) == baseline
+        assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 2)
+
+    def test_unchanged_blocks_reused_across_prose_edits(self):
+        """Test editing prose reuses the already highlighted blocks."""
+        cache = HighlightCache()
+        render(DOCUMENT, cache)
+        misses = cache.stats()["misses"]
+
+        render(DOCUMENT.replace("Some prose.", "Edited prose."), cache)
+
+        assert cache.stats()["misses"] == misses
+        assert cache.stats()["hits"] == 2
+
+    def test_key_depends_on_language_and_options(self):
+        """Test the key changes with the language and codehilite options."""
+        key = HighlightCache.make_key("python", "x = 1", {"linenums": False})
+
+        assert key != HighlightCache.make_key("ruby", "x = 1", {})
+        assert key != HighlightCache.make_key(
+            "python", "x = 1", {"linenums": True}
+        )
+        assert key == HighlightCache.make_key(
+            "python", "x = 1", {"linenums": False}
+        )
+
+    def test_disk_tier_survives_new_cache(self, tmp_path):
+        """Test a fresh cache (new worker) is served from the disk tier."""
+        render(DOCUMENT, HighlightCache(cache_dir=str(tmp_path)))
+        assert len(list((tmp_path / DISK_VERSION).iterdir())) == 2
+
+        restarted = HighlightCache(cache_dir=str(tmp_path))
+        html = render(DOCUMENT, restarted)
+
+        assert html == render_uncached(DOCUMENT)
+        assert restarted.stats()["disk_hits"] == 2
+        assert restarted.stats()["disk_writes"] == 0
+
+    def test_disk_tier_versioned(self, tmp_path):
+        """Test entries from other Pygments/Markdown versions are dropped."""
+        stale = tmp_path / "pygments-0.1-markdown-0.1"
+        stale.mkdir()
+        (stale / "old.html").write_text("<pre>old</pre>")
+        (tmp_path / "unrelated").mkdir()
+
+        cache = HighlightCache(cache_dir=str(tmp_path))
+
+        assert cache.disk_dir == str(tmp_path / DISK_VERSION)
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            DISK_VERSION,
+            "unrelated",
+        ]
+
+    def test_disk_prunes_least_recently_used(self, tmp_path):
+        """Test the oldest files go first when the directory is over its cap."""
+        directory = tmp_path / DISK_VERSION
+        directory.mkdir()
+        for name, used in (("old", 1000), ("new", 2000), ("older", 500)):
+            path = directory / f"{name}.html"
+            path.write_text("x" * 2048)
+            os.utime(path, (used, used))
+
+        cache = HighlightCache(cache_dir=str(tmp_path), max_disk_bytes=4096)
+
+        assert [path.name for path in directory.iterdir()] == ["new.html"]
+        assert cache.stats()["disk_bytes"] == 2048
+        assert cache.stats()["disk_evictions"] == 2
+
+    def test_disk_bound(self, tmp_path):
+        """Test writes past the disk cap prune the directory."""
+        cache = HighlightCache(cache_dir=str(tmp_path), max_disk_bytes=4096)
+
+        for i in range(50):
+            render(f"```python\nvalue_{i} = {i}\n```", cache)
+
+        files = list((tmp_path / DISK_VERSION).iterdir())
+        assert sum(path.stat().st_size for path in files) <= 4096
+        assert cache.stats()["disk_evictions"] > 0
+        assert cache.stats()["disk_bytes"] <= 4096
+
+    def test_memory_bound(self):
+        """Test the memory tier stays within its byte cap."""
+        cache = HighlightCache(max_bytes=2048)
+
+        for i in range(50):
+            render(f"```python\nvalue_{i} = {i}\n```", cache)
+
+        assert cache.stats()["bytes"] <= 2048
+        assert cache.stats()["evictions"] > 0
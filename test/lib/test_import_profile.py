@@ -0,0 +1,32 @@
+from lib.import_profile import heaviest, parse_importtime, total_ms
+
+OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:        80 |         80 |     _json
+import time:       300 |        380 |   json.decoder
+import time:       120 |        500 | json
+import time:      1000 |       1000 |     yaml.nodes
+import time:      2000 |       3000 |   yaml
+import time:       500 |       3500 | flask_flatpages
+some warning printed by an import
+"""
+
+
+class TestParseImporttime:
+    def test_parse(self):
+        modules = parse_importtime(OUTPUT)
+
+        assert modules["_json"] == (80, 80, 2)
+        assert modules["json.decoder"] == (300, 380, 1)
+        assert modules["json"] == (120, 500, 0)
+        assert modules["yaml.nodes"] == (1000, 1000, 2)
+        assert "import time" not in " ".join(modules)
+
+    def test_total_counts_top_level_only(self):
+        assert total_ms(parse_importtime(OUTPUT)) == 4.0
+
+    def test_heaviest_by_package(self):
+        assert heaviest(parse_importtime(OUTPUT), limit=2) == [
+            ("flask_flatpages", 3.5),
+            ("yaml", 3.0),
+        ]
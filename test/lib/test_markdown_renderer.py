@@ -0,0 +1,48 @@
+import threading
+
+from config import settings
+from lib.markdown_renderer import get_markdown, render_markdown
+
+EXTENSIONS = settings.FLATPAGES_MARKDOWN_EXTENSIONS
+CONFIGS = settings.FLATPAGES_EXTENSION_CONFIGS
+
+
+class TestMarkdownRenderer:
+    """Test the pooled per-thread markdown renderer."""
+
+    def test_instance_reused_within_thread(self):
+        """Test the same thread gets the same Markdown instance back."""
+        first = get_markdown(EXTENSIONS, CONFIGS)
+
+        assert get_markdown(EXTENSIONS, CONFIGS) is first
+
+    def test_instance_not_shared_across_threads(self):
+        """Test each thread builds its own Markdown instance."""
+        main = get_markdown(EXTENSIONS, CONFIGS)
+        seen = []
+
+        thread = threading.Thread(
+            target=lambda: seen.append(get_markdown(EXTENSIONS, CONFIGS))
+        )
+        thread.start()
+        thread.join()
+
+        assert seen[0] is not main
+
+    def test_state_does_not_leak_between_documents(self):
+        """Test footnotes and heading ids are reset between renders."""
+        html = render_markdown(
+            "# First\n\nText[^1]\n\n[^1]: A note", EXTENSIONS, CONFIGS
+        )
+        assert "A note" in html
+        assert 'id="first"' in html
+
+        html = render_markdown("# First", EXTENSIONS, CONFIGS)
+        assert "A note" not in html
+        assert 'id="first"' in html
+
+    def test_uses_app_settings_by_default(self, app):
+        """Test the app's FLATPAGES settings apply without overrides."""
+        html = render_markdown("```python\nx = 1\n```")
+
+        assert 'class="highlight"' in html
@@ -0,0 +1,71 @@
+import sys
+
+from lib.render_cache import RenderCache
+
+
+class TestRenderCache:
+    """Test the size-bounded LRU render cache."""
+
+    def test_get_or_render_counts_hits_and_misses(self):
+        """Test repeated lookups render once and count the hit."""
+        cache = RenderCache()
+        calls = []
+
+        def render():
+            calls.append(1)
+            return "<p>hi</p>"
+
+        assert cache.get_or_render((1, "v1"), render) == "<p>hi</p>"
+        assert cache.get_or_render((1, "v1"), render) == "<p>hi</p>"
+
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_new_key_misses_after_update(self):
+        """Test a changed updated_on in the key forces a fresh render."""
+        cache = RenderCache()
+        cache.set((1, "v1"), "old")
+
+        assert cache.get((1, "v2")) is None
+        assert cache.get_or_render((1, "v2"), lambda: "new") == "new"
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted at the byte cap."""
+        value = "x" * 100
+        cache = RenderCache(max_bytes=sys.getsizeof(value) * 2)
+
+        cache.set("a", value)
+        cache.set("b", value)
+        cache.get("a")
+        cache.set("c", value)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == value
+        assert cache.get("c") == value
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    def test_oversized_value_not_cached(self):
+        """Test values larger than the whole cache are passed through."""
+        cache = RenderCache(max_bytes=10)
+
+        assert cache.set("big", "x" * 100) == "x" * 100
+        assert cache.stats()["entries"] == 0
+
+    def test_clear_resets_counters(self):
+        """Test clear drops entries and counters."""
+        cache = RenderCache()
+        cache.set("a", "value")
+        cache.get("a")
+
+        cache.clear()
+
+        assert cache.stats() == {
+            "entries": 0,
+            "bytes": 0,
+            "max_bytes": cache.max_bytes,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
@@ -0,0 +1,167 @@
+import logging
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from flask import render_template
+
+from lib.markdown_renderer import render_markdown
+from lib.request_metrics import RequestMetrics
+from lib.tests import ViewTestMixin
+from marrow_blog.blueprints.admin.models import AdminUser
+from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.extensions import (
+    cache_generations,
+    db,
+    feed_cache,
+    request_metrics,
+)
+
+
+class TestRequestMetrics(ViewTestMixin):
+    """Test per-request statement counts and pin the list paths' counts."""
+
+    @pytest.fixture(autouse=True)
+    def statements_header(self):
+        request_metrics.send_header = True
+        yield
+        request_metrics.send_header = False
+
+    def _statements(self, url):
+        # Start from an empty identity map so related rows have to be
+        # fetched by the request itself.
+        db.session.expunge_all()
+        response = self.client.get(url)
+        assert response.status_code == 200
+        return int(response.headers["X-SQL-Statements"])
+
+    def _add_posts_by_new_authors(self, count):
+        for _ in range(count):
+            key = uuid.uuid4().hex[:8]
+            author = AdminUser(username=f"author-{key}")
+            author.set_password("password")
+            db.session.add(author)
+            db.session.add(
+                Post(
+                    title=f"Counted {key}",
+                    slug=f"counted-{key}",
+                    published=True,
+                    tags=f"counted-{key}",
+                    author=author,
+                )
+            )
+        db.session.commit()
+        feed_cache.invalidate()
+
+    def test_header_off_by_default(self):
+        request_metrics.send_header = False
+
+        response = self.client.get("/")
+
+        assert "X-SQL-Statements" not in response.headers
+
+    @pytest.mark.parametrize(
+        "url, statements",
+        [
+            ("/api/v1/post/?limit=100", 1),
+            ("/api/v1/post/?limit=100&fields=id,author_username", 1),
+            ("/dashboard", 2),
+        ],
+    )
+    def test_list_paths_use_constant_statements(self, url, statements):
+        """Test list paths don't query per post or per author."""
+        self.login_admin("test_admin")
+
+        before = self._statements(url)
+        self._add_posts_by_new_authors(3)
+        after = self._statements(url)
+
+        assert before == after == statements
+
+    @pytest.mark.parametrize("url", ["/rss.xml", "/sitemap.xml", "/"])
+    def test_public_listings_read_from_index(self, url, monkeypatch):
+        """Test public listings are served without queries once built."""
+        monkeypatch.setattr(cache_generations, "check_interval", 60)
+        self._add_posts_by_new_authors(3)
+        rebuilt = self._statements(url)
+        feed_cache.invalidate()
+        served = self._statements(url)
+
+        # Generation check, then the posts and tags of the rebuild. After
+        # that nothing until the next check is due.
+        assert rebuilt == 3
+        assert served == 0
+
+    def test_server_timing_header(self, monkeypatch):
+        """Test every phase and the total are reported."""
+        monkeypatch.setattr(request_metrics, "server_timing", True)
+
+        response = self.client.get("/")
+
+        timing = response.headers["Server-Timing"]
+        phases = [entry.split(";")[0] for entry in timing.split(", ")]
+        statements = response.headers["X-SQL-Statements"]
+        assert phases == ["db", "render", "template", "total"]
+        assert f'desc="{statements} queries"' in timing
+
+    def test_server_timing_off_by_default(self):
+        response = self.client.get("/")
+
+        assert "Server-Timing" not in response.headers
+
+    def test_render_and_template_phases(self, app):
+        """Test markdown rendering and templates add to their phases."""
+        with app.test_request_context("/"):
+            app.preprocess_request()
+            render_markdown("# Timed")
+            render_template("page/search.html", query="", results=[])
+            metrics = RequestMetrics.current()
+
+        assert metrics["render"] > 0
+        assert metrics["template"] > 0
+
+    def test_unmatched_after_execute_ignored(self, app):
+        """Test a statement started before the listeners isn't counted."""
+        with app.test_request_context("/"):
+            app.preprocess_request()
+            RequestMetrics._after_execute(
+                SimpleNamespace(info={}), None, "SELECT 1", (), None, False
+            )
+            metrics = RequestMetrics.current()
+
+        assert metrics["statements"] == 0
+
+    def test_over_budget_logged_with_endpoint(self, monkeypatch, caplog):
+        """Test requests over the duration budget are logged."""
+        monkeypatch.setattr(request_metrics, "duration_budget_ms", 0.001)
+
+        with caplog.at_level(logging.WARNING, logger="lib.request_metrics"):
+            self.client.get("/")
+
+        assert "Request over budget" in caplog.text
+        assert "(page.home)" in caplog.text
+
+    def test_over_statement_budget_logged(self, monkeypatch, caplog):
+        """Test requests running more statements than budgeted are logged."""
+        monkeypatch.setattr(request_metrics, "statement_budget", 1)
+        monkeypatch.setattr(request_metrics, "duration_budget_ms", 60000)
+
+        db.session.expunge_all()
+        with caplog.at_level(logging.WARNING, logger="lib.request_metrics"):
+            response = self.client.get("/blog/test-post-1")
+        statements = int(response.headers["X-SQL-Statements"])
+
+        assert statements > 1
+        assert "Request over budget" in caplog.text
+        assert f"(page.blog_post) ran {statements} SQL statements" in (
+            caplog.text
+        )
+
+    def test_within_budget_not_logged(self, monkeypatch, caplog):
+        monkeypatch.setattr(request_metrics, "statement_budget", 1000)
+        monkeypatch.setattr(request_metrics, "duration_budget_ms", 60000)
+
+        with caplog.at_level(logging.WARNING, logger="lib.request_metrics"):
+            self.client.get("/")
+
+        assert "Request over budget" not in caplog.text
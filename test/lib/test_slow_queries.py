@@ -0,0 +1,206 @@
+import json
+import os
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+
+from lib.slow_queries import (
+    SlowQueryLog,
+    full_scans,
+    log_files,
+    process_path,
+    read_entries,
+    redact,
+    summarize,
+)
+
+
+class TestSlowQueries:
+    """Test the slow query log and its report."""
+
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "CREATE TABLE posts (id INTEGER PRIMARY KEY, title TEXT)"
+            )
+        return engine
+
+    def slow_query_log(self, tmp_path, threshold_ms):
+        slow_query_log = SlowQueryLog()
+        slow_query_log.threshold_ms = threshold_ms
+        slow_query_log.path = str(tmp_path / "slow-queries.log")
+        return slow_query_log
+
+    def test_redact(self):
+        assert redact(("secret", b"\x00\x01", 7, None, True)) == [
+            "<str:6>",
+            "<bytes:2>",
+            7,
+            None,
+            True,
+        ]
+        assert redact({"title": "draft", "limit": 10}) == {
+            "title": "<str:5>",
+            "limit": 10,
+        }
+
+    def test_full_scans(self):
+        """Test scans of known tables are flagged, searches aren't."""
+        plan = [
+            "SCAN posts",
+            "SCAN TABLE admin_users",
+            "SEARCH tags USING INDEX ix_tags_slug (slug=?)",
+            "SCAN ranked",
+            "  USE TEMP B-TREE FOR ORDER BY",
+        ]
+
+        assert full_scans(plan, {"posts", "admin_users", "tags"}) == [
+            "admin_users",
+            "posts",
+        ]
+
+    def test_full_scans_of_an_index(self):
+        """Test walking a whole index for an ORDER BY counts as a scan."""
+        plan = [
+            "SCAN posts USING INDEX ix_posts_published_created_on_id",
+            "SCAN post_tags USING COVERING INDEX ix_post_tags",
+            "SEARCH tags USING INTEGER PRIMARY KEY (rowid=?)",
+        ]
+
+        assert full_scans(plan, {"posts", "post_tags", "tags"}) == [
+            "post_tags",
+            "posts",
+        ]
+
+    def test_records_slow_statement(self, app, tmp_path):
+        """Test the SQL, redacted params, view and plan are recorded."""
+        engine = self.engine(tmp_path)
+        slow_query_log = self.slow_query_log(tmp_path, 0.000001)
+        slow_query_log.listen(engine)
+
+        with app.test_request_context("/"), engine.connect() as connection:
+            connection.exec_driver_sql(
+                "SELECT * FROM posts WHERE title = ?", ("secret",)
+            ).all()
+
+        (entry,) = read_entries(slow_query_log.path)
+        assert entry["sql"] == "SELECT * FROM posts WHERE title = ?"
+        assert entry["params"] == ["<str:6>"]
+        assert entry["view"] == "page.home"
+        assert entry["ms"] >= 0
+        assert "SCAN posts" in entry["plan"]
+        assert os.path.exists(process_path(slow_query_log.path, os.getpid()))
+
+    def test_each_process_writes_its_own_file(self, tmp_path, monkeypatch):
+        """Test a forked worker stops writing through its parent's file."""
+        engine = self.engine(tmp_path)
+        slow_query_log = self.slow_query_log(tmp_path, 0.000001)
+        slow_query_log.listen(engine)
+
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1").all()
+            monkeypatch.setattr(os, "getpid", lambda: 4242)
+            connection.exec_driver_sql("SELECT 2").all()
+
+        files = log_files(slow_query_log.path)
+        assert files[-1] == str(tmp_path / "slow-queries-4242.log")
+        assert len(files) == 2
+        assert sorted(
+            entry["sql"] for entry in read_entries(slow_query_log.path)
+        ) == ["SELECT 1", "SELECT 2"]
+
+    def test_log_files(self, tmp_path):
+        """Test every process's file is found with its backups first."""
+        for name in [
+            "slow-queries.log",
+            "slow-queries-12.log",
+            "slow-queries-12.log.1",
+            "slow-queries-12.log.2",
+            "slow-queries-7.log",
+            "slow-queries-other.log",
+        ]:
+            (tmp_path / name).write_text("")
+
+        files = log_files(str(tmp_path / "slow-queries.log"))
+
+        assert [os.path.basename(file) for file in files] == [
+            "slow-queries.log",
+            "slow-queries-12.log.2",
+            "slow-queries-12.log.1",
+            "slow-queries-12.log",
+            "slow-queries-7.log",
+        ]
+
+    def test_fast_statement_not_recorded(self, tmp_path):
+        engine = self.engine(tmp_path)
+        slow_query_log = self.slow_query_log(tmp_path, 60000)
+        slow_query_log.listen(engine)
+
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT * FROM posts").all()
+
+        assert list(read_entries(slow_query_log.path)) == []
+
+    def test_unmatched_after_execute_ignored(self, tmp_path):
+        """Test a statement started before the listeners isn't timed."""
+        slow_query_log = self.slow_query_log(tmp_path, 0.000001)
+        conn = SimpleNamespace(info={})
+
+        slow_query_log._after_execute(conn, None, "SELECT 1", (), None, False)
+
+        assert list(read_entries(slow_query_log.path)) == []
+
+    def test_summarize_worst_first(self):
+        entries = [
+            {"sql": "SELECT 1", "ms": 5, "view": "page.home", "plan": []},
+            {"sql": "SELECT  2", "ms": 30, "view": "feeds.rss"},
+            {"sql": "SELECT 2", "ms": 40, "view": None, "plan": []},
+        ]
+
+        summary = summarize(entries)
+
+        assert [group["sql"] for group in summary] == ["SELECT 2", "SELECT 1"]
+        assert summary[0]["count"] == 2
+        assert summary[0]["total_ms"] == 70
+        assert summary[0]["max_ms"] == 40
+        assert summary[0]["views"] == ["-", "feeds.rss"]
+
+    def test_report_command(self, app, tmp_path):
+        """Test the report ranks statements and flags full scans."""
+        path = tmp_path / "slow-queries.log"
+        rotated = {
+            "sql": "SELECT * FROM posts ORDER BY created_on DESC",
+            "ms": 120.0,
+            "view": "page.home",
+            "plan": ["SCAN posts", "USE TEMP B-TREE FOR ORDER BY"],
+        }
+        current = {
+            "sql": "SELECT * FROM posts WHERE slug = ?",
+            "ms": 15.0,
+            "view": "page.blog_post",
+            "plan": ["SEARCH posts USING INDEX ix_posts_slug (slug=?)"],
+        }
+        (tmp_path / "slow-queries.log.1").write_text(json.dumps(rotated))
+        path.write_text(json.dumps(current) + "\nnot json\n")
+
+        result = app.test_cli_runner().invoke(
+            args=["db-perf", "report", "--path", str(path)]
+        )
+
+        assert result.exit_code == 0
+        lines = result.output.splitlines()
+        assert lines[0].startswith("1. 120.0ms total")
+        assert "from page.home" in lines[0]
+        assert "FULL SCAN of posts" in lines[2]
+        assert result.output.count("FULL SCAN") == 1
+        assert "2. 15.0ms total" in result.output
+
+    def test_report_without_log(self, app, tmp_path):
+        path = tmp_path / "missing.log"
+
+        result = app.test_cli_runner().invoke(
+            args=["db-perf", "report", "--path", str(path)]
+        )
+
+        assert result.output == f"No slow queries recorded in {path}.\n"
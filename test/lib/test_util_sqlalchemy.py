@@ -0,0 +1,70 @@
+from sqlalchemy import create_engine
+
+from lib.util_sqlalchemy import (
+    dispose_engines,
+    set_sqlite_pragmas,
+    sqlite_pragma_mismatches,
+)
+from marrow_blog.extensions import db
+
+
+class TestSQLitePragmas:
+    """Test the SQLite pragmas applied to every new connection."""
+
+    def test_app_engine_uses_configured_pragmas(self, app):
+        """Test the effective pragmas on the app's engine."""
+        with db.engine.connect() as connection:
+
+            def pragma(name):
+                return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1
+            assert pragma("busy_timeout") == 5000
+            assert pragma("cache_size") == -16000
+            assert pragma("mmap_size") == 128 * 1024 * 1024
+
+            assert (
+                sqlite_pragma_mismatches(
+                    connection, app.config["SQLITE_PRAGMAS"]
+                )
+                == {}
+            )
+
+    def test_mismatches_reported(self, tmp_path):
+        """Test a connection without the pragmas reports each mismatch."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+        pragmas = {"journal_mode": "wal", "synchronous": "normal"}
+
+        with engine.connect() as connection:
+            mismatches = sqlite_pragma_mismatches(connection, pragmas)
+
+        assert mismatches == {
+            "journal_mode": ("wal", "delete"),
+            "synchronous": (1, 2),
+        }
+
+    def test_pragmas_applied_on_connect(self, tmp_path):
+        """Test set_sqlite_pragmas covers every new DBAPI connection."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+        pragmas = {"journal_mode": "wal", "busy_timeout": 1234}
+        set_sqlite_pragmas(engine, pragmas)
+
+        for _ in range(2):
+            with engine.connect() as connection:
+                assert sqlite_pragma_mismatches(connection, pragmas) == {}
+            engine.dispose()
+
+
+class TestDisposeEngines:
+    """Test a forked worker stops using the master's pooled connections."""
+
+    def test_pool_replaced_without_closing(self, app):
+        pool = db.engine.pool
+        inherited = pool.connect()
+
+        dispose_engines(app)
+
+        assert db.engine.pool is not pool
+        assert inherited.dbapi_connection.execute("SELECT 1").fetchone()
+        inherited.close()
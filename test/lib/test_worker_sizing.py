@@ -0,0 +1,156 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from lib.worker_sizing import (
+    cpu_limit,
+    memory_limit,
+    plan,
+    sqlite_cache_mb,
+)
+
+
+def cgroup(root, files):
+    for name, value in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"{value}\n")
+    return str(root)
+
+
+@pytest.fixture
+def host(monkeypatch):
+    """An 8 CPU host with 16 GB of memory."""
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)))
+    pages = {"SC_PAGE_SIZE": 4096, "SC_PHYS_PAGES": 4 * 1024 * 1024}
+    monkeypatch.setattr(os, "sysconf", pages.__getitem__)
+
+
+class TestCpuLimit:
+    def test_v2_quota(self, host, tmp_path):
+        root = cgroup(tmp_path, {"cpu.max": "150000 100000"})
+
+        assert cpu_limit(root) == (1.5, "cgroup v2")
+
+    def test_v2_unlimited(self, host, tmp_path):
+        root = cgroup(tmp_path, {"cpu.max": "max 100000"})
+
+        assert cpu_limit(root) == (8, "cpu affinity")
+
+    def test_v1_quota(self, host, tmp_path):
+        root = cgroup(
+            tmp_path,
+            {
+                "cpu,cpuacct/cpu.cfs_quota_us": 100000,
+                "cpu,cpuacct/cpu.cfs_period_us": 100000,
+            },
+        )
+
+        assert cpu_limit(root) == (1, "cgroup v1")
+
+    def test_v1_unlimited(self, host, tmp_path):
+        root = cgroup(
+            tmp_path,
+            {"cpu/cpu.cfs_quota_us": -1, "cpu/cpu.cfs_period_us": 100000},
+        )
+
+        assert cpu_limit(root) == (8, "cpu affinity")
+
+    def test_quota_above_affinity(self, host, tmp_path):
+        root = cgroup(tmp_path, {"cpu.max": "1600000 100000"})
+
+        assert cpu_limit(root) == (8, "cpu affinity")
+
+
+class TestMemoryLimit:
+    def test_v2_limit(self, host, tmp_path):
+        root = cgroup(tmp_path, {"memory.max": 1024 * 1024 * 1024})
+
+        assert memory_limit(root) == (1024, "cgroup v2")
+
+    def test_v1_limit(self, host, tmp_path):
+        root = cgroup(
+            tmp_path, {"memory/memory.limit_in_bytes": 512 * 1024 * 1024}
+        )
+
+        assert memory_limit(root) == (512, "cgroup v1")
+
+    def test_v1_unlimited(self, host, tmp_path):
+        root = cgroup(
+            tmp_path, {"memory/memory.limit_in_bytes": 9223372036854771712}
+        )
+
+        assert memory_limit(root) == (16384, "physical memory")
+
+    def test_no_cgroup(self, host, tmp_path):
+        """Test a VM without a limit reports its physical memory."""
+        assert memory_limit(str(tmp_path)) == (16384, "physical memory")
+
+
+class TestPlan:
+    def test_cpu_bound(self):
+        layout = plan(1, 1024, 76, 16, 25)
+
+        assert (layout.workers, layout.threads) == (2, 1)
+        assert layout.limited_by == "cpu"
+
+    def test_fractional_cpus(self):
+        assert plan(0.5, None, 76, 16, 25).workers == 1
+        assert plan(1.5, None, 76, 16, 25).workers == 3
+
+    def test_memory_bound_adds_threads(self):
+        """Test 8 CPUs in 512 MB run fewer workers with more threads."""
+        layout = plan(8, 512, 76, 16, 25)
+
+        assert layout.limited_by == "memory"
+        assert (layout.workers, layout.threads) == (3, 3)
+        assert layout.worker_mb == 76 + 2 * 16
+
+    def test_threads_fit_in_memory(self):
+        """Test 1 x 4 threads beats the 2 single threaded workers in 256 MB."""
+        layout = plan(8, 256, 76, 16, 25)
+
+        assert (layout.workers, layout.threads) == (1, 4)
+
+    def test_at_least_one_worker(self):
+        layout = plan(4, 64, 76, 16, 25)
+
+        assert (layout.workers, layout.threads) == (1, 1)
+
+    def test_describe_overrides(self):
+        layout = plan(
+            1, 1024, 76, 16, 25, "cgroup v2", memory_source="cgroup v2"
+        )
+
+        assert layout.describe(2, 1) == (
+            "Sized for 1 CPUs (cgroup v2) and 1024 MB (cgroup v2): "
+            "2 workers x 1 threads at ~76 MB each, limited by cpu"
+        )
+        assert layout.describe(5, 1).endswith(
+            ", WEB_CONCURRENCY sets 5 workers"
+        )
+
+
+def test_sqlite_cache_mb():
+    assert sqlite_cache_mb(-16000) == 15.625
+    assert sqlite_cache_mb(2000) == 2000 * 4096 / 1024 / 1024
+
+
+def test_env_overrides_win():
+    """Test WEB_CONCURRENCY and PYTHON_MAX_THREADS beat the sized layout."""
+    env = {**os.environ, "WEB_CONCURRENCY": "7", "PYTHON_MAX_THREADS": "3"}
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import config.gunicorn as g; print(g.workers, g.threads)",
+        ],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    ).stdout
+
+    assert output.split() == ["7", "3"]
@@ -1,3 +1,7 @@
+import io
+import os
+from types import SimpleNamespace
+
 import pyotp
 from flask import url_for
 
@@ -845,3 +849,145 @@ class TestAuthRequired(ViewTestMixin):
         self.login_admin("test_editor")
         response = self.client.get(url_for("admin.dashboard"))
         assert response.status_code == 200
+
+
+class TestAdminImport(ViewTestMixin):
+    """Test the bulk import form and its progress endpoints."""
+
+    def test_import_requires_authentication(self):
+        response = self.client.get(
+            url_for("admin.import_docs"), follow_redirects=True
+        )
+
+        assert_status_with_message(
+            status_code=200, response=response, message="Admin Login"
+        )
+
+    def test_import_queues_task(self, app, tmp_path, monkeypatch):
+        """Test uploads are staged and handed to the Celery task."""
+        from marrow_blog.app import celery_for
+        from marrow_blog.blueprints.admin import tasks
+
+        # Build Celery first, the task proxy rebinds to it when it's created.
+        celery_for(app)
+        queued = []
+
+        def delay(directory, paths, author_id):
+            queued.append((directory, paths, author_id))
+            return SimpleNamespace(id="task-123")
+
+        monkeypatch.setattr(tasks.import_posts, "delay", delay)
+        monkeypatch.setitem(app.config, "IMPORT_UPLOAD_DIR", str(tmp_path))
+        self.login_admin("test_admin")
+
+        response = self.client.post(
+            url_for("admin.import_docs"),
+            data={
+                "doc_files": [
+                    (io.BytesIO(b"# One"), "one.md"),
+                    (io.BytesIO(b"PK"), "more posts.zip"),
+                ]
+            },
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 302
+        assert response.location.endswith("/import/task-123")
+        directory, paths, author_id = queued[0]
+        assert [os.path.basename(path) for path in paths] == [
+            "0-one.md",
+            "1-more_posts.zip",
+        ]
+        assert all(path.startswith(directory) for path in paths)
+        with open(paths[0], "rb") as f:
+            assert f.read() == b"# One"
+
+    def test_import_rejects_other_files(self):
+        self.login_admin("test_admin")
+
+        response = self.client.post(
+            url_for("admin.import_docs"),
+            data={"doc_files": [(io.BytesIO(b"x"), "notes.txt")]},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 200
+        assert b"extensions" in response.data
+
+    def test_import_progress(self, monkeypatch):
+        """Test progress reports the task's per-file results."""
+        from marrow_blog.blueprints.admin import views
+
+        info = {
+            "done": 1,
+            "total": 2,
+            "results": [{"filename": "one.md", "status": "created"}],
+        }
+        monkeypatch.setattr(
+            views,
+            "_task_result",
+            lambda task_id: SimpleNamespace(state="PROGRESS", info=info),
+        )
+        self.login_admin("test_admin")
+
+        data = self.client.get(
+            url_for("admin.import_progress", task_id="abc")
+        ).get_json()
+        page = self.client.get(url_for("admin.import_status", task_id="abc"))
+
+        assert data == {"state": "PROGRESS", **info}
+        assert b"1 of 2 files processed" in page.data
+        assert b'http-equiv="refresh"' in page.data
+
+
+class TestAdminBatch(ViewTestMixin):
+    """Test dashboard multi-select actions."""
+
+    def _flashes(self):
+        with self.client.session_transaction() as sess:
+            return sess.get("_flashes", [])[-1:]
+
+    def test_dashboard_has_batch_form(self):
+        self.login_admin("test_admin")
+
+        response = self.client.get(url_for("admin.dashboard"))
+
+        assert b'name="post_ids"' in response.data
+        assert b'action="/batch"' in response.data
+
+    def test_batch_retract(self):
+        """Test the selected posts are retracted together."""
+        self.login_admin("test_admin")
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        ids = [
+            Post(
+                title=f"Dashboard Batch {i}",
+                slug=f"dashboard-batch-{i}",
+                published=True,
+                author_id=admin.id,
+            )
+            .save()
+            .id
+            for i in range(2)
+        ]
+
+        response = self.client.post(
+            url_for("admin.batch"),
+            data={"action": "retract", "post_ids": [str(id) for id in ids]},
+        )
+
+        assert response.status_code == 302
+        assert self._flashes() == [("success", "Batch retract: 2 retracted.")]
+        assert not any(Post.query.get(id).published for id in ids)
+
+    def test_batch_without_selection(self):
+        self.login_admin("test_admin")
+
+        response = self.client.post(
+            url_for("admin.batch"), data={"action": "delete"}
+        )
+
+        assert response.status_code == 302
+        assert self._flashes() == [
+            ("error", "Select an action and at least one post.")
+        ]
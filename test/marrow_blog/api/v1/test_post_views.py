@@ -1,6 +1,7 @@
 import json
 import uuid
 
+from lib.pagination import encode_cursor
 from lib.tests import ViewTestMixin
 from marrow_blog.blueprints.posts.models import Post
 
@@ -32,15 +33,136 @@ class TestPostViewGet(ViewTestMixin):
         assert response.status_code == 404
 
     def test_get_posts_index(self):
-        """Test GET /api/v1/post/ returns list of posts."""
+        """Test GET /api/v1/post/ returns a page of posts."""
         self.login_admin("test_admin")
 
         response = self.client.get("/api/v1/post/")
 
         assert response.status_code == 200
         data = response.get_json()
-        assert isinstance(data, list)
-        assert len(data) >= 3  # At least our fixture posts
+        assert isinstance(data["results"], list)
+        assert len(data["results"]) >= 3  # At least our fixture posts
+        assert "next_cursor" in data
+
+
+class TestPostViewFields(ViewTestMixin):
+    """Test ?fields= sparse fieldsets on the post endpoints."""
+
+    def test_index_defaults_to_summary(self):
+        """Test list responses leave out markdown_content."""
+        self.login_admin("test_admin")
+
+        data = self.client.get("/api/v1/post/").get_json()
+
+        assert "markdown_content" not in data["results"][0]
+        assert "tag_list" in data["results"][0]
+
+    def test_index_fields(self):
+        """Test ?fields= picks exactly the serialized fields."""
+        self.login_admin("test_admin")
+
+        data = self.client.get(
+            "/api/v1/post/?fields=id,slug,markdown_content"
+        ).get_json()
+
+        assert set(data["results"][0]) == {"id", "slug", "markdown_content"}
+
+    def test_get_fields(self):
+        """Test single posts stay complete unless ?fields= is given."""
+        self.login_admin("test_admin")
+        post = Post.query.filter_by(slug="test-post-1").first()
+
+        full = self.client.get(f"/api/v1/post/{post.id}/").get_json()
+        sparse = self.client.get(
+            f"/api/v1/post/{post.id}/?fields=title,author_username"
+        ).get_json()
+
+        assert "markdown_content" in full
+        assert sparse == {
+            "title": "Test Post 1",
+            "author_username": "test_admin",
+        }
+
+    def test_unknown_fields_rejected(self):
+        """Test unknown field names are bad requests."""
+        self.login_admin("test_admin")
+
+        response = self.client.get("/api/v1/post/?fields=id,secret")
+
+        assert response.status_code == 400
+        assert "secret" in str(response.get_json()["error"])
+
+
+class TestPostViewIndexPagination(ViewTestMixin):
+    """Test keyset pagination and filters on GET /api/v1/post/."""
+
+    def _walk(self, query=""):
+        ids, cursor = [], None
+        while True:
+            url = f"/api/v1/post/?limit=2{query}"
+            if cursor:
+                url += f"&cursor={cursor}"
+            data = self.client.get(url).get_json()
+            assert len(data["results"]) <= 2
+            ids.extend(post["id"] for post in data["results"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                return ids
+
+    def test_cursor_walks_every_post_once_newest_first(self):
+        """Test pages cover all posts in (created_on, id) order."""
+        self.login_admin("test_admin")
+
+        expected = [
+            post.id
+            for post in Post.query.order_by(
+                Post.created_on.desc(), Post.id.desc()
+            )
+        ]
+
+        assert self._walk() == expected
+
+    def test_published_filter(self):
+        """Test published=false only pages through drafts."""
+        self.login_admin("test_admin")
+
+        drafts = self._walk("&published=false")
+
+        assert drafts
+        assert all(not Post.query.get(id).published for id in drafts)
+        assert Post.query.filter_by(slug="draft-post").one().id in drafts
+
+    def test_tag_filter(self):
+        """Test tag=<slug> only returns posts with that tag."""
+        self.login_admin("test_admin")
+        admin_id = Post.query.filter_by(slug="test-post-1").one().author_id
+        for i in range(3):
+            Post(
+                title=f"Cassowary {i}",
+                slug=f"cassowary-{i}",
+                tags="cassowary",
+                author_id=admin_id,
+            ).save()
+
+        tagged = self._walk("&tag=cassowary")
+
+        assert [Post.query.get(id).slug for id in tagged] == [
+            "cassowary-2",
+            "cassowary-1",
+            "cassowary-0",
+        ]
+        assert self._walk("&tag=no-such-tag") == []
+
+    def test_invalid_cursor_and_limit(self):
+        """Test malformed cursors and limits are bad requests."""
+        self.login_admin("test_admin")
+
+        assert self.client.get("/api/v1/post/?cursor=%%%").status_code == 400
+        assert (
+            self.client.get("/api/v1/post/?cursor=WyJ4IiwxXQ").status_code
+            == 400
+        )
+        assert self.client.get("/api/v1/post/?limit=x").status_code == 400
 
 
 class TestPostViewCreate(ViewTestMixin):
@@ -405,3 +527,113 @@ class TestPostViewPatch(ViewTestMixin):
         assert (
             response_data["title"] == f"Updated Without Timestamp {unique_id}"
         )
+
+
+class TestPostViewSearch(ViewTestMixin):
+    """Test POST API search endpoint."""
+
+    def test_search_requires_authentication(self):
+        """Test GET /api/v1/post/search requires authentication."""
+        response = self.client.get("/api/v1/post/search?q=test")
+
+        assert response.status_code in [302, 401]
+
+    def test_search_includes_drafts(self):
+        """Test search returns drafts for authenticated authors."""
+        self.login_admin("test_admin")
+
+        response = self.client.get("/api/v1/post/search?q=draft")
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert "draft-post" in [result["slug"] for result in data["results"]]
+        assert "next_cursor" in data
+
+    def test_search_paginates(self):
+        """Test limit and cursor page through the results."""
+        self.login_admin("test_admin")
+
+        first = self.client.get("/api/v1/post/search?q=content&limit=1")
+        data = first.get_json()
+        assert len(data["results"]) == 1
+        assert data["next_cursor"]
+
+        second = self.client.get(
+            f"/api/v1/post/search?q=content&limit=1"
+            f"&cursor={data['next_cursor']}"
+        )
+        next_data = second.get_json()
+        assert next_data["results"][0]["id"] != data["results"][0]["id"]
+
+    def test_search_invalid_params(self):
+        """Test bad limit and cursor values are rejected."""
+        self.login_admin("test_admin")
+
+        assert (
+            self.client.get("/api/v1/post/search?q=x&limit=abc").status_code
+            == 400
+        )
+        assert (
+            self.client.get("/api/v1/post/search?q=x&cursor=zzz").status_code
+            == 400
+        )
+        cursor = encode_cursor({}, {})
+        assert (
+            self.client.get(
+                f"/api/v1/post/search?q=x&cursor={cursor}"
+            ).status_code
+            == 400
+        )
+
+
+class TestPostViewBatch(ViewTestMixin):
+    """Test POST /api/v1/post/batch."""
+
+    def _batch(self, data):
+        return self.client.post(
+            "/api/v1/post/batch",
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+
+    def test_batch_requires_authentication(self):
+        response = self._batch({"action": "publish", "ids": [1]})
+
+        assert response.status_code in [302, 401]
+
+    def test_batch_publish(self):
+        """Test a batch publishes the author's drafts in one call."""
+        self.login_admin("test_admin")
+        admin_id = Post.query.filter_by(slug="test-post-1").one().author_id
+        ids = [
+            Post(
+                title=f"Batch API {i}",
+                slug=f"batch-api-{uuid.uuid4().hex[:8]}",
+                author_id=admin_id,
+            )
+            .save()
+            .id
+            for i in range(2)
+        ]
+
+        response = self._batch({"action": "publish", "ids": ids})
+
+        assert response.status_code == 200
+        assert response.get_json()["results"] == [
+            {"id": ids[0], "status": "published"},
+            {"id": ids[1], "status": "published"},
+        ]
+        assert all(Post.query.get(id).published for id in ids)
+
+    def test_batch_validation(self):
+        """Test unknown actions and bad ids are rejected."""
+        self.login_admin("test_admin")
+
+        assert (
+            self._batch({"action": "archive", "ids": [1]}).status_code == 422
+        )
+        assert self._batch({"action": "delete", "ids": []}).status_code == 422
+        assert (
+            self._batch({"action": "delete", "ids": ["1"]}).status_code == 422
+        )
+        assert self._batch({}).status_code == 400
@@ -1,8 +1,14 @@
 import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+from werkzeug.http import http_date
 
 from lib.tests import ViewTestMixin
 from marrow_blog.blueprints.admin.models import AdminUser
 from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.extensions import db, feed_cache
 
 
 class TestRSSFeed(ViewTestMixin):
@@ -259,3 +265,137 @@ class TestSitemap(ViewTestMixin):
         )
         assert priority is not None
         assert priority.text == "0.8"
+
+
+class TestFeedCaching(ViewTestMixin):
+    """Test cached and conditionally served feeds."""
+
+    def _create_post(self, slug, published=True):
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        post = Post(
+            title=f"Feed Cache {slug}",
+            slug=slug,
+            markdown_content="Content",
+            excerpt="Excerpt",
+            published=published,
+            author_id=admin.id,
+        )
+        return post.save()
+
+    def test_feeds_set_validators(self):
+        """Test feeds carry an ETag and no Last-Modified."""
+        for url in ("/rss.xml", "/sitemap.xml"):
+            response = self.client.get(url)
+
+            assert response.headers["ETag"]
+            assert "Last-Modified" not in response.headers
+
+    def test_matching_etag_returns_304(self):
+        """Test a matching If-None-Match is answered with a 304."""
+        for url in ("/rss.xml", "/sitemap.xml"):
+            etag = self.client.get(url).headers["ETag"]
+
+            response = self.client.get(url, headers={"If-None-Match": etag})
+
+            assert response.status_code == 304
+            assert response.data == b""
+
+    def test_cached_feed_served_without_queries(self):
+        """Test a cached feed is served without touching the database."""
+        self.client.get("/rss.xml")
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = self.client.get("/rss.xml")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        assert statements == []
+
+    def test_etag_stable_across_rebuilds(self):
+        """Test rebuilding unchanged feeds yields the same ETag."""
+        for url in ("/rss.xml", "/sitemap.xml"):
+            etag = self.client.get(url).headers["ETag"]
+
+            feed_cache.invalidate()
+
+            assert self.client.get(url).headers["ETag"] == etag
+
+    @pytest.mark.parametrize("action", ["retract", "delete"])
+    def test_if_modified_since_sees_removed_post(self, action):
+        """Test removing the newest post isn't hidden behind a 304."""
+        post = self._create_post(f"feed-cache-ims-{action}")
+        since = http_date(datetime.now(timezone.utc) + timedelta(hours=1))
+
+        self.login_admin()
+        self.client.get(f"/{action}/{post.id}")
+
+        for url in ("/rss.xml", "/sitemap.xml"):
+            response = self.client.get(
+                url, headers={"If-Modified-Since": since}
+            )
+
+            assert response.status_code == 200
+            assert post.slug.encode() not in response.data
+
+    def test_publish_invalidates_feeds(self):
+        """Test publishing from the admin shows up in the feeds."""
+        post = self._create_post("feed-cache-publish", published=False)
+        assert b"feed-cache-publish" not in self.client.get("/rss.xml").data
+
+        self.login_admin()
+        self.client.get(f"/publish/{post.id}")
+
+        assert b"feed-cache-publish" in self.client.get("/rss.xml").data
+        assert b"feed-cache-publish" in self.client.get("/sitemap.xml").data
+
+    def test_retract_invalidates_feeds(self):
+        """Test retracting from the admin drops the post from the feeds."""
+        post = self._create_post("feed-cache-retract")
+        assert b"feed-cache-retract" in self.client.get("/rss.xml").data
+
+        self.login_admin()
+        self.client.get(f"/retract/{post.id}")
+
+        assert b"feed-cache-retract" not in self.client.get("/rss.xml").data
+
+    def test_admin_delete_invalidates_feeds(self):
+        """Test deleting from the admin drops the post from the feeds."""
+        post = self._create_post("feed-cache-delete")
+        assert b"feed-cache-delete" in self.client.get("/sitemap.xml").data
+
+        self.login_admin()
+        self.client.get(f"/delete/{post.id}")
+
+        assert b"feed-cache-delete" not in self.client.get("/sitemap.xml").data
+
+    def test_api_patch_invalidates_feeds(self):
+        """Test renaming a published post through the API updates the feed."""
+        post = self._create_post("feed-cache-patch")
+        self.client.get("/rss.xml")
+
+        self.login_admin()
+        self.client.patch(
+            f"/api/v1/post/{post.id}/",
+            json={
+                "title": "Feed Cache Renamed",
+                "updated_on": post.updated_on.isoformat(),
+            },
+        )
+
+        assert b"Feed Cache Renamed" in self.client.get("/rss.xml").data
+
+    def test_api_delete_invalidates_feeds(self):
+        """Test deleting a published post through the API updates the feed."""
+        post = self._create_post("feed-cache-api-delete")
+        self.client.get("/rss.xml")
+
+        self.login_admin()
+        self.client.delete(f"/api/v1/post/{post.id}/")
+
+        assert b"feed-cache-api-delete" not in self.client.get("/rss.xml").data
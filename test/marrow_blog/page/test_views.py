@@ -1,6 +1,10 @@
 from flask import url_for
+from sqlalchemy import event
 
 from lib.tests import ViewTestMixin
+from marrow_blog.blueprints.admin.models import AdminUser
+from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.extensions import db
 
 
 class TestPage(ViewTestMixin):
@@ -9,3 +13,192 @@ class TestPage(ViewTestMixin):
         response = self.client.get(url_for("page.home"))
 
         assert response.status_code == 200
+
+    def test_blog_post_serves_stored_html(self):
+        """Blog post should serve the stored rendered HTML."""
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        post = Post(
+            title="Stored Render Post",
+            slug="stored-render-post",
+            markdown_content="Original content",
+            published=True,
+            author_id=admin.id,
+        )
+        post.save()
+        post.rendered_html = "<p>stored render</p>"
+        post.save()
+
+        response = self.client.get(url_for("page.blog_post", slug=post.slug))
+
+        assert response.status_code == 200
+        assert b"<p>stored render</p>" in response.data
+
+
+class TestBlogPostConditionalGet(ViewTestMixin):
+    """Test ETag / Last-Modified revalidation of blog posts."""
+
+    def _create_post(self, slug):
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        post = Post(
+            title=f"Conditional {slug}",
+            slug=slug,
+            markdown_content="# Conditional\n\nBody text.",
+            published=True,
+            author_id=admin.id,
+        )
+        return post.save()
+
+    def test_sets_validators(self):
+        """Blog post responses should carry ETag and Last-Modified."""
+        post = self._create_post("conditional-validators")
+
+        response = self.client.get(url_for("page.blog_post", slug=post.slug))
+
+        assert response.status_code == 200
+        assert response.headers["ETag"].startswith('"')
+        assert response.headers["Last-Modified"]
+        assert "no-cache" in response.headers["Cache-Control"]
+
+    def test_if_none_match_returns_304_without_loading_body(self):
+        """A matching ETag should 304 from a projected lookup only."""
+        post = self._create_post("conditional-etag")
+        url = url_for("page.blog_post", slug=post.slug)
+        etag = self.client.get(url).headers["ETag"]
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = self.client.get(url, headers={"If-None-Match": etag})
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.data == b""
+        assert statements
+        assert not any("markdown_content" in s for s in statements)
+        assert not any("rendered_html" in s for s in statements)
+
+    def test_if_modified_since_returns_304(self):
+        """An up to date If-Modified-Since should 304."""
+        post = self._create_post("conditional-ims")
+        url = url_for("page.blog_post", slug=post.slug)
+        last_modified = self.client.get(url).headers["Last-Modified"]
+
+        response = self.client.get(
+            url, headers={"If-Modified-Since": last_modified}
+        )
+
+        assert response.status_code == 304
+
+    def test_stale_etag_returns_full_page(self):
+        """A non-matching ETag should get the full page."""
+        post = self._create_post("conditional-stale")
+
+        response = self.client.get(
+            url_for("page.blog_post", slug=post.slug),
+            headers={"If-None-Match": '"stale"'},
+        )
+
+        assert response.status_code == 200
+        assert b"Body text." in response.data
+
+    def test_etag_changes_when_post_edited(self):
+        """Editing a post should produce a new ETag."""
+        post = self._create_post("conditional-edit")
+        url = url_for("page.blog_post", slug=post.slug)
+        etag = self.client.get(url).headers["ETag"]
+
+        post.markdown_content = "Edited body."
+        post.save()
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_conditional_request_for_missing_post_404s(self):
+        """Validators on an unknown slug should still 404."""
+        response = self.client.get(
+            url_for("page.blog_post", slug="no-such-post"),
+            headers={"If-None-Match": '"anything"'},
+        )
+
+        assert response.status_code == 404
+
+
+class TestSearchPage(ViewTestMixin):
+    """Test the public search page."""
+
+    def test_search_page_lists_published_matches(self):
+        """Search should list published matches with snippets."""
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        Post(
+            title="Galah Sightings",
+            slug="galah-sightings",
+            markdown_content="Pink and grey galah birds.",
+            published=True,
+            author_id=admin.id,
+        ).save()
+
+        response = self.client.get(url_for("page.search", q="galah"))
+
+        assert response.status_code == 200
+        assert b"/blog/galah-sightings" in response.data
+        assert b"<mark>" in response.data
+
+    def test_search_page_without_query(self):
+        """Search without a query should render the empty form."""
+        response = self.client.get(url_for("page.search"))
+
+        assert response.status_code == 200
+
+    def test_search_page_bad_cursor(self):
+        """A malformed cursor should be a bad request."""
+        response = self.client.get(
+            url_for("page.search", q="galah", cursor="%%%")
+        )
+
+        assert response.status_code == 400
+
+
+class TestTagPage(ViewTestMixin):
+    """Test the per-tag listing pages."""
+
+    def _create_post(self, slug, tags, published=True):
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        return Post(
+            title=slug.replace("-", " ").title(),
+            slug=slug,
+            tags=tags,
+            published=published,
+            author_id=admin.id,
+        ).save()
+
+    def test_tag_page_lists_published_posts(self):
+        """The tag page should list only published posts with the tag."""
+        self._create_post("tagged-quoll", "Quoll, marsupials")
+        self._create_post("tagged-quoll-draft", "quoll", published=False)
+
+        response = self.client.get(url_for("page.tag", slug="quoll"))
+
+        assert response.status_code == 200
+        assert b"/blog/tagged-quoll" in response.data
+        assert b"/blog/tagged-quoll-draft" not in response.data
+
+    def test_tag_page_without_published_posts_404s(self):
+        """Tags only used by drafts shouldn't get a public page."""
+        self._create_post("tagged-draft-only", "secret-tag", published=False)
+
+        response = self.client.get(url_for("page.tag", slug="secret-tag"))
+
+        assert response.status_code == 404
+
+    def test_unknown_tag_404s(self):
+        response = self.client.get(url_for("page.tag", slug="no-such-tag"))
+
+        assert response.status_code == 404
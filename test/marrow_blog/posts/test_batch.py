@@ -0,0 +1,132 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from lib.tests import ViewTestMixin
+from marrow_blog.blueprints.admin.models import AdminUser
+from marrow_blog.blueprints.posts.batch import apply_batch
+from marrow_blog.blueprints.posts.models import Post, Tag, post_tags
+from marrow_blog.blueprints.posts.search import search_posts
+from marrow_blog.extensions import cache_generations, db
+
+
+class TestApplyBatch(ViewTestMixin):
+    """Test set-based publish, retract and delete."""
+
+    def _admin(self):
+        return AdminUser.query.filter_by(username="test_admin").first()
+
+    def _create(self, published=False, tags=None, author=None):
+        key = uuid.uuid4().hex[:8]
+        return Post(
+            title=f"Batch {key}",
+            slug=f"batch-{key}",
+            markdown_content=f"Batchable {key}",
+            published=published,
+            tags=tags,
+            author_id=(author or self._admin()).id,
+        ).save()
+
+    def _other_author(self):
+        other = AdminUser(username=f"other-{uuid.uuid4().hex[:8]}")
+        other.set_password("password")
+        return other.save()
+
+    def test_publish_reports_each_id(self):
+        """Test statuses for changed, unchanged, missing and foreign posts."""
+        draft = self._create()
+        published = self._create(published=True)
+        foreign = self._create(author=self._other_author())
+        before = draft.updated_on
+
+        results = apply_batch(
+            "publish",
+            [draft.id, published.id, foreign.id, 999999, draft.id],
+            self._admin().id,
+        )
+
+        assert results == [
+            {"id": draft.id, "status": "published"},
+            {"id": published.id, "status": "unchanged"},
+            {"id": foreign.id, "status": "forbidden"},
+            {"id": 999999, "status": "not_found"},
+        ]
+        assert db.session.get(Post, draft.id).published is True
+        assert db.session.get(Post, draft.id).updated_on > before
+        assert db.session.get(Post, foreign.id).published is False
+
+    def test_tag_counts_follow_batch(self):
+        """Test published tag counts are recounted for touched tags."""
+        key = uuid.uuid4().hex[:8]
+        posts = [self._create(tags=f"batchtag{key}") for _ in range(3)]
+        ids = [post.id for post in posts]
+        tag = Tag.query.filter_by(slug=f"batchtag{key}").one()
+
+        apply_batch("publish", ids, self._admin().id)
+        db.session.refresh(tag)
+        assert tag.published_count == 3
+
+        apply_batch("retract", ids[:1], self._admin().id)
+        db.session.refresh(tag)
+        assert tag.published_count == 2
+
+        apply_batch("delete", ids[1:], self._admin().id)
+        db.session.refresh(tag)
+        assert tag.published_count == 0
+
+    def test_delete_removes_associations_and_index(self):
+        """Test deletes clear post_tags rows and the search index."""
+        key = uuid.uuid4().hex[:8]
+        post_id = self._create(published=True, tags=f"gone{key}").id
+
+        apply_batch("delete", [post_id], self._admin().id)
+
+        db.session.expunge_all()
+        assert db.session.get(Post, post_id) is None
+        remaining = db.session.execute(
+            post_tags.select().where(post_tags.c.post_id == post_id)
+        ).all()
+        assert remaining == []
+        assert search_posts(key)[0] == []
+
+    def test_caches_only_bumped_for_public_changes(self):
+        """Test deleting drafts leaves the cache generations alone."""
+        draft = self._create()
+        published = self._create(published=True, tags="batch-bump")
+        before = {
+            namespace: cache_generations.current(namespace)
+            for namespace in ("posts", "feeds")
+        }
+
+        apply_batch("delete", [draft.id], self._admin().id)
+        assert cache_generations.current("posts") == before["posts"]
+
+        apply_batch("retract", [published.id], self._admin().id)
+        for namespace, generation in before.items():
+            assert cache_generations.current(namespace) == generation + 1
+
+    @pytest.mark.parametrize("action", ["publish", "delete"])
+    def test_writes_recheck_the_author(self, action):
+        """Test a post handed to another author mid-batch is left alone."""
+        post = self._create()
+        other = self._other_author()
+
+        def hand_over(conn, cursor, statement, parameters, context, many):
+            if statement.startswith(("UPDATE posts", "DELETE FROM post_tags")):
+                cursor.connection.execute(
+                    "UPDATE posts SET author_id = ? WHERE id = ?",
+                    (other.id, post.id),
+                )
+
+        event.listen(db.engine, "before_cursor_execute", hand_over)
+        try:
+            apply_batch(action, [post.id], self._admin().id)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", hand_over)
+
+        db.session.expire_all()
+        kept = db.session.get(Post, post.id)
+        assert kept is not None
+        assert kept.published is False
+        assert kept.author_id == other.id
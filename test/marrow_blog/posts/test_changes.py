@@ -0,0 +1,130 @@
+import uuid
+
+import pytest
+
+from lib.tests import ViewTestMixin
+from marrow_blog.blueprints.admin.models import AdminUser
+from marrow_blog.blueprints.posts.batch import apply_batch
+from marrow_blog.blueprints.posts.changes import FIELDS, post_changed
+from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.extensions import db, feed_cache
+
+
+class TestPostChanges(ViewTestMixin):
+    """Test the change events sent after posts are committed."""
+
+    @pytest.fixture(autouse=True)
+    def sent(self):
+        sent = []
+
+        def receive(sender, changes):
+            sent.append(changes)
+
+        post_changed.connect(receive)
+        yield sent
+        post_changed.disconnect(receive)
+
+    def _admin(self):
+        return AdminUser.query.filter_by(username="test_admin").first()
+
+    def _post(self, published=True, tags=None):
+        key = uuid.uuid4().hex[:8]
+        return Post(
+            title=f"Changed {key}",
+            slug=f"changed-{key}",
+            markdown_content="Body.",
+            published=published,
+            tags=tags,
+            author_id=self._admin().id,
+        )
+
+    def test_created(self, sent):
+        post = self._post(tags="kiwi").save()
+
+        ((change,),) = sent
+        assert change.post_id == post.id
+        assert change.kind == "created"
+        assert change.fields == frozenset(FIELDS)
+        assert (change.was_published, change.is_published) == (False, True)
+        assert change.public
+
+    def test_updated_fields(self, sent):
+        post = self._post(published=False).save()
+        sent.clear()
+
+        post.markdown_content = "New body."
+        post.title = f"Renamed {post.slug}"
+        post.save()
+
+        ((change,),) = sent
+        assert change.kind == "updated"
+        assert change.fields == {"body", "summary"}
+        assert not change.public
+
+    def test_retracted(self, sent):
+        post = self._post().save()
+        sent.clear()
+
+        post.published = False
+        post.save()
+
+        ((change,),) = sent
+        assert change.fields == {"published"}
+        assert (change.was_published, change.is_published) == (True, False)
+
+    def test_deleted(self, sent):
+        post = self._post().save()
+        post_id = post.id
+        sent.clear()
+
+        post.delete()
+
+        ((change,),) = sent
+        assert (change.post_id, change.kind) == (post_id, "deleted")
+        assert change.was_published
+
+    def test_flushes_merged_per_transaction(self, sent):
+        post = self._post(published=False)
+        db.session.add(post)
+        db.session.flush()
+        post.published = True
+        db.session.flush()
+        db.session.commit()
+
+        ((change,),) = sent
+        assert change.kind == "created"
+        assert change.is_published
+
+    def test_nothing_sent_on_rollback(self, sent):
+        db.session.add(self._post())
+        db.session.flush()
+        db.session.rollback()
+
+        db.session.commit()
+
+        assert sent == []
+
+    def test_batch_changes_sent(self, sent):
+        posts = [self._post(published=False).save() for _ in range(2)]
+        sent.clear()
+
+        apply_batch("publish", [post.id for post in posts], self._admin().id)
+
+        (changes,) = sent
+        assert sorted(change.post_id for change in changes) == sorted(
+            post.id for post in posts
+        )
+        assert all(change.fields == {"published"} for change in changes)
+        assert all(change.is_published for change in changes)
+
+    def test_public_changes_invalidate_feeds(self):
+        draft = self._post(published=False).save()
+        generation = feed_cache.generation
+
+        draft.title = f"Draft {draft.slug}"
+        draft.save()
+        assert feed_cache.generation == generation
+
+        draft.published = True
+        draft.save()
+        assert feed_cache.generation == generation + 1
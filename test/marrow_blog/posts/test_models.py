@@ -1,11 +1,15 @@
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
 import pytest
+from sqlalchemy import event, update
 from sqlalchemy.exc import IntegrityError
 
 from lib.tests import ViewTestMixin
 from marrow_blog.blueprints.admin.models import AdminUser
-from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.blueprints.posts.models import Post, Tag
+from marrow_blog.blueprints.posts.summaries import PublishedIndex
+from marrow_blog.extensions import db, render_cache
 
 
 class TestPostModel(ViewTestMixin):
@@ -413,3 +417,247 @@ class TestResourceMixinIntegration(ViewTestMixin):
             now - post.created_on.replace(tzinfo=None)
         ).total_seconds()
         assert time_diff < 60  # Should be very recent
+
+
+class TestPostRendering(ViewTestMixin):
+    """Test stored rendered HTML stays in step with markdown_content."""
+
+    def test_rendered_html_populated_on_save(self, clean_session):
+        """Test saving a post stores rendered HTML and its hash."""
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+
+        post = Post(
+            title="Rendered Post",
+            slug="rendered-post",
+            markdown_content="# Heading\n\n```python\nprint('hi')\n```",
+            author_id=admin.id,
+        )
+        post.save()
+
+        assert '<h1 id="heading">Heading</h1>' in post.rendered_html
+        assert 'class="highlight"' in post.rendered_html
+        assert post.content_hash == Post.hash_content(post.rendered_html)
+
+    def test_rendered_html_updated_when_content_changes(self, clean_session):
+        """Test changing markdown_content re-renders the stored HTML."""
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+
+        post = Post(
+            title="Changing Post",
+            slug="changing-post",
+            markdown_content="First version",
+            author_id=admin.id,
+        )
+        post.save()
+        assert "First version" in post.rendered_html
+
+        post.markdown_content = "Second version"
+        post.save()
+
+        assert "Second version" in post.rendered_html
+        assert "First version" not in post.rendered_html
+
+    def test_rendered_html_untouched_when_content_unchanged(
+        self, clean_session
+    ):
+        """Test metadata-only updates keep the stored HTML."""
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+
+        post = Post(
+            title="Stable Post",
+            slug="stable-post",
+            markdown_content="Stable content",
+            author_id=admin.id,
+        )
+        post.save()
+        post.rendered_html = "<p>sentinel</p>"
+        post.save()
+
+        post.title = "Stable Post Renamed"
+        post.save()
+
+        assert post.rendered_html == "<p>sentinel</p>"
+
+    def test_content_html_renders_missing_html(self, clean_session):
+        """Test content_html falls back to rendering when nothing is stored."""
+        post = Post(title="Unsaved", slug="unsaved", markdown_content="*hi*")
+
+        assert post.rendered_html is None
+        assert post.content_html == "<p><em>hi</em></p>"
+
+    def test_content_html_fallback_uses_render_cache(self, clean_session):
+        """Test fallback renders are cached by (id, updated_on)."""
+        post = Post(
+            id=987654,
+            title="Cached Fallback",
+            slug="cached-fallback",
+            markdown_content="*cached*",
+            updated_on=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        )
+
+        render_cache.clear()
+        assert post.content_html == "<p><em>cached</em></p>"
+        assert post.content_html == "<p><em>cached</em></p>"
+
+        assert render_cache.stats()["misses"] == 1
+        assert render_cache.stats()["hits"] == 1
+
+    def test_render_command_backfills_missing_html(self, app, clean_session):
+        """Test `flask posts render` fills NULL rows and keeps updated_on."""
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        post = Post(
+            title="Unrendered Post",
+            slug="unrendered-post",
+            markdown_content="*backfilled*",
+            author_id=admin.id,
+        ).save()
+        db.session.execute(
+            update(Post)
+            .where(Post.id == post.id)
+            .values(rendered_html=None, content_hash=None)
+        )
+        db.session.commit()
+        updated_on = post.updated_on
+
+        result = app.test_cli_runner().invoke(args=["posts", "render"])
+        db.session.refresh(post)
+
+        assert result.exit_code == 0
+        assert result.output == "Rendered 1 post(s).\n"
+        assert post.rendered_html == "<p><em>backfilled</em></p>"
+        assert post.content_hash == Post.hash_content(post.rendered_html)
+        assert post.updated_on == updated_on
+
+        result = app.test_cli_runner().invoke(args=["posts", "render"])
+        assert result.output == "Rendered 0 post(s).\n"
+
+
+class TestPostTags(ViewTestMixin):
+    """Test the normalized tags kept in sync with Post.tags."""
+
+    def _create_post(self, slug, tags, published=True):
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        post = Post(
+            title=slug.replace("-", " ").title(),
+            slug=slug,
+            tags=tags,
+            published=published,
+            author_id=admin.id,
+        )
+        return post.save()
+
+    def test_tags_create_unique_tag_rows(self):
+        """Test tags are split, slugged and shared between posts."""
+        first = self._create_post("tag-rows-one", "Potoroo, hopping, potoroo")
+        second = self._create_post("tag-rows-two", "POTOROO")
+
+        assert [tag.slug for tag in first.tag_objects] == [
+            "potoroo",
+            "hopping",
+        ]
+        assert second.tag_objects == [first.tag_objects[0]]
+        assert Tag.query.filter_by(slug="potoroo").count() == 1
+        assert first.tag_list == ["Potoroo", "hopping", "potoroo"]
+
+    def test_editing_tags_resyncs(self):
+        """Test changing the tags column replaces the tag rows."""
+        post = self._create_post("tag-edit", "bettong, truffles")
+
+        post.tags = "bettong, digging"
+        post.save()
+
+        assert sorted(tag.slug for tag in post.tag_objects) == [
+            "bettong",
+            "digging",
+        ]
+        assert Tag.query.filter_by(slug="truffles").one().published_count == 0
+
+    def test_published_count_follows_publishing(self):
+        """Test counts track publish, retract and delete."""
+        published = self._create_post("tag-count-one", "pademelon")
+        draft = self._create_post(
+            "tag-count-two", "pademelon", published=False
+        )
+        tag = Tag.query.filter_by(slug="pademelon").one()
+        assert tag.published_count == 1
+
+        draft.published = True
+        draft.save()
+        assert tag.published_count == 2
+
+        published.published = False
+        published.save()
+        assert tag.published_count == 1
+
+        draft.delete()
+        assert tag.published_count == 0
+
+    def test_tag_list_setter(self):
+        """Test tag_list writes through to the tags column."""
+        post = self._create_post("tag-list-setter", None)
+
+        post.tag_list = ["dugong", "seagrass"]
+        post.save()
+
+        assert post.tags == "dugong, seagrass"
+        assert [tag.slug for tag in post.tag_objects] == ["dugong", "seagrass"]
+
+
+class TestListingQueryPlans(ViewTestMixin):
+    """Test the hot published listings read in index order."""
+
+    @contextmanager
+    def listing_plans(self):
+        """Yield a dict of posts SELECT statement to its query plan."""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            if (
+                statement.lstrip().startswith("SELECT")
+                and "posts" in statement
+            ):
+                statements.append((statement, parameters))
+
+        plans = {}
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            yield plans
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+
+        connection = db.session.connection()
+        for statement, parameters in statements:
+            rows = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            plans[statement] = [row[3] for row in rows]
+
+    def assert_uses_index(self, plans, order_by, index):
+        (plan,) = [
+            plan for statement, plan in plans.items() if order_by in statement
+        ]
+        assert any(index in line for line in plan), plan
+        assert not any("TEMP B-TREE" in line for line in plan), plan
+
+    def test_published_index_build(self):
+        """Test building the published index reads posts in index order."""
+        with self.listing_plans() as plans:
+            PublishedIndex().snapshot()
+
+        self.assert_uses_index(
+            plans,
+            "ORDER BY posts.created_on DESC, posts.id DESC",
+            "USING INDEX ix_posts_published_created_on_id",
+        )
+
+    def test_newest_published_page(self):
+        """Test keyset pages after the first keep the index order."""
+        _, cursor = Post.page_newest_first(1, published=True)
+        with self.listing_plans() as plans:
+            Post.page_newest_first(10, cursor=cursor, published=True)
+
+        self.assert_uses_index(
+            plans,
+            "ORDER BY posts.created_on DESC, posts.id DESC",
+            "USING INDEX ix_posts_published_created_on_id",
+        )
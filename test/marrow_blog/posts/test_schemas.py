@@ -1,15 +1,21 @@
 import pytest
 from marshmallow import ValidationError
+from sqlalchemy import inspect
 
 from lib.tests import ViewTestMixin
 from marrow_blog.blueprints.admin.models import AdminUser
 from marrow_blog.blueprints.posts.models import Post
 from marrow_blog.blueprints.posts.schemas import (
+    POST_SUMMARY_FIELDS,
     CreatePostSchema,
     PostSchema,
     UpdatePostSchema,
     create_post_schema,
+    parse_post_fields,
+    post_load_only,
+    post_load_options,
     post_schema,
+    post_schema_for,
     posts_schema,
     update_post_schema,
 )
@@ -285,3 +291,63 @@ class TestSchemaInstances(ViewTestMixin):
 
         assert isinstance(result, list)
         assert len(result) <= 2
+
+
+class TestPostFields(ViewTestMixin):
+    def test_summary_fields_omit_body(self, session):
+        """Test the list default leaves markdown_content out."""
+        assert "markdown_content" not in POST_SUMMARY_FIELDS
+        assert "title" in POST_SUMMARY_FIELDS
+
+    def test_parse_post_fields(self, session):
+        """Test ?fields= parsing, defaults and validation."""
+        assert parse_post_fields(None) == PostSchema.Meta.fields
+        assert parse_post_fields("", ("id",)) == ("id",)
+        assert parse_post_fields("title, id,title,") == ("title", "id")
+
+        with pytest.raises(ValidationError) as exc_info:
+            parse_post_fields("title,password")
+        assert "password" in str(exc_info.value.messages)
+
+        with pytest.raises(ValidationError):
+            parse_post_fields(" , ")
+
+    def test_post_schema_for_is_cached_and_limited(self, session):
+        """Test limited schemas are reused and only dump their fields."""
+        schema = post_schema_for(("id", "title"))
+        post = Post.query.filter_by(slug="test-post-1").first()
+
+        assert post_schema_for(("id", "title")) is schema
+        assert schema.dump(post) == {"id": post.id, "title": "Test Post 1"}
+
+    def test_post_load_only_defers_unrequested_columns(self, session):
+        """Test only the needed columns are loaded."""
+        post = (
+            Post.query.options(post_load_only(("title", "tag_list")))
+            .filter_by(slug="test-post-1")
+            .first()
+        )
+        unloaded = inspect(post).unloaded
+
+        assert "markdown_content" in unloaded
+        assert "rendered_html" in unloaded
+        assert "title" not in unloaded
+        assert "tags" not in unloaded
+
+    def test_post_load_options_join_authors_when_asked(self, session):
+        """Test the author comes with the post only for author_username."""
+        session.expunge_all()
+        without = (
+            Post.query.options(*post_load_options(("id", "title")))
+            .filter_by(slug="test-post-1")
+            .first()
+        )
+        assert "author" in inspect(without).unloaded
+        session.expunge_all()
+
+        joined = (
+            Post.query.options(*post_load_options(("id", "author_username")))
+            .filter_by(slug="test-post-1")
+            .first()
+        )
+        assert "author" not in inspect(joined).unloaded
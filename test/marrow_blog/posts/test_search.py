@@ -0,0 +1,127 @@
+import pytest
+
+from lib.pagination import InvalidCursor, encode_cursor
+from lib.tests import ViewTestMixin
+from marrow_blog.blueprints.admin.models import AdminUser
+from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.blueprints.posts.search import (
+    build_match,
+    rebuild_search_index,
+    search_posts,
+)
+
+
+class TestSearchIndex(ViewTestMixin):
+    """Test the trigger-maintained FTS5 index and BM25 search."""
+
+    def _create_post(self, slug, title, content, published=True, **kwargs):
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        post = Post(
+            title=title,
+            slug=slug,
+            markdown_content=content,
+            published=published,
+            author_id=admin.id,
+            **kwargs,
+        )
+        return post.save()
+
+    def _slugs(self, query, **kwargs):
+        results, _ = search_posts(query, **kwargs)
+        return [result["slug"] for result in results]
+
+    def test_insert_is_searchable(self):
+        """Test new posts are indexed by the insert trigger."""
+        self._create_post("fts-insert", "Quokka Facts", "Small marsupials.")
+
+        assert self._slugs("quokka") == ["fts-insert"]
+
+    def test_update_reindexes(self):
+        """Test edits to indexed columns replace the old index entry."""
+        post = self._create_post("fts-update", "Wombat Notes", "Burrows.")
+
+        post.markdown_content = "Platypus swimming."
+        post.save()
+
+        assert self._slugs("burrows") == []
+        assert self._slugs("platypus") == ["fts-update"]
+
+    def test_delete_removes_from_index(self):
+        """Test deleted posts are removed by the delete trigger."""
+        post = self._create_post("fts-delete", "Echidna Spines", "Spiky.")
+
+        post.delete()
+
+        assert self._slugs("echidna") == []
+
+    def test_drafts_excluded_unless_requested(self):
+        """Test drafts only appear when published_only is off."""
+        self._create_post(
+            "fts-draft", "Numbat Draft", "Termites.", published=False
+        )
+
+        assert self._slugs("numbat") == []
+        assert self._slugs("numbat", published_only=False) == ["fts-draft"]
+
+    def test_title_match_ranks_above_body_match(self):
+        """Test BM25 weights title matches over body mentions."""
+        self._create_post("fts-body", "Something Else", "A bilby appears.")
+        self._create_post("fts-title", "Bilby Guide", "All about it.")
+
+        assert self._slugs("bilby") == ["fts-title", "fts-body"]
+
+    def test_snippet_highlights_and_escapes(self):
+        """Test snippets mark matches and escape post content."""
+        self._create_post(
+            "fts-snippet", "Snippet Post", "The <b>dingo</b> howls."
+        )
+
+        results, _ = search_posts("dingo")
+
+        assert "<mark>dingo</mark>" in results[0]["snippet"]
+        assert "&lt;b&gt;" in results[0]["snippet"]
+
+    def test_prefix_and_operators_are_literal(self):
+        """Test the last term is a prefix and FTS5 syntax is quoted."""
+        self._create_post("fts-prefix", "Kookaburra Song", "Laughing.")
+
+        assert build_match('kooka OR "x') == '"kooka" "OR" """x"'
+        assert self._slugs("kookab") == ["fts-prefix"]
+        assert build_match("ko") == '"ko"'
+        assert self._slugs("NEAR( AND") == []
+
+    def test_keyset_pagination(self):
+        """Test cursors walk every result exactly once."""
+        for i in range(5):
+            self._create_post(f"fts-page-{i}", f"Wallaby {i}", "Hops.")
+
+        seen, cursor = [], None
+        while True:
+            results, cursor = search_posts("wallaby", limit=2, cursor=cursor)
+            seen.extend(result["slug"] for result in results)
+            if cursor is None:
+                break
+
+        assert sorted(seen) == [f"fts-page-{i}" for i in range(5)]
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor raises InvalidCursor."""
+        with pytest.raises(InvalidCursor):
+            search_posts("anything", cursor="not-a-cursor")
+
+    @pytest.mark.parametrize(
+        "score, post_id",
+        [({}, {}), ("x", [1]), (True, 1), (-1.5, "1"), (-1.5, 2.0)],
+    )
+    def test_cursor_values_must_be_numbers(self, score, post_id):
+        """Test well-formed cursors holding other types are rejected."""
+        with pytest.raises(InvalidCursor):
+            search_posts("anything", cursor=encode_cursor(score, post_id))
+
+    def test_rebuild(self):
+        """Test rebuilding the index keeps results intact."""
+        self._create_post("fts-rebuild", "Cassowary Casque", "Tall bird.")
+
+        rebuild_search_index()
+
+        assert self._slugs("cassowary") == ["fts-rebuild"]
@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from lib.tests import ViewTestMixin
+from marrow_blog.blueprints.admin.models import AdminUser
+from marrow_blog.blueprints.posts.models import Post
+from marrow_blog.blueprints.posts.summaries import (
+    PostSummary,
+    PublishedIndex,
+)
+
+
+class TestPublishedIndex(ViewTestMixin):
+    """Test the in-memory summaries of published posts."""
+
+    def _create_post(self, tags=None, published=True, **kwargs):
+        admin = AdminUser.query.filter_by(username="test_admin").first()
+        key = uuid.uuid4().hex[:8]
+        post = Post(
+            title=f"Indexed {key}",
+            slug=f"indexed-{key}",
+            excerpt="Summary.",
+            tags=tags,
+            published=published,
+            author_id=admin.id,
+            **kwargs,
+        )
+        return post.save()
+
+    def test_posts_newest_first(self):
+        now = datetime.now(timezone.utc)
+        older = self._create_post(created_on=now + timedelta(days=1))
+        newer = self._create_post(created_on=now + timedelta(days=2))
+        draft = self._create_post(published=False)
+
+        snapshot = PublishedIndex().snapshot()
+
+        slugs = [post.slug for post in snapshot.posts]
+        assert slugs[:2] == [newer.slug, older.slug]
+        assert draft.slug not in slugs
+        assert snapshot.by_updated[0].updated_on == max(
+            post.updated_on for post in snapshot.posts
+        )
+
+    def test_summaries_use_slots(self):
+        post = self._create_post(tags="Wombat, burrows")
+
+        summary = next(
+            summary
+            for summary in PublishedIndex().snapshot().posts
+            if summary.id == post.id
+        )
+
+        assert not hasattr(summary, "__dict__")
+        assert isinstance(summary, PostSummary)
+        assert summary.tag_list == ("Wombat", "burrows")
+
+    def test_reused_until_published_set_changes(self):
+        index = PublishedIndex()
+        first = index.snapshot()
+
+        assert index.snapshot() is first
+        assert index.builds == 1
+
+        post = self._create_post()
+        second = index.snapshot()
+        assert second is not first
+        assert post.id in {summary.id for summary in second.posts}
+
+        post.title = f"Renamed {post.slug}"
+        post.save()
+        third = index.snapshot()
+        assert third is not second
+
+        post.published = False
+        post.save()
+        assert post.id not in {
+            summary.id for summary in index.snapshot().posts
+        }
+        assert index.builds == 4
+
+    def test_tags_list_published_posts_newest_first(self):
+        tag = f"bilby-{uuid.uuid4().hex[:6]}"
+        now = datetime.now(timezone.utc)
+        older = self._create_post(tags=tag, created_on=now)
+        newer = self._create_post(
+            tags=tag, created_on=now + timedelta(seconds=1)
+        )
+        self._create_post(tags=tag, published=False)
+
+        summary = PublishedIndex().snapshot().tags[tag]
+
+        assert summary.name == tag
+        assert [post.id for post in summary.posts] == [newer.id, older.id]
+
+    def test_stats_report_memory(self):
+        self._create_post(tags="numbat")
+        index = PublishedIndex()
+        assert index.stats()["bytes"] == 0
+
+        snapshot = index.snapshot()
+        stats = index.stats()
+
+        assert stats["posts"] == len(snapshot.posts)
+        assert stats["bytes"] == snapshot.bytes
+        assert stats["bytes"] > len(snapshot.posts) * 100
+        assert stats["builds"] == 1
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import marrow_blog.app as app_module
+from lib.import_profile import profile_imports, total_ms
+
+
+class TestCeleryApp:
+    """Test the Celery app is only built when something asks for it."""
+
+    def test_import_builds_no_app(self):
+        assert "celery_app" not in vars(app_module)
+
+    def test_celery_for_builds_once(self, app):
+        celery = app_module.celery_for(app)
+
+        assert app_module.celery_for(app) is celery
+        assert (
+            celery.conf.broker_url == app.config["CELERY_CONFIG"]["broker_url"]
+        )
+
+    def test_celery_app_created_on_first_use(self):
+        """Test `celery -A marrow_blog.app.celery_app` still finds the app."""
+        code = (
+            "import marrow_blog.app as m; "
+            "celery = m.celery_app; "
+            "assert m.celery_app is celery; "
+            "print(celery.conf.include)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+
+        assert "marrow_blog.blueprints.admin.tasks" in output
+
+    def test_unknown_attribute(self):
+        assert not hasattr(app_module, "no_such_attribute")
+
+
+class TestBootImports:
+    """Test what a web worker imports while booting."""
+
+    # Only needed by admin pages, uploads, the CLI or the Celery worker.
+    DEFERRED = (
+        "celery",
+        "kombu",
+        "wtforms",
+        "flask_wtf",
+        "email_validator",
+        "frontmatter",
+        "slugify",
+        "pyotp",
+        "distutils",
+        "flask_debugtoolbar",
+    )
+
+    @pytest.fixture(scope="class")
+    def modules(self):
+        return profile_imports("import marrow_blog.app as m; m.create_app()")
+
+    def test_heavy_modules_deferred(self, modules):
+        imported = {name.split(".", 1)[0] for name in modules}
+
+        assert imported.isdisjoint(self.DEFERRED), sorted(
+            imported.intersection(self.DEFERRED)
+        )
+
+    # Wall clock time varies too much between machines and CI runners to
+    # gate on by default. About 650ms here after deferring the modules above
+    # and 800 to 1000 before, and `./run bench:startup --imports` prints the
+    # profile.
+    @pytest.mark.skipif(
+        "IMPORT_BUDGET_MS" not in os.environ,
+        reason="set IMPORT_BUDGET_MS to check the boot import time",
+    )
+    def test_within_budget(self, modules):
+        assert total_ms(modules) < float(os.environ["IMPORT_BUDGET_MS"])
@@ -15,3 +15,17 @@ class TestUp(ViewTestMixin):
         response = self.client.get(url_for("up.databases"))
 
         assert response.status_code == 200
+
+    def test_up_caches(self):
+        """Up caches should report render cache counters."""
+        response = self.client.get(url_for("up.caches"))
+
+        assert response.status_code == 200
+        assert "hits" in response.get_json()["render_cache"]
+
+    def test_up_caches_reports_published_index_memory(self):
+        self.client.get(url_for("page.home"))
+
+        response = self.client.get(url_for("up.caches"))
+
+        assert response.get_json()["published_index"]["bytes"] > 0